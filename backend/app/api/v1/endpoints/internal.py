@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+from app.core.database import database_pool_stats
+
+router = APIRouter()
+
+@router.get("/db-pool")
+async def db_pool_stats():
+    """
+    Connection pool occupancy and checkout wait times of this worker, for sizing
+    DB_POOL_SIZE / DB_MAX_OVERFLOW against worker and thread counts.
+    """
+    return database_pool_stats()
@@ -1,5 +1,11 @@
+import json
 from fastapi import APIRouter, HTTPException
-from app.models.llm_parsed import DiseaseHistoryRequest, ParsedDiseaseResponse
+from fastapi.responses import StreamingResponse
+from app.core.config import settings
+from app.models.llm_parsed import BatchDiseaseHistoryRequest, DiseaseHistoryRequest, ParsedDiseaseResponse
+from app.core.llm_cache import llm_cache
+from app.core.llm_client import llm_client
+from app.core.llm_integration import get_disease_matcher_async
 from app.services.llm_service import LLMService
 
 router = APIRouter()
@@ -14,9 +20,40 @@ async def parse_disease(request: DiseaseHistoryRequest):
     if not request.history.strip():
         raise HTTPException(status_code=400, detail="Medical history cannot be empty.")  # ✅ Ensure valid input
 
-    result = LLMService.process_disease_history(request.history, request.img_url)
+    result = await LLMService.process_disease_history(request.history, request.img_url)
 
     if not result["diseases"]:
         raise HTTPException(status_code=400, detail="No diseases detected.")
 
-    return result
\ No newline at end of file
+    return result
+
+@router.post("/parse-disease-histories")
+async def parse_diseases(request: BatchDiseaseHistoryRequest):
+    """
+    Bulk onboarding: parses many histories in one request. Streams NDJSON, one
+    `{"index": i, "diseases": [...], "recommended_diet": ...}` line per history as soon
+    as it is ready (not in input order).
+    """
+    if len(request.histories) > settings.LLM_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413, detail=f"At most {settings.LLM_BATCH_MAX_ITEMS} histories per request."
+        )
+
+    async def lines():
+        items = [(item.history, item.img_url) for item in request.histories]
+        async for indices, result in LLMService.process_disease_histories(items):
+            for index in indices:
+                yield json.dumps({"index": index, **result}) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+@router.get("/stats")
+async def llm_stats():
+    """
+    Local disease matcher fast-path hit rate, LLM cache and upstream client counters.
+    """
+    return {
+        "disease_matcher": (await get_disease_matcher_async()).stats(),
+        "llm_cache": llm_cache.stats(),
+        "llm_client": llm_client.stats(),
+    }
@@ -1,15 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
+from app.core.concurrency import run_blocking
 from app.core.database import get_db
+from app.core.metrics import stage_timer
 from app.models.recent_activity import RecentActivity
 from app.services.recommender.hybrid import hybrid_recommendation
+from app.services.recommender.interactions import get_interaction_model
+from app.services.recommender.popularity import get_popularity_store
 from pydantic import BaseModel
 from app.models.user import User
 from app.models.recommendations import Recommendation  # Fixed model name
 from app.models.meal import Meal
+from app.services.recommendations import active_recommendations_query, recommendation_cache, store_recommendations
+from app.services.jobs import enqueue_similar_users, recommendation_jobs
+from app.services.exercise_service import exercise_registry
 from datetime import datetime, timedelta
-import pandas as pd
-import numpy as np
 router = APIRouter()
 
 
@@ -27,57 +32,91 @@ class ExerciseRequest(BaseModel):
     weight: float
     
 @router.get("/recommend/{user_id}")
-async def recommend_meals(user_id: int, top_n: int = 10, refresh: bool = False, db: Session = Depends(get_db)):
+async def recommend_meals(
+    user_id: int,
+    top_n: int = 10,
+    refresh: bool = False,
+    db: Session = Depends(get_db)
+):
     """
     Returns hybrid recommendations for meals, considering:
     1️⃣ Content-Based Filtering
     2️⃣ Collaborative Filtering
     3️⃣ Global & Similar-User Popularity-Based Recommendations
     
-    If refresh=True, forces regeneration of recommendations
+    If refresh=True, forces regeneration of recommendations.
+    A stored set older than 24 hours is still served (stale-while-revalidate) while
+    a background job recomputes it; only users without any set are computed inline.
     """
     # Check if we have recent recommendations stored (less than 24 hours old)
     recent_time = datetime.utcnow() - timedelta(hours=24)
     
     # Only use stored recommendations if not forcing refresh
     if not refresh:
-        stored_recommendations = db.query(Recommendation).filter(
-            Recommendation.user_id == user_id,
-            Recommendation.created_at > recent_time
-        ).all()
-        
+        cached = recommendation_cache.get(user_id)
+        if cached is not None:
+            return cached
+
+        # Taken before the read: a set replaced meanwhile must not be cached
+        generation = recommendation_cache.generation(user_id)
+
+        # ✅ One joined query (active set x meals) on a miss, on the same session (and
+        # pooled connection) an inline recompute uses, off the event loop
+        with stage_timer("recommendations", "read_active_set"):
+            stored_recommendations = await run_blocking(read_active_set, db, user_id)
+
         if stored_recommendations:
-    # Format stored recommendations
-            recommendations_list = []
-            for rec in stored_recommendations:
-                meal = db.query(Meal).filter(Meal.meal_id == rec.meal_id).first()
-                print(meal.veg_non)
-                if meal:
-                    recommendations_list.append({
-                        "meal_id": meal.meal_id,
-                        "name": meal.name,
-                        "nutrient": meal.nutrient,
-                        "disease": meal.disease,
-                        "diet": meal.diet,
-                        "is_vegetarian": True if meal.veg_non == 0 else False,
-                        "reason": rec.recommendation_reason
-                    })
-            
-            return {"user_id": user_id, "recommendations": recommendations_list}
-
-            
-    # Generate fresh recommendations
-    recommendations = hybrid_recommendation(db, user_id, top_n)
+            # Format stored recommendations
+            recommendations_list = [
+                {
+                    "meal_id": rec.meal_id,
+                    "name": rec.name,
+                    "nutrient": rec.nutrient,
+                    "disease": rec.disease,
+                    "diet": rec.diet,
+                    "is_vegetarian": True if rec.veg_non == 0 else False,
+                    "reason": rec.recommendation_reason
+                }
+                for rec in stored_recommendations
+            ]
+            payload = {"user_id": user_id, "recommendations": recommendations_list}
+
+            oldest = min(rec.created_at for rec in stored_recommendations)
+            if oldest > recent_time:
+                # Never serve the set from cache past the point it stops counting as recent
+                recommendation_cache.set(
+                    user_id, payload, ttl=(oldest - recent_time).total_seconds(), generation=generation
+                )
+            else:
+                # ✅ Stale: serve it now, recompute in the background (coalesced per user)
+                recommendation_jobs.enqueue(user_id)
+            return payload
+
+    # Generate fresh recommendations (CPU + sync DB work runs on the bounded thread pool)
+    recommendations = await run_blocking(hybrid_recommendation, db, user_id, top_n)
     
     if isinstance(recommendations, dict) and "error" in recommendations:
         raise HTTPException(status_code=404, detail=recommendations["error"])
     
     # Store the new recommendations
-    store_recommendations(db, user_id, recommendations)
+    await run_blocking(store_recommendations, db, user_id, recommendations)
     
     return {"user_id": user_id, "recommendations": recommendations}
 
 
+def read_active_set(db: Session, user_id: int) -> list:
+    """
+    The user's active recommendation set joined with the meal details.
+    """
+    return db.execute(
+        active_recommendations_query(
+            user_id,
+            Meal.meal_id, Meal.name, Meal.nutrient, Meal.disease, Meal.diet, Meal.veg_non,
+            Recommendation.recommendation_reason, Recommendation.created_at
+        ).join(Meal, Meal.meal_id == Recommendation.meal_id)
+    ).all()
+
+
 # ✅ Define Pydantic model to accept JSON body
 class InteractionRequest(BaseModel):
     user_id: int
@@ -88,7 +127,6 @@ class InteractionRequest(BaseModel):
 @router.post("/interact")
 async def interact_with_meal(
     request: InteractionRequest, 
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """
@@ -99,6 +137,22 @@ async def interact_with_meal(
     if request.action not in valid_actions:
         raise HTTPException(status_code=400, detail="Invalid action. Choose from 'like', 'dislike', 'buy', or 'rate'.")
 
+    user_disease = await run_blocking(save_interaction, db, request)
+    recommendation_cache.invalidate(request.user_id)
+
+    # Update recommendations for the current user
+    await run_blocking(refresh_interacting_user, db, request.user_id)
+    
+    # Update recommendations for users with similar disease history on the job queue
+    # (coalesced per user, computed in worker processes with their own sessions)
+    await run_blocking(enqueue_similar_users, db, request.user_id, user_disease)
+
+    return {"message": f"Meal {request.meal_id} {request.action}d successfully!", "action": request.action}
+
+def save_interaction(db: Session, request: InteractionRequest) -> str:
+    """
+    Upserts the user's activity row for the meal and returns the user's disease.
+    """
     # Get the current user's disease history
     user = db.query(User).filter(User.user_id == request.user_id).first()
     if not user:
@@ -136,22 +190,21 @@ async def interact_with_meal(
 
     db.commit()
 
-    # Update recommendations for the current user
-    recommendations = hybrid_recommendation(db, request.user_id)
+    # ✅ Keep the in-memory interaction model current without rescanning the table
+    get_interaction_model(db).record(existing_activity)
+    get_popularity_store(db).record(existing_activity, user.disease)
+
+    return user.disease
+
+def refresh_interacting_user(db: Session, user_id: int):
+    """
+    Regenerates and stores recommendations for the user who just interacted.
+    """
+    recommendations = hybrid_recommendation(db, user_id)
     for rec in recommendations:
         if "is_vegetarian" not in rec and "diet" in rec:
             rec["is_vegetarian"] = "vegetarian" in rec["diet"].lower() if rec["diet"] else False
-    store_recommendations(db, request.user_id, recommendations)
-    
-    # Update recommendations for users with similar disease history in the background
-    background_tasks.add_task(
-        update_recommendations_for_similar_users, 
-        db=db, 
-        user_id=request.user_id, 
-        user_disease=user.disease
-    )
-
-    return {"message": f"Meal {request.meal_id} {request.action}d successfully!", "action": request.action}
+    store_recommendations(db, user_id, recommendations)
 
 @router.post("/exercise/{user_id}")
 async def recommend_exercises(user_id: int, exercise_request: ExerciseRequest, db: Session = Depends(get_db)):
@@ -173,70 +226,30 @@ async def recommend_exercises(user_id: int, exercise_request: ExerciseRequest, d
         else:
             bmi_category = "Obese"
 
-        # Load exercise data using pd.read_csv
+        # ✅ Dataset and trained model are loaded once; a request only predicts and filters
         try:
-            exercise_df = pd.read_csv("/app/data/cleaned/cleaned_exercise.csv")
+            with stage_timer("recommend_exercises", "load_model"):
+                engine = await run_blocking(exercise_registry.get)
         except FileNotFoundError:
             raise HTTPException(status_code=500, detail="Exercise data file not found")
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error loading exercise data: {str(e)}")
 
-
-        from sklearn.ensemble import RandomForestRegressor
-        from sklearn.preprocessing import StandardScaler
-
-        # Train model - Correct the column names to match the exercise dataset
-        X_train = exercise_df[["bmi"]]
-        y_train = exercise_df["exercise_intensity"]
-
-        scaler = StandardScaler()
-        X_train_scaled = scaler.fit_transform(X_train)
-
-        model = RandomForestRegressor(n_estimators=100, random_state=42)
-        model.fit(X_train_scaled, y_train)
-
-        user_features = np.array([[bmi]])
-        user_features_scaled = scaler.transform(user_features)
-        predicted_intensity = model.predict(user_features_scaled)[0]
-
-        feature_importance = model.feature_importances_
-
-        intensity_range = (max(0, predicted_intensity - 1), min(10, predicted_intensity + 1))
-
-        # Filter exercises based on the predicted intensity range
-        filtered_exercises = exercise_df[
-            exercise_df['exercise_intensity'].between(intensity_range[0], intensity_range[1])
-        ]
-
-        if len(filtered_exercises) < 5:
-            intensity_range = (max(0, predicted_intensity - 2), min(10, predicted_intensity + 2))
-            filtered_exercises = exercise_df[
-                exercise_df['exercise_intensity'].between(intensity_range[0], intensity_range[1])
-            ]
-
-        exercise_types = filtered_exercises['exercise'].unique()
-        recommended_exercises = pd.DataFrame()
-
-        for exercise_type in exercise_types:
-            type_exercises = filtered_exercises[filtered_exercises['exercise'] == exercise_type]
-            if not type_exercises.empty:
-                type_exercises['intensity_diff'] = abs(type_exercises['exercise_intensity'] - predicted_intensity)
-                type_exercises = type_exercises.sort_values('intensity_diff').head(2)
-                recommended_exercises = pd.concat([recommended_exercises, type_exercises])
-
-        recommended_exercises = recommended_exercises.head(5)
+        with stage_timer("recommend_exercises", "predict"):
+            result = await run_blocking(engine.recommend, bmi)
+        predicted_intensity = result["predicted_intensity"]
 
         exercise_list = []
-        for _, exercise in recommended_exercises.iterrows():
+        for exercise in result["exercises"]:
             exercise_info = {
-                "name": exercise['exercise'],
+                "name": exercise['name'],
                 "type": "Not available",
-                "duration": int(exercise['duration']),
-                "calories_burned": float(exercise['calories_burn']),
+                "duration": exercise['duration'],
+                "calories_burned": exercise['calories_burned'],
                 "description": "Not available",
-                "intensity": str(exercise['exercise_intensity']),
+                "intensity": str(exercise['intensity']),
                 "bmi_range": bmi_category,
-                "match_score": float(100 - (exercise['intensity_diff'] * 10)) if 'intensity_diff' in exercise else 95.0
+                "match_score": float(100 - (exercise['intensity_diff'] * 10))
             }
             exercise_list.append(exercise_info)
 
@@ -246,69 +259,13 @@ async def recommend_exercises(user_id: int, exercise_request: ExerciseRequest, d
             "bmi": bmi,
             "bmi_category": bmi_category,
             "predicted_intensity": float(predicted_intensity),
-            "feature_importance": {
-                "bmi": float(feature_importance[0])
-            },
+            "feature_importance": result["feature_importance"],
             "recommendations": exercise_recommendations
         }
     except Exception as e:
         print(f"Error recommending exercises: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error recommending exercises: {str(e)}")
     
-def store_recommendations(db: Session, user_id: int, recommendations: list):
-    """
-    Store recommendations in the database
-    """
-    try:
-        # Clear existing recommendations for the user
-        db.query(Recommendation).filter(Recommendation.user_id == user_id).delete()
-        
-        # Store new recommendations
-        for rec in recommendations:
-            meal_id = rec["meal_id"]
-            
-            new_recommendation = Recommendation(
-                user_id=user_id,
-                meal_id=meal_id,
-                recommendation_reason="Based on your preferences and similar users",
-                created_at=datetime.utcnow()
-            )
-            db.add(new_recommendation)
-        
-        db.commit()
-    except Exception as e:
-        db.rollback()
-        print(f"Error storing recommendations for user {user_id}: {str(e)}")
-
-def update_recommendations_for_similar_users(db: Session, user_id: int, user_disease: str):
-    """
-    Background task to update recommendations for users with similar disease history.
-    """
-    # Find users with similar disease history
-    similar_users = db.query(User).filter(
-        User.user_id != user_id,  # Exclude the current user
-        User.disease == user_disease  # Match the exact disease
-    ).all()
-    
-    # Add the current user to the list to update their recommendations too
-    current_user = db.query(User).filter(User.user_id == user_id).first()
-    if current_user:
-        similar_users.append(current_user)
-    
-    # Generate new recommendations for each similar user
-    for similar_user in similar_users:
-        try:
-            # Generate recommendations using the hybrid recommender
-            recommendations = hybrid_recommendation(db, similar_user.user_id)
-            
-            # Store the recommendations
-            store_recommendations(db, similar_user.user_id, recommendations)
-            
-            print(f"Updated recommendations for user {similar_user.user_id} with disease {user_disease}")
-        except Exception as e:
-            print(f"Error updating recommendations for user {similar_user.user_id}: {str(e)}")
-
-
 # Add a new endpoint to refresh recommendations on login
 @router.post("/refresh-recommendations/{user_id}")
 async def refresh_user_recommendations(
@@ -320,10 +277,10 @@ async def refresh_user_recommendations(
     """
     try:
         # Generate fresh recommendations
-        recommendations = hybrid_recommendation(db, user_id)
+        recommendations = await run_blocking(hybrid_recommendation, db, user_id)
         
         # Store the recommendations
-        store_recommendations(db, user_id, recommendations)
+        await run_blocking(store_recommendations, db, user_id, recommendations)
         
         return {"message": "Recommendations refreshed successfully"}
     except Exception as e:
@@ -339,24 +296,25 @@ async def rerun_recommendations(
     """
     try:
         # Fetch user data
-        user = db.query(User).filter(User.user_id == user_id).first()
+        user = await run_blocking(db.get, User, user_id)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
 
+        # Create exercise request with the user's data now: storing recommendations commits,
+        # which expires `user` (reloading it here would be a blocking query on the event loop)
+        exercise_request = ExerciseRequest(
+            height=user.height,
+            weight=user.weight
+        )
+
         # Rerun meal recommendations
-        meal_recommendations = hybrid_recommendation(db, user_id, top_n=10)
+        meal_recommendations = await run_blocking(hybrid_recommendation, db, user_id, top_n=10)
         if isinstance(meal_recommendations, dict) and "error" in meal_recommendations:
             raise HTTPException(status_code=500, detail=meal_recommendations["error"])
 
         # Store meal recommendations in the database
-        store_recommendations(db, user_id, meal_recommendations)
+        await run_blocking(store_recommendations, db, user_id, meal_recommendations)
 
-        # Create exercise request with updated user data
-        exercise_request = ExerciseRequest(
-            height=user.height,
-            weight=user.weight
-        )
-        
         # Rerun exercise recommendations
         exercise_recommendations = await recommend_exercises(
             user_id=user_id, 
@@ -371,3 +329,17 @@ async def rerun_recommendations(
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to rerun recommendations: {str(e)}")
+
+@router.get("/jobs/stats")
+async def recommendation_job_stats():
+    """
+    Queue depth, coalescing and latency of background recommendation recomputation.
+    """
+    return recommendation_jobs.stats()
+
+@router.get("/cache/stats")
+async def recommendation_cache_stats():
+    """
+    Hit/miss counters of the per-user recommendation payload cache.
+    """
+    return recommendation_cache.stats()
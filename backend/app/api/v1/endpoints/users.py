@@ -1,15 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.concurrency import run_blocking
+from app.core.database import get_db, get_async_db
+from app.repositories.user_repository import get_user_by_id
 from app.services.user_service import create_user, get_user_by_username, update_user, login_user
 from pydantic import BaseModel
 from app.services.llm_service import LLMService
 from app.models.user import User
-from passlib.context import CryptContext
+from app.services.recommender.popularity import popularity_store
+from app.core.security import hash_password_async, password_hashing_stats, verify_password_async
 
 router = APIRouter()
-# Define password context at module level
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 class SignupRequest(BaseModel):
     username: str
@@ -44,11 +47,12 @@ class ChangePasswordRequest(BaseModel):
     new_password: str
 
 @router.get("/profile/{user_id}", response_model=UserProfileResponse)
-async def get_user_profile(user_id: int, db: Session = Depends(get_db)):
+async def get_user_profile(user_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Fetch user profile data by user_id.
     """
-    user = db.query(User).filter(User.user_id == user_id).first()
+    result = await db.execute(select(User).where(User.user_id == user_id))
+    user = result.scalars().first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -67,12 +71,12 @@ async def signup(user: SignupRequest, db: Session = Depends(get_db)):
 
     print("Received Data:", user.dict())  # ✅ Debugging
     
-    db_user = get_user_by_username(db, user.username)
+    db_user = await run_blocking(get_user_by_username, db, user.username)
     if db_user:
         raise HTTPException(status_code=400, detail="Username already exists")
     
     # ✅ Call LLM to parse disease and recommend diet
-    disease_diet_data = LLMService.process_disease_history(user.disease)
+    disease_diet_data = await LLMService.process_disease_history(user.disease)
     
     parsed_diseases = ", ".join(disease_diet_data["diseases"])
     recommended_diet = disease_diet_data["recommended_diet"]
@@ -84,7 +88,7 @@ async def signup(user: SignupRequest, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail="No diseases detected. The input may be invalid or out of scope for the current system.")
 
     # ✅ Insert into database with LLM-processed disease & diet
-    result = create_user(
+    result = await create_user(
         db, user.username, user.password, user.email, user.veg_non, 
         user.height, user.weight, parsed_diseases, recommended_diet, user.gender
     )
@@ -99,7 +103,7 @@ async def login(user: LoginRequest, db: Session = Depends(get_db)):
     """
     User login endpoint that triggers recommendations.
     """
-    result = login_user(db, user.username, user.password)
+    result = await login_user(db, user.username, user.password)
     
     if "error" in result:
         raise HTTPException(status_code=401, detail=result["error"])
@@ -109,7 +113,7 @@ async def login(user: LoginRequest, db: Session = Depends(get_db)):
 @router.put("/update-user/{user_id}")
 async def update_user_details(user_id: int, user_update: UserUpdateRequest, db: Session = Depends(get_db)):
     # Process disease history and get recommended diet
-    disease_diet_data = LLMService.process_disease_history(user_update.disease)
+    disease_diet_data = await LLMService.process_disease_history(user_update.disease)
     
     parsed_diseases = ", ".join(disease_diet_data["diseases"])
     recommended_diet = disease_diet_data["recommended_diet"]
@@ -118,10 +122,13 @@ async def update_user_details(user_id: int, user_update: UserUpdateRequest, db:
         raise HTTPException(status_code=400, detail="No diseases detected. The input may be invalid or out of scope for the current system.")
 
     # Update user with parsed diseases and recommended diet
-    updated_user = update_user(db, user_id, user_update.height, user_update.weight, parsed_diseases, recommended_diet)
+    updated_user = await run_blocking(update_user, db, user_id, user_update.height, user_update.weight, parsed_diseases, recommended_diet)
     
     if not updated_user:
         raise HTTPException(status_code=404, detail="User not found")
+
+    # ✅ Same-disease popularity counts follow the user's new disease (other workers: on their next sync)
+    popularity_store.set_user_disease(user_id, parsed_diseases)
     
     return {
         "message": "User updated successfully",
@@ -137,17 +144,22 @@ async def change_password(user_id: int, password_data: ChangePasswordRequest, db
     Change user password endpoint.
     Requires old password verification before updating to new password.
     """
-    # Find the user
-    user = db.query(User).filter(User.user_id == user_id).first()
+    user = await run_blocking(get_user_by_id, db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    # Verify old password using passlib
-    if not pwd_context.verify(password_data.old_password, user.password_hash):
+    # Verify old password and hash the new one on the password-hashing pool
+    if not await verify_password_async(password_data.old_password, user.password_hash):
         raise HTTPException(status_code=400, detail="Incorrect old password")
     
-    # Update password using passlib
-    user.password_hash = pwd_context.hash(password_data.new_password)
-    db.commit()
+    user.password_hash = await hash_password_async(password_data.new_password)
+    await run_blocking(db.commit)
     
-    return {"message": "Password changed successfully"}
\ No newline at end of file
+    return {"message": "Password changed successfully"}
+
+@router.get("/password-hashing/stats")
+async def password_hashing_metrics():
+    """
+    Hash/verify latency and queue wait of the password-hashing pool.
+    """
+    return password_hashing_stats()
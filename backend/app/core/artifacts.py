@@ -0,0 +1,27 @@
+import os
+import pickle
+
+
+def save_pickle(obj, path: str):
+    """
+    Pickles `obj` to `path` through a temporary file and an atomic rename, so other
+    workers never read a partial file. Raises OSError on failure.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def load_pickle(path: str):
+    """
+    Unpickles `path`, or returns None if it is missing or unreadable.
+    """
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        return None
@@ -0,0 +1,23 @@
+from functools import partial
+import anyio
+from app.core.config import settings
+from app.core.profiling import current_profile
+
+# Bounded pool for blocking work (sync DB sessions, CPU-heavy recommenders) called from async endpoints
+_blocking_limiter = None
+
+def _get_blocking_limiter() -> anyio.CapacityLimiter:
+    global _blocking_limiter
+    if _blocking_limiter is None:
+        _blocking_limiter = anyio.CapacityLimiter(settings.BLOCKING_THREADPOOL_SIZE)
+    return _blocking_limiter
+
+async def run_blocking(func, *args, **kwargs):
+    """
+    Runs a blocking function on the bounded worker thread pool so the event loop stays free.
+    """
+    call = partial(func, *args, **kwargs)
+    profile = current_profile()
+    if profile is not None:
+        call = partial(profile.run_in_thread, call)  # ✅ Profiled request: include its worker-thread work
+    return await anyio.to_thread.run_sync(call, limiter=_get_blocking_limiter())
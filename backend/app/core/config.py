@@ -5,9 +5,44 @@ load_dotenv()
 
 class Settings(BaseSettings):
     DATABASE_URL: str = os.getenv("DATABASE_URL")
+    DB_POOL_SIZE: int = 10  # Persistent connections per engine and worker process
+    DB_MAX_OVERFLOW: int = 20  # Extra connections opened under load (size + overflow >= BLOCKING_THREADPOOL_SIZE)
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0  # Max wait for a free connection before failing the request
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # Connections older than this are replaced (server-side idle timeouts)
+    DB_POOL_PRE_PING: bool = True  # Check connections on checkout and reconnect if stale
     SECRET_KEY: str = "your_secret_key_here"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60  # Token expires in 1 hour
+    BCRYPT_ROUNDS: int = 12  # bcrypt work factor for new password hashes (each +1 doubles the cost)
+    PASSWORD_HASH_WORKERS: int = 4  # Threads hashing/verifying passwords per worker (keep <= CPU cores)
     OPENAI_API_KEY:str = os.getenv("OPENAI_API_KEY")
+    OPENAI_BASE_URL: str = ""  # OpenAI-compatible endpoint (e.g. a local fake server); empty = api.openai.com
+    LLM_MAX_CONCURRENCY: int = 8  # Concurrent upstream LLM calls per worker
+    LLM_TIMEOUT_SECONDS: float = 20.0  # Per attempt
+    LLM_DEADLINE_SECONDS: float = 45.0  # Per call, across all retries
+    LLM_MAX_RETRIES: int = 2  # Retries on timeouts, connection errors, 429 and 5xx (jittered backoff)
+    LLM_BATCH_MAX_ITEMS: int = 5000  # Histories accepted by one batch parsing request
+    LLM_BATCH_PACK_SIZE: int = 10  # Histories packed into one LLM prompt by batch parsing
+    LLM_BATCH_PACK_MAX_CHARS: int = 6000  # Upper bound on the history text of one packed prompt
+    BLOCKING_THREADPOOL_SIZE: int = 16  # Max threads running blocking DB/recommender work per worker
+    RECOMMENDATION_JOB_WORKERS: int = 2  # Worker processes recomputing recommendations in the background
+    MODEL_CACHE_DIR: str = "cache"  # Persisted model artifacts (TF-IDF meal index, ...); relative to data/
+    DATA_DIR: str = ""  # Project data/ directory (default: found relative to the CWD or the code)
+    STARTUP_IMPORT_BUDGET_SECONDS: float = 3.0  # Max time to import app.main in a fresh interpreter
+    PROFILING_SECRET: str = ""  # Requests sending "X-Profile: <secret>" are profiled; empty = profiler not installed
+    PROFILE_DIR: str = "profiles"  # Where per-request .prof files are written; relative to data/
+    EXERCISE_DATA_PATH: str = "cleaned/cleaned_exercise.csv"  # Exercise dataset; relative to data/
+    MEAL_INDEX_CHECK_SECONDS: int = 60  # How often the meals table is checked for changes
+    SIMILARITY_METRIC: str = "pearson"  # "pearson" or "cosine" for collaborative filtering
+    INTERACTION_SYNC_SECONDS: int = 30  # How often a worker picks up interactions written by other workers
+    RECOMMENDATION_CACHE_SIZE: int = 10000  # Users whose formatted recommendations are cached per worker
+    RECOMMENDATION_CACHE_TTL_SECONDS: int = 300  # Upper bound on staleness of writes from other processes
+    RECOMMENDATION_SETS_KEPT: int = 0  # Superseded recommendation sets kept per user, besides the active one
+    LLM_CACHE_PATH: str = ""  # SQLite file for cached LLM results (default: MODEL_CACHE_DIR/llm_cache.sqlite3)
+    LLM_CACHE_TTL_SECONDS: int = 30 * 24 * 3600  # Cached disease parses / diet suggestions expire after 30 days
+    LLM_CACHE_MAX_ENTRIES: int = 50000  # Least recently used entries are evicted beyond this
+    LLM_CACHE_TOUCH_INTERVAL_SECONDS: int = 3600  # A hit refreshes an entry's access time at most this often
+    LLM_CACHE_EVICT_INTERVAL_SECONDS: int = 60  # Expired / excess entries are pruned at most this often per worker
+    DISEASE_MATCHER_MAX_UNMATCHED_WORDS: int = 1  # Histories with more unexplained words go to the LLM
 
 
 settings = Settings()
\ No newline at end of file
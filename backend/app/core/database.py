@@ -1,12 +1,116 @@
-from sqlalchemy import create_engine
+import threading
+import time
+from sqlalchemy import create_engine, exc
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.core.config import settings
 # Database URL
 DATABASE_URL = settings.DATABASE_URL  # Load from settings
 
+
+class PoolMetrics:
+    """
+    Checkout wait times and peak usage of one engine's connection pool.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {
+            "checkouts": 0, "timeouts": 0, "total_wait_seconds": 0.0, "max_wait_seconds": 0.0,
+            "peak_checked_out": 0, "peak_overflow": 0,
+        }
+
+    def record(self, pool, wait_seconds: float, timed_out: bool = False):
+        with self._lock:
+            self._stats["timeouts" if timed_out else "checkouts"] += 1
+            self._stats["total_wait_seconds"] += wait_seconds
+            self._stats["max_wait_seconds"] = max(self._stats["max_wait_seconds"], wait_seconds)
+            self._stats["peak_checked_out"] = max(self._stats["peak_checked_out"], pool.checkedout())
+            self._stats["peak_overflow"] = max(self._stats["peak_overflow"], pool.overflow())
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        attempts = stats["checkouts"] + stats["timeouts"]
+        stats["avg_wait_seconds"] = stats["total_wait_seconds"] / attempts if attempts else 0.0
+        return stats
+
+
+class _InstrumentedPool:
+    """
+    Times every checkout, including waiting for a free connection, pre-ping and connecting.
+    """
+    metrics = None  # PoolMetrics shared by the pool and the pools that replace it on dispose()
+
+    def __init__(self, creator, pool_size: int = 5, max_overflow: int = 10, **kwargs):
+        super().__init__(creator, pool_size=pool_size, max_overflow=max_overflow, **kwargs)
+        self.max_overflow = max_overflow  # As configured (-1 = unlimited), for pool_status
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.record(self, time.perf_counter() - started, timed_out=True)
+            raise
+        self.metrics.record(self, time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPool, QueuePool):
+    pass
+
+
+class InstrumentedAsyncAdaptedQueuePool(_InstrumentedPool, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_options(url: str, poolclass) -> dict:
+    """
+    Engine arguments for the configured pool; in-memory SQLite keeps SQLAlchemy's single-connection pool.
+    """
+    if url.startswith("sqlite") and (":memory:" in url or url.rstrip("/").endswith(":")):
+        return {}
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def pool_status(engine) -> dict:
+    """
+    Current pool occupancy plus the checkout metrics of an engine.
+    """
+    pool = engine.pool
+    if not isinstance(pool, _InstrumentedPool):
+        return {"pool": type(pool).__name__, "instrumented": False, "status": pool.status()}
+    return {
+        "pool": type(pool).__name__,
+        "instrumented": True,
+        "size": pool.size(),
+        "max_overflow": pool.max_overflow,
+        "capacity": pool.size() + max(pool.max_overflow, 0),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        **pool.metrics.snapshot(),
+    }
+
+
 # Create SQLAlchemy Engine
-engine = create_engine(DATABASE_URL)
+engine = create_engine(DATABASE_URL, **pool_options(DATABASE_URL, InstrumentedQueuePool))
+if isinstance(engine.pool, _InstrumentedPool):
+    engine.pool.metrics = PoolMetrics()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Base Model
@@ -19,3 +123,50 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# ✅ Async engine/session for endpoints that can await the database directly.
+# Created on first use so the async driver (asyncpg) is only needed when it is used.
+_async_engine = None
+_AsyncSessionLocal = None
+
+def to_async_url(url: str) -> str:
+    """
+    Maps a sync database URL to its async driver (postgresql -> asyncpg, sqlite -> aiosqlite).
+    """
+    for prefix, async_prefix in (
+        ("postgresql+psycopg2://", "postgresql+asyncpg://"),
+        ("postgresql://", "postgresql+asyncpg://"),
+        ("postgres://", "postgresql+asyncpg://"),
+        ("sqlite://", "sqlite+aiosqlite://"),
+    ):
+        if url.startswith(prefix):
+            return async_prefix + url[len(prefix):]
+    return url
+
+def get_async_sessionmaker():
+    global _async_engine, _AsyncSessionLocal
+    if _AsyncSessionLocal is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        async_url = to_async_url(DATABASE_URL)
+        _async_engine = create_async_engine(async_url, **pool_options(async_url, InstrumentedAsyncAdaptedQueuePool))
+        if isinstance(_async_engine.pool, _InstrumentedPool):
+            _async_engine.pool.metrics = PoolMetrics()
+        _AsyncSessionLocal = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+    return _AsyncSessionLocal
+
+def database_pool_stats() -> dict:
+    """
+    Pool metrics of the sync engine and (once created) the async engine of this worker.
+    """
+    return {
+        "sync": pool_status(engine),
+        "async": pool_status(_async_engine) if _async_engine is not None else None,
+        "blocking_threads": settings.BLOCKING_THREADPOOL_SIZE,
+    }
+
+# Dependency for getting an async DB Session
+async def get_async_db():
+    async with get_async_sessionmaker()() as db:
+        yield db
@@ -0,0 +1,167 @@
+import re
+import threading
+from collections import deque
+from typing import Dict, Iterable, List
+
+# Extra surface forms for the disease vocabulary tokens (the tokens themselves always match,
+# with "_" read as a space). Entries for tokens missing from the vocabulary are ignored.
+DISEASE_SYNONYMS = {
+    "anemia": ["anaemia", "anemic", "anaemic", "iron deficiency", "low hemoglobin", "low haemoglobin"],
+    "cancer": ["tumor", "tumour", "carcinoma", "leukemia", "leukaemia", "lymphoma", "malignancy"],
+    "diabeties": [
+        "diabetes", "diabetic", "type 1 diabetes", "type 2 diabetes", "t1d", "t2d",
+        "high blood sugar", "diabetes mellitus",
+    ],
+    "eye_disease": ["eye problems", "glaucoma", "cataract", "cataracts", "macular degeneration", "retinopathy"],
+    "goitre": ["goiter", "enlarged thyroid", "thyroid enlargement"],
+    "heart_disease": [
+        "heart problems", "heart condition", "cardiac disease", "cardiovascular disease",
+        "coronary artery disease", "heart failure", "heart attack",
+    ],
+    "hypertension": ["high blood pressure", "high bp", "htn", "hypertensive", "elevated blood pressure"],
+    "kidney_disease": [
+        "kidney problems", "renal disease", "chronic kidney disease", "ckd", "kidney failure",
+        "renal failure", "nephropathy",
+    ],
+    "obesity": ["obese", "morbid obesity"],
+    "pregnancy": ["pregnant", "expecting a baby"],
+    "rickets": ["rachitis"],
+    "scurvy": ["vitamin c deficiency"],
+}
+
+# Words that change the meaning of a mention (negation, someone else's condition,
+# uncertainty): their presence always defers to the LLM
+CUE_WORDS = {
+    "no", "not", "never", "without", "denies", "denied", "negative", "free", "ruled",
+    "family", "mother", "father", "mom", "dad", "parents", "grandmother", "grandfather",
+    "sister", "brother", "son", "daughter", "wife", "husband",
+    "suspected", "possible", "possibly", "maybe", "might", "risk", "borderline", "pre",
+    "former", "formerly", "previously", "cured", "recovered", "remission",
+}
+
+# Filler words that don't count as unexplained text
+STOP_WORDS = {
+    "i", "im", "ive", "me", "my", "a", "an", "the", "and", "or", "with", "of", "from", "for",
+    "have", "has", "had", "am", "is", "are", "was", "been", "being", "also", "both", "as",
+    "suffer", "suffers", "suffering", "diagnosed", "diagnosis", "living", "condition",
+    "conditions", "disease", "diseases", "history", "medical", "patient", "known", "mild",
+    "moderate", "severe", "chronic", "since", "currently", "yes",
+}
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def normalize(text: str) -> str:
+    """
+    Lowercase, "_"/punctuation to spaces, single spaces, padded so patterns match whole words.
+    """
+    return " " + " ".join(_NON_WORD.sub(" ", text.lower()).split()) + " "
+
+
+class DiseaseMatch:
+    """
+    Result of a local match: diseases in order of first mention, and whether it is
+    confident enough to skip the LLM.
+    """
+    __slots__ = ("diseases", "confident", "reason")
+
+    def __init__(self, diseases: List[str], confident: bool, reason: str):
+        self.diseases = diseases
+        self.confident = confident
+        self.reason = reason  # "matched", "no_match", "cue_word" or "unmatched_text"
+
+
+class DiseaseMatcher:
+    """
+    Multi-pattern (Aho-Corasick) matcher from free-text histories to the disease
+    vocabulary, in one pass over the text regardless of the number of patterns.
+    """
+
+    def __init__(self, vocabulary: Iterable[str], synonyms: Dict[str, List[str]] = None, max_unmatched_words: int = 1):
+        self.max_unmatched_words = max_unmatched_words
+        self._goto = [{}]  # node -> {char: node}
+        self._fail = [0]
+        self._output = [[]]  # node -> [(pattern length, disease)]
+        self._lock = threading.Lock()
+        self._stats = {"lookups": 0, "matched": 0, "no_match": 0, "cue_word": 0, "unmatched_text": 0}
+
+        synonyms = synonyms or {}
+        for disease in vocabulary:
+            for surface in [disease, *synonyms.get(disease, [])]:
+                pattern = normalize(surface)
+                if pattern.strip():
+                    self._add(pattern, disease)
+        self._link()
+
+    def match(self, text: str) -> DiseaseMatch:
+        normalized = normalize(text)
+        found = {}  # disease -> first start offset
+        covered = bytearray(len(normalized))
+
+        node = 0
+        for end, char in enumerate(normalized):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            for length, disease in self._output[node]:
+                start = end - length + 1
+                found.setdefault(disease, start)
+                covered[start:end + 1] = b"\x01" * length
+
+        words = normalized.split()
+        diseases = sorted(found, key=found.get)
+        if not diseases:
+            reason = "no_match"
+        elif any(word in CUE_WORDS for word in words):
+            reason = "cue_word"
+        else:
+            unmatched = [
+                word for word, offset in self._word_offsets(normalized)
+                if not covered[offset] and word not in STOP_WORDS
+            ]
+            reason = "unmatched_text" if len(unmatched) > self.max_unmatched_words else "matched"
+
+        with self._lock:
+            self._stats["lookups"] += 1
+            self._stats[reason] += 1
+        return DiseaseMatch(diseases, reason == "matched", reason)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["fast_path_hit_rate"] = stats["matched"] / stats["lookups"] if stats["lookups"] else 0.0
+        return stats
+
+    @staticmethod
+    def _word_offsets(normalized: str):
+        offset = 1
+        for word in normalized.split():
+            yield word, offset
+            offset += len(word) + 1
+
+    def _add(self, pattern: str, disease: str):
+        node = 0
+        for char in pattern:
+            child = self._goto[node].get(char)
+            if child is None:
+                child = len(self._goto)
+                self._goto[node][char] = child
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = child
+        if (len(pattern), disease) not in self._output[node]:
+            self._output[node].append((len(pattern), disease))
+
+    def _link(self):
+        # Breadth-first failure links; each node also inherits the outputs of its failure node
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+                queue.append(child)
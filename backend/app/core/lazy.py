@@ -0,0 +1,53 @@
+import threading
+import time
+
+
+class Lazy:
+    """
+    Thread-safe, build-once holder for an expensive resource (data files, clients,
+    heavy imports). The factory runs on first `get()`, never at import time.
+    """
+
+    instances = []  # Every holder, for the startup/import report
+
+    def __init__(self, factory, name: str = None):
+        self.name = name or getattr(factory, "__name__", "resource")
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._value = None
+        self._loaded = False
+        self.load_seconds = None
+        Lazy.instances.append(self)
+
+    def get(self):
+        if self._loaded:
+            return self._value
+        with self._lock:
+            if not self._loaded:
+                started = time.perf_counter()
+                self._value = self._factory()
+                self.load_seconds = time.perf_counter() - started
+                self._loaded = True
+        return self._value
+
+    async def aget(self):
+        """
+        `get()` for async code: a first (blocking) load runs on the worker thread pool.
+        """
+        if self._loaded:
+            return self._value
+        from app.core.concurrency import run_blocking
+        return await run_blocking(self.get)
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def reset(self):
+        """
+        Drops the value so the next `get()` rebuilds it (e.g. after the data files change).
+        """
+        with self._lock:
+            self._value = None
+            self._loaded = False
+            self.load_seconds = None
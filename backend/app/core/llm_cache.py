@@ -0,0 +1,182 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterable, Optional
+from app.core.concurrency import run_blocking
+from app.core.config import settings
+from app.core.paths import resolve_output_path
+
+
+def normalize_text(text: str) -> str:
+    """
+    Case- and whitespace-insensitive form of an LLM input, so trivially different
+    inputs share a cache entry.
+    """
+    return " ".join(text.split()).lower()
+
+
+def vocabulary_version(terms: Iterable[str]) -> str:
+    """
+    Short, order-independent hash of a vocabulary (e.g. the valid disease list).
+    """
+    digest = hashlib.sha256("\n".join(sorted(terms)).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class LLMResponseCache:
+    """
+    Content-addressed cache of LLM results, persisted in a local SQLite file so it
+    survives restarts and is shared by all workers on the host.
+
+    Entries expire after `ttl` seconds; beyond `max_entries` the least recently
+    used entries are evicted. Lookups never raise: a broken cache is a miss.
+
+    Hits only write when an entry's access time is more than `touch_interval` seconds
+    old, and eviction runs at most every `evict_interval` seconds, so `max_entries`
+    may be exceeded briefly. Async code uses `aget`/`aset`, which run on the worker
+    thread pool.
+    """
+
+    def __init__(self, path: str, ttl: int, max_entries: int, touch_interval: int = 3600, evict_interval: int = 60):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.touch_interval = touch_interval
+        self.evict_interval = evict_interval
+        self._local = threading.local()  # One connection per thread
+        self._evict_lock = threading.Lock()
+        self._next_eviction = 0.0
+        self._stats_lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "errors": 0}
+
+    @staticmethod
+    def key(namespace: str, text: str, version: str, *extra: Optional[str]) -> str:
+        parts = [namespace, version, normalize_text(text), *(part or "" for part in extra)]
+        return hashlib.sha256("\x00".join(parts).encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+        now = time.time()
+        try:
+            db = self._connection()
+            row = db.execute(
+                "SELECT value, created_at, accessed_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and row[1] > now - self.ttl:
+                # ✅ Recency only needs to be coarse for LRU eviction: no write on most hits
+                if row[2] <= now - self.touch_interval:
+                    db.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+                self._count("hits")
+                return json.loads(row[0])
+        except (sqlite3.Error, OSError, ValueError) as e:
+            self._error("reading", e)
+        self._count("misses")
+        return None
+
+    def set(self, key: str, value):
+        now = time.time()
+        try:
+            db = self._connection()
+            db.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now),
+            )
+            self._count("writes")
+            if self._eviction_due(now):
+                self._evict(db, now)
+        except (sqlite3.Error, OSError, TypeError, ValueError) as e:
+            self._error("writing", e)
+
+    def get_many(self, keys: list) -> list:
+        return [self.get(key) for key in keys]
+
+    def set_many(self, items: list):
+        for key, value in items:
+            self.set(key, value)
+
+    async def aget(self, key: str):
+        return await run_blocking(self.get, key)
+
+    async def aset(self, key: str, value):
+        await run_blocking(self.set, key, value)
+
+    async def aget_many(self, keys: list) -> list:
+        """
+        Several lookups in one trip to the worker thread pool.
+        """
+        return await run_blocking(self.get_many, keys) if keys else []
+
+    async def aset_many(self, items: list):
+        if items:
+            await run_blocking(self.set_many, items)
+
+    def clear(self):
+        try:
+            self._connection().execute("DELETE FROM llm_cache")
+        except (sqlite3.Error, OSError) as e:
+            self._error("clearing", e)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def _eviction_due(self, now: float) -> bool:
+        with self._evict_lock:
+            if now < self._next_eviction:
+                return False
+            self._next_eviction = now + self.evict_interval
+            return True
+
+    def _evict(self, db: sqlite3.Connection, now: float):
+        evicted = db.execute("DELETE FROM llm_cache WHERE created_at <= ?", (now - self.ttl,)).rowcount
+        (count,) = db.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+        if count > self.max_entries:
+            evicted += db.execute(
+                "DELETE FROM llm_cache WHERE key IN "
+                "(SELECT key FROM llm_cache ORDER BY accessed_at LIMIT ?)",
+                (count - self.max_entries,),
+            ).rowcount
+        if evicted:
+            self._count("evictions", evicted)
+
+    def _connection(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Autocommit; WAL lets several workers read while one writes
+            db = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_accessed_at ON llm_cache (accessed_at)")
+            self._local.db = db
+        return db
+
+    def _count(self, name: str, amount: int = 1):
+        with self._stats_lock:
+            self._stats[name] += amount
+
+    def _error(self, action: str, error: Exception):
+        self._count("errors")
+        print(f"Error {action} LLM cache: {str(error)}")
+
+
+# Process-wide cache (the SQLite file is opened on first use)
+llm_cache = LLMResponseCache(
+    path=resolve_output_path(settings.LLM_CACHE_PATH or os.path.join(settings.MODEL_CACHE_DIR, "llm_cache.sqlite3")),
+    ttl=settings.LLM_CACHE_TTL_SECONDS,
+    max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+    touch_interval=settings.LLM_CACHE_TOUCH_INTERVAL_SECONDS,
+    evict_interval=settings.LLM_CACHE_EVICT_INTERVAL_SECONDS,
+)
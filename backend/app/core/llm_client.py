@@ -0,0 +1,148 @@
+import asyncio
+import hashlib
+import json
+import random
+import threading
+import time
+import weakref
+from app.core.config import settings
+from app.core.metrics import stage_timer
+
+
+class LLMUnavailableError(Exception):
+    """
+    The upstream LLM did not answer within the deadline (after retries).
+    """
+
+
+class _LoopState:
+    """
+    Per-event-loop state: asyncio primitives and the HTTP client can't be shared across loops.
+    """
+
+    def __init__(self, client, max_concurrency: int):
+        self.client = client
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.inflight = {}  # request key -> asyncio.Task of the single upstream call
+
+
+class LLMClient:
+    """
+    Async chat-completions client with a concurrency cap, per-call deadlines,
+    jittered retries and singleflight: concurrent identical requests share one
+    upstream call. Works against any OpenAI-compatible endpoint (`base_url`).
+    """
+
+    RETRY_BACKOFF_SECONDS = 0.5  # Base of the exponential backoff (full jitter)
+    MAX_BACKOFF_SECONDS = 8.0
+
+    def __init__(self, api_key: str, base_url: str = None, max_concurrency: int = 8,
+                 attempt_timeout: float = 20.0, deadline: float = 45.0, max_retries: int = 2):
+        self.api_key = api_key
+        self.base_url = base_url or None
+        self.max_concurrency = max_concurrency
+        self.attempt_timeout = attempt_timeout
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self._states = weakref.WeakKeyDictionary()  # event loop -> _LoopState
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "requests": 0, "coalesced": 0, "upstream_calls": 0, "retries": 0,
+            "timeouts": 0, "failures": 0, "total_upstream_seconds": 0.0,
+        }
+
+    async def chat(self, messages: list, model: str = "gpt-3.5-turbo") -> str:
+        """
+        Returns the completion text; raises LLMUnavailableError once the deadline or retries run out.
+        """
+        state = self._state()
+        key = hashlib.sha256(json.dumps([model, messages], sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+        self._count("requests")
+        task = state.inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._call_with_retries(state, messages, model))
+            state.inflight[key] = task
+            task.add_done_callback(lambda _, key=key: state.inflight.pop(key, None))
+        else:
+            self._count("coalesced")
+
+        # Shielded: one caller giving up must not cancel the call other callers wait on
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["inflight"] = sum(len(state.inflight) for state in list(self._states.values()))
+        stats["avg_upstream_seconds"] = (
+            stats["total_upstream_seconds"] / stats["upstream_calls"] if stats["upstream_calls"] else 0.0
+        )
+        return stats
+
+    async def _call_with_retries(self, state: _LoopState, messages: list, model: str) -> str:
+        import openai
+
+        retryable = (
+            asyncio.TimeoutError, openai.APITimeoutError, openai.APIConnectionError,
+            openai.RateLimitError, openai.InternalServerError,
+        )
+        deadline = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                async with state.semaphore:
+                    started = time.monotonic()
+                    self._count("upstream_calls")
+                    try:
+                        with stage_timer("llm", "upstream_attempt"):
+                            response = await asyncio.wait_for(
+                                state.client.chat.completions.create(model=model, messages=messages),
+                                timeout=min(self.attempt_timeout, max(deadline - started, 0.0)),
+                            )
+                    finally:
+                        self._count("total_upstream_seconds", time.monotonic() - started)
+                return response.choices[0].message.content.strip()
+            except retryable as e:
+                if isinstance(e, (asyncio.TimeoutError, openai.APITimeoutError)):
+                    self._count("timeouts")
+                backoff = random.uniform(0, min(self.MAX_BACKOFF_SECONDS, self.RETRY_BACKOFF_SECONDS * 2 ** attempt))
+                if attempt >= self.max_retries or time.monotonic() + backoff >= deadline:
+                    self._count("failures")
+                    raise LLMUnavailableError(f"LLM request failed after {attempt + 1} attempt(s): {e!r}") from e
+                attempt += 1
+                self._count("retries")
+                await asyncio.sleep(backoff)
+            except Exception:
+                self._count("failures")
+                raise
+
+    def _state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        state = self._states.get(loop)
+        if state is None:
+            import openai  # Heavy import, deferred to the first LLM call
+
+            client = openai.AsyncOpenAI(
+                api_key=self.api_key, base_url=self.base_url, max_retries=0, timeout=self.attempt_timeout
+            )
+            state = _LoopState(client, self.max_concurrency)
+            self._states[loop] = state
+        return state
+
+    def _count(self, name: str, amount=1):
+        with self._stats_lock:
+            self._stats[name] += amount
+
+
+# Process-wide client (connections and limits are per event loop)
+llm_client = LLMClient(
+    api_key=settings.OPENAI_API_KEY,
+    base_url=settings.OPENAI_BASE_URL,
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    attempt_timeout=settings.LLM_TIMEOUT_SECONDS,
+    deadline=settings.LLM_DEADLINE_SECONDS,
+    max_retries=settings.LLM_MAX_RETRIES,
+)
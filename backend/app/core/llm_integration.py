@@ -1,25 +1,85 @@
-import openai
-import pandas as pd
-from typing import List, Dict, Optional
+import asyncio
+import re
+from collections import defaultdict
+from typing import List, Dict, Optional, Set
 from app.core.config import settings
+from app.core.disease_matcher import DISEASE_SYNONYMS, DiseaseMatcher
+from app.core.lazy import Lazy
+from app.core.llm_client import llm_client
+from app.core.llm_cache import llm_cache, vocabulary_version
+from app.core.metrics import stage_timer
+from app.core.paths import resolve_data_path
 import ast
 
-# ✅ Initialize OpenAI client (New API format)
-client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
+# Preprocessed files (inside data/, resolved independently of the CWD)
+DIET_FILE_PATH = "cleaned/cleaned_meals.csv"
+USER_PROFILES_PATH = "cleaned/cleaned_user_profiles.csv"
 
-# Load preprocessed files
-DIET_FILE_PATH = "data/cleaned/cleaned_meals.csv"
-USER_PROFILES_PATH = "data/cleaned/cleaned_user_profiles.csv"
+# ✅ Vocabulary and indexes are built on first use (thread-safe), not at import:
+# pandas imports and CSV reads stay out of app startup and worker spawns
 
-# Load valid diseases from the user profile dataset
-user_profiles = pd.read_csv(USER_PROFILES_PATH)
-valid_diseases = set()
+def _load_valid_diseases() -> Set[str]:
+    """
+    Load valid diseases from the user profile dataset
+    """
+    import pandas as pd
+
+    user_profiles = pd.read_csv(resolve_data_path(USER_PROFILES_PATH))
+    valid_diseases = set()
+
+    for diseases in user_profiles["Disease"].dropna():
+        for disease in diseases.split():
+            valid_diseases.add(disease.strip())
+    return valid_diseases
+
+
+def _load_disease_diet_index() -> Dict[str, Set[str]]:
+    import pandas as pd
+
+    # Load preprocessed diet dataset (parsed once into the disease -> diets index)
+    return build_disease_diet_index(pd.read_csv(resolve_data_path(DIET_FILE_PATH)))
+
+
+_valid_diseases = Lazy(_load_valid_diseases, "valid_diseases")
+# Cached LLM results are only reused while the disease vocabulary is unchanged
+_vocabulary_version = Lazy(lambda: vocabulary_version(get_valid_diseases()), "vocabulary_version")
+# Local fast path: multi-pattern matcher over the same vocabulary (plus synonyms)
+_disease_matcher = Lazy(lambda: DiseaseMatcher(
+    get_valid_diseases(), DISEASE_SYNONYMS, max_unmatched_words=settings.DISEASE_MATCHER_MAX_UNMATCHED_WORDS
+), "disease_matcher")
+_disease_diet_index = Lazy(_load_disease_diet_index, "disease_diet_index")
+
+
+def get_valid_diseases() -> Set[str]:
+    return _valid_diseases.get()
 
-for diseases in user_profiles["Disease"].dropna():
-    for disease in diseases.split():
-        valid_diseases.add(disease.strip())
+def get_vocabulary_version() -> str:
+    return _vocabulary_version.get()
 
-def parse_disease_history(history: str, img_url: Optional[str] = None) -> List[str]:
+def get_disease_matcher() -> DiseaseMatcher:
+    return _disease_matcher.get()
+
+async def get_disease_matcher_async() -> DiseaseMatcher:
+    return await _disease_matcher.aget()
+
+def get_disease_diet_index() -> Dict[str, Set[str]]:
+    return _disease_diet_index.get()
+
+
+_LAZY_ATTRIBUTES = {
+    "valid_diseases": get_valid_diseases,
+    "VOCABULARY_VERSION": get_vocabulary_version,
+    "disease_matcher": get_disease_matcher,
+    "disease_diet_index": get_disease_diet_index,
+}
+
+def __getattr__(name):
+    # Backwards compatible module attributes, loaded on first access
+    if name in _LAZY_ATTRIBUTES:
+        return _LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+async def parse_disease_history(history: str, img_url: Optional[str] = None) -> List[str]:
     """
     Uses GPT-3.5-Turbo to extract diseases ONLY from the preprocessed user profile dataset.
     Supports both text and optional image input.
@@ -27,6 +87,12 @@ def parse_disease_history(history: str, img_url: Optional[str] = None) -> List[s
     if not history.strip():
         return []  # ✅ Handle empty history input gracefully
 
+    cache_key = llm_cache.key("parse_disease_history", history, await _vocabulary_version.aget(), img_url)
+    cached = await llm_cache.aget(cache_key)
+    if cached is not None:
+        return cached
+
+    valid_diseases = await _valid_diseases.aget()
     valid_diseases_str = ", ".join(valid_diseases)
 
     prompt = (
@@ -41,42 +107,119 @@ def parse_disease_history(history: str, img_url: Optional[str] = None) -> List[s
         if img_url:
             messages.append({"role": "user", "content": {"type": "image_url", "image_url": {"url": img_url}}})
 
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",  # ✅ Using GPT-3.5-Turbo
-            messages=messages
-        )
-
-        diseases = response.choices[0].message.content.strip()
+        # ✅ Async call: concurrency-capped, deadline-bound, retried, coalesced with identical requests
+        with stage_timer("llm", "parse_disease_history"):
+            diseases = await llm_client.chat(messages, model="gpt-3.5-turbo")  # ✅ Using GPT-3.5-Turbo
         print(diseases)
-        if not diseases:
-            return []  # ✅ Ensure a response is always returned
-
         parsed_diseases = [d.strip() for d in diseases.split(",") if d.strip() in valid_diseases]
 
-        return parsed_diseases if parsed_diseases else []
+        # ✅ Only successful calls are cached (an empty answer is still an answer)
+        await llm_cache.aset(cache_key, parsed_diseases)
+        return parsed_diseases
     
     except Exception as e:
         print("Error calling OpenAI:", e)
         return []  # ✅ Prevent crashes if OpenAI API fails
 
 
-# Load preprocessed diet dataset
-disease_diet_map = pd.read_csv(DIET_FILE_PATH)
+PACKED_PROMPT_HEADER = "Extract diseases from each of the following numbered medical histories."
+_PACKED_ANSWER_LINE = re.compile(r"^\s*(\d+)\s*[:.)-]\s*(.*)$")
+
 
-def recommend_diet(diseases: List[str]) -> str:
+async def parse_disease_history_pack(histories: List[str]) -> List[List[str]]:
+    """
+    Parses several text histories with a single LLM prompt; returns diseases in input order.
+    Cached histories are skipped, and any history the packed answer leaves out is parsed
+    on its own, so results match `parse_disease_history` one by one.
+    """
+    version = await _vocabulary_version.aget()
+    valid_diseases = await _valid_diseases.aget()
+    results = [None] * len(histories)
+    cache_keys = [llm_cache.key("parse_disease_history", history, version, None) for history in histories]
+
+    # ✅ All lookups in one hop off the event loop
+    lookups = [position for position, history in enumerate(histories) if history.strip()]
+    cached = dict(zip(lookups, await llm_cache.aget_many([cache_keys[position] for position in lookups])))
+
+    misses = []
+    for position in range(len(histories)):
+        diseases = cached[position] if position in cached else []
+        if diseases is None:
+            misses.append(position)
+        else:
+            results[position] = diseases
+
+    if len(misses) > 1:
+        numbered = "\n".join(
+            f"{number}. {' '.join(histories[position].split())}" for number, position in enumerate(misses, 1)
+        )
+        prompt = (
+            f"{PACKED_PROMPT_HEADER}\n\n{numbered}\n\n"
+            f"Only use diseases from this list: {', '.join(valid_diseases)}.\n"
+            f"Answer with one line per history formatted as \"<number>: <comma-separated diseases>\", "
+            f"leaving the list empty when none apply."
+        )
+        try:
+            with stage_timer("llm", "parse_disease_history_pack"):
+                answer = await llm_client.chat([{"role": "user", "content": prompt}], model="gpt-3.5-turbo")
+            answered = []
+            for line in answer.splitlines():
+                match = _PACKED_ANSWER_LINE.match(line)
+                if not match or not 1 <= int(match.group(1)) <= len(misses):
+                    continue
+                position = misses[int(match.group(1)) - 1]
+                results[position] = [d.strip() for d in match.group(2).split(",") if d.strip() in valid_diseases]
+                answered.append((cache_keys[position], results[position]))
+            await llm_cache.aset_many(answered)
+        except Exception as e:
+            print("Error calling OpenAI for packed histories:", e)
+            return [diseases if diseases is not None else [] for diseases in results]  # ✅ Don't retry one by one
+
+    # Not covered by the packed answer (or a pack of one): regular single-history calls
+    leftovers = [position for position in misses if results[position] is None]
+    singles = await asyncio.gather(*(parse_disease_history(histories[position]) for position in leftovers))
+    for position, diseases in zip(leftovers, singles):
+        results[position] = diseases
+    return results
+
+
+def build_disease_diet_index(meals) -> Dict[str, Set[str]]:
+    """
+    Parses the stringified `Disease` / `Diet` list columns once into an inverted index:
+    disease token (lowercase) -> set of diets recommended by meals for it.
+    """
+    index = defaultdict(set)
+    for disease_list, diet_list in zip(meals["Disease"], meals["Diet"]):
+        if not isinstance(disease_list, str) or not isinstance(diet_list, str):
+            continue
+        diets = ast.literal_eval(diet_list)
+        for disease in ast.literal_eval(disease_list):
+            index[disease.strip().lower()].update(diets)
+    return dict(index)
+
+
+def diets_for_disease(disease: str) -> Set[str]:
+    """
+    Diets recommended for a disease: an index lookup for vocabulary tokens, otherwise
+    a case-insensitive substring match over the (small) set of indexed tokens.
+    """
+    disease_diet_index = get_disease_diet_index()
+    key = disease.lower()
+    diets = disease_diet_index.get(key)
+    if diets is not None:
+        return diets
+    return set().union(*(diets for token, diets in disease_diet_index.items() if key in token))
+
+
+async def recommend_diet(diseases: List[str]) -> str:
     """
     Matches extracted diseases to recommended diets based on the preprocessed dataset.
     If no match is found, queries GPT-3.5-Turbo for a dynamic recommendation.
     """
-    matched_diets = set()
+    await _disease_diet_index.aget()  # Loaded off the event loop on first use
 
-    for disease in diseases:
-        matching_rows = disease_diet_map[disease_diet_map["Disease"].str.contains(disease, case=False, na=False)]
-    
-        for diet_list in matching_rows["Diet"]:
-            # Convert the string representation of a list into an actual Python list
-            parsed_diets = ast.literal_eval(diet_list) if isinstance(diet_list, str) else diet_list
-            matched_diets.update(parsed_diets)  # Add individual diets to the set
+    # ✅ Set union over the precomputed index (no DataFrame scans or parsing per request)
+    matched_diets = set().union(*(diets_for_disease(disease) for disease in diseases))
         
     if matched_diets:
         
@@ -87,27 +230,34 @@ def recommend_diet(diseases: List[str]) -> str:
     # If no predefined diet is found, ask GPT-3.5-Turbo for a recommendation
     llm_prompt = f"Suggest a suitable diet for someone with the following condition(s): {', '.join(diseases)}."
 
+    cache_key = llm_cache.key("recommend_diet", ", ".join(sorted(diseases)), await _vocabulary_version.aget())
+    cached = await llm_cache.aget(cache_key)
+    if cached is not None:
+        return cached
+
     try:
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",  # ✅ Using GPT-3.5-Turbo
-            messages=[
-                {"role": "system", "content": "You are a nutrition expert providing evidence-based diet recommendations."},
-                {"role": "user", "content": llm_prompt}
-            ]
-        )
-        return response.choices[0].message.content.strip()
+        with stage_timer("llm", "recommend_diet"):
+            recommended_diet = await llm_client.chat(
+                [
+                    {"role": "system", "content": "You are a nutrition expert providing evidence-based diet recommendations."},
+                    {"role": "user", "content": llm_prompt}
+                ],
+                model="gpt-3.5-turbo"  # ✅ Using GPT-3.5-Turbo
+            )
+        await llm_cache.aset(cache_key, recommended_diet)
+        return recommended_diet
     
     except Exception as e:
         print("Error calling OpenAI for diet recommendation:", e)
         return "No specific diet recommendation available."
 
-def parse_disease_and_recommend_diet(history: str, img_url: Optional[str] = None) -> Dict:
+async def parse_disease_and_recommend_diet(history: str, img_url: Optional[str] = None) -> Dict:
     """
     Extracts diseases and recommends a diet based on validated disease list.
     Supports optional image input.
     """
-    diseases = parse_disease_history(history, img_url)
-    recommended_diet = recommend_diet(diseases)
+    diseases = await parse_disease_history(history, img_url)
+    recommended_diet = await recommend_diet(diseases)
 
     return {
         "diseases": diseases,
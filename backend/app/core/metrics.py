@@ -0,0 +1,75 @@
+import time
+from prometheus_client import CONTENT_TYPE_LATEST, Gauge, Histogram, generate_latest
+
+# Latency buckets (seconds) from sub-millisecond cache hits up to slow LLM calls
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+REQUEST_LATENCY = Histogram(
+    "nutribuddy_http_request_duration_seconds",
+    "HTTP request latency by route template, method and status code.",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "nutribuddy_http_requests_in_progress",
+    "HTTP requests currently being handled.",
+    ["method"],
+)
+STAGE_LATENCY = Histogram(
+    "nutribuddy_stage_duration_seconds",
+    "Latency of the stages inside recommenders, exercise recommendation and LLM calls.",
+    ["component", "stage"],
+    buckets=LATENCY_BUCKETS,
+)
+
+
+def stage_timer(component: str, stage: str):
+    """
+    Context manager/decorator observing the wrapped block in STAGE_LATENCY.
+    """
+    return STAGE_LATENCY.labels(component=component, stage=stage).time()
+
+
+def render_metrics():
+    """
+    (body, content type) of this process's metrics in Prometheus text format.
+    """
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording the latency of every HTTP request. Requests are labelled
+    with the matched route template (e.g. /api/v1/recommender/recommend/{user_id}),
+    so per-user paths don't create new series.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500  # Unless a response starts, the request failed
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        REQUESTS_IN_PROGRESS.labels(method=method).inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUESTS_IN_PROGRESS.labels(method=method).dec()
+            route = scope.get("route")  # Set by the router once a route matched
+            REQUEST_LATENCY.labels(
+                method=method,
+                route=getattr(route, "path_format", None) or getattr(route, "path", None) or "<unmatched>",
+                status=str(status),
+            ).observe(time.perf_counter() - started)
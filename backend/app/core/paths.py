@@ -0,0 +1,41 @@
+import os
+from pathlib import Path
+from app.core.config import settings
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+
+def resolve_data_path(relative_path: str) -> str:
+    """
+    Resolves a path inside the project's `data/` directory independently of the CWD.
+    Checks DATA_DIR (if set), then ./data, backend/data (the container layout) and
+    the repository's data/ directory.
+    """
+    if settings.DATA_DIR:
+        return os.path.join(settings.DATA_DIR, relative_path)
+
+    candidates = _data_dir_candidates()
+    for data_dir in candidates:
+        path = data_dir / relative_path
+        if path.exists():
+            return str(path)
+    return str(candidates[0] / relative_path)  # Missing everywhere: report the conventional location
+
+
+def resolve_output_path(path: str) -> str:
+    """
+    Location for files the app writes (model artifacts, profiles, caches): absolute paths
+    as given, relative ones inside the data/ directory, even before they exist.
+    """
+    if os.path.isabs(path):
+        return path
+    if settings.DATA_DIR:
+        return os.path.join(settings.DATA_DIR, path)
+
+    candidates = _data_dir_candidates()
+    data_dir = next((candidate for candidate in candidates if candidate.is_dir()), candidates[0])
+    return str(data_dir / path)
+
+
+def _data_dir_candidates() -> list:
+    return [Path.cwd() / "data", BACKEND_DIR / "data", BACKEND_DIR.parent / "data"]
@@ -0,0 +1,153 @@
+import cProfile
+import hmac
+import os
+import pstats
+import re
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Optional
+
+PROFILE_HEADER = b"x-profile"  # Value must equal PROFILING_SECRET
+REQUEST_ID_HEADER = b"x-request-id"
+
+_SAFE_REQUEST_ID = re.compile(r"[^A-Za-z0-9_.-]")
+_active_profile: ContextVar[Optional["RequestProfile"]] = ContextVar("active_profile", default=None)
+
+
+class RequestProfile:
+    """
+    cProfile data of one request: the steps of its own task on the event loop plus
+    every `run_blocking` call made on its behalf (recommenders and sync DB work run
+    on worker threads).
+    """
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self._lock = threading.Lock()
+        self._profiles = []
+
+    def run_in_thread(self, func):
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(func)
+        finally:
+            with self._lock:
+                self._profiles.append(profiler)
+
+    def add(self, profiler: cProfile.Profile):
+        with self._lock:
+            self._profiles.append(profiler)
+
+    def save(self, directory: str) -> str:
+        """
+        Writes the merged pstats file (`<request id>.prof`): open it with snakeviz,
+        or turn it into a flamegraph with flameprof / gprof2dot.
+        """
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{self.request_id}.prof")
+        with self._lock:
+            profiles = list(self._profiles)
+        stats = pstats.Stats(profiles[0])
+        for profiler in profiles[1:]:
+            stats.add(profiler)
+        stats.dump_stats(path)
+        return path
+
+
+def current_profile() -> Optional[RequestProfile]:
+    """
+    Profile of the request being handled, if it asked to be profiled.
+    """
+    return _active_profile.get()
+
+
+class _ProfiledSteps:
+    """
+    Awaits a coroutine with the profiler enabled only while that coroutine runs, so
+    other requests' coroutines interleaved on the same event loop are left out.
+    """
+
+    def __init__(self, coro, profiler: cProfile.Profile):
+        self.coro = coro
+        self.profiler = profiler
+
+    def __await__(self):
+        value, error = None, None
+        while True:
+            self.profiler.enable()
+            try:
+                if error is None:
+                    yielded = self.coro.send(value)
+                else:
+                    yielded = self.coro.throw(error)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                self.profiler.disable()
+
+            value, error = None, None
+            try:
+                value = yield yielded
+            except GeneratorExit:
+                self.coro.close()
+                raise
+            except BaseException as e:  # Cancellation included: delivered to the coroutine
+                error = e
+
+
+class ProfilingMiddleware:
+    """
+    Opt-in per-request profiler: requests with `X-Profile: <PROFILING_SECRET>` are run
+    under cProfile and saved as `<directory>/<request id>.prof`. The request id comes
+    from `X-Request-ID` (or is generated) and is returned in `X-Profile-Id`.
+    Only installed when a secret is configured; other requests just skip a header lookup.
+
+    Only the request's own task is profiled on the event loop. Tasks it spawns (e.g.
+    `asyncio.gather` children, task groups running a streaming body) are not, although
+    their `run_blocking` calls still are.
+    """
+
+    def __init__(self, app, secret: str, directory: str):
+        self.app = app
+        self.secret = secret.encode("utf-8")
+        self.directory = directory
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        presented = headers.get(PROFILE_HEADER)
+        if presented is None or not hmac.compare_digest(presented, self.secret):
+            await self.app(scope, receive, send)
+            return
+
+        requested_id = headers.get(REQUEST_ID_HEADER, b"").decode("latin-1")
+        request_id = _SAFE_REQUEST_ID.sub("_", requested_id)[:64] or uuid.uuid4().hex
+        request_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{request_id}"
+        profile = RequestProfile(request_id)
+        token = _active_profile.set(profile)
+        profiler = cProfile.Profile()
+        try:
+            # ✅ Enabled per step of this request's coroutine, not for the whole event loop thread
+            await _ProfiledSteps(
+                self.app(scope, receive, self._with_headers(send, [(b"x-profile-id", request_id.encode())])),
+                profiler,
+            )
+        finally:
+            _active_profile.reset(token)
+            profile.add(profiler)
+            try:
+                print(f"Request profile saved to {profile.save(self.directory)}")
+            except Exception as e:
+                print(f"Error saving request profile {request_id}: {str(e)}")
+
+    @staticmethod
+    def _with_headers(send, extra_headers: list):
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), *extra_headers]}
+            await send(message)
+        return send_with_headers
@@ -0,0 +1,150 @@
+"""
+EXPLAIN check for the hot request-path queries.
+
+    DATABASE_URL=postgresql+psycopg2://... python -m app.core.query_plans
+
+Explains each query against DATABASE_URL (PostgreSQL or SQLite) and exits non-zero
+if one doesn't use its index. On PostgreSQL sequential scans are disabled for the
+check: on small tables a seq scan is the planner's right call, and what matters
+here is that the index exists and matches the query.
+"""
+import argparse
+import json
+import sys
+from datetime import datetime
+from sqlalchemy import or_, select, text
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal
+from app.models.meal import Meal
+from app.models.recent_activity import RecentActivity
+from app.models.recommendations import Recommendation
+from app.models.user import User
+from app.services.recommendations import active_recommendations_query
+
+INDEX_SCANS = {"Index Scan", "Index Only Scan", "Bitmap Index Scan"}
+
+
+def hot_queries(user_id: int = 1, meal_id: int = 1, disease: str = "diabeties") -> list:
+    """
+    (name, where it runs, statement, index it should use), with sample parameters.
+    """
+    since = datetime(2024, 1, 1)
+    return [
+        (
+            "interaction_lookup", "recommender.py save_interaction",
+            select(RecentActivity).where(RecentActivity.user_id == user_id, RecentActivity.meal_id == meal_id),
+            "ix_user_activity_user_meal_liked",
+        ),
+        (
+            "interacted_meals", "hybrid.py -> content_based.recommend_content_based",
+            select(RecentActivity.meal_id).where(RecentActivity.user_id == user_id, RecentActivity.meal_id.isnot(None)),
+            "ix_user_activity_user_meal_liked",
+        ),
+        (
+            "similar_users", "recommender.py interact -> jobs.enqueue_similar_users",
+            select(User.user_id).where(User.user_id != user_id, User.disease == disease),
+            "ix_users_disease",
+        ),
+        (
+            "active_recommendations", "recommender.py recommend_meals",
+            active_recommendations_query(
+                user_id, Meal.meal_id, Meal.name, Recommendation.recommendation_reason, Recommendation.created_at
+            ).join(Meal, Meal.meal_id == Recommendation.meal_id),
+            "ix_recommendations_user_version",
+        ),
+        (
+            "interaction_sync", "hybrid.py -> interactions.InteractionModel.sync",
+            select(RecentActivity.activity_id, RecentActivity.user_id, RecentActivity.meal_id).where(
+                RecentActivity.meal_id.isnot(None),
+                or_(RecentActivity.activity_id > 1000, RecentActivity.timestamp >= since),
+            ),
+            "ix_user_activity_meal_timestamp",
+        ),
+        (
+            "profile_sync", "popularity.PopularityStore.sync",
+            select(User.user_id, User.disease, User.updated_at).where(
+                User.updated_at.isnot(None), User.updated_at >= since
+            ),
+            "ix_users_updated_at",
+        ),
+    ]
+
+
+def explain(db: Session, statement) -> list:
+    """
+    Plan of `statement` as (node, index or None) pairs plus the raw plan lines.
+    """
+    dialect = db.get_bind().dialect.name
+    sql = str(statement.compile(dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True}))
+
+    if dialect == "postgresql":
+        db.execute(text("SET LOCAL enable_seqscan = off"))
+        plan = db.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        nodes, stack = [], [plan[0]["Plan"]]
+        while stack:
+            node = stack.pop()
+            nodes.append((node["Node Type"], node.get("Index Name"), node.get("Relation Name")))
+            stack.extend(node.get("Plans", []))
+        return nodes
+
+    if dialect == "sqlite":
+        nodes = []
+        for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}")):
+            detail = row[-1]
+            index = detail.split(" INDEX ", 1)[1].split(" ", 1)[0] if " INDEX " in detail else None
+            nodes.append(("Index Scan" if index else detail.split(" ", 1)[0].title(), index, detail))
+        return nodes
+
+    raise ValueError(f"EXPLAIN check not supported for {dialect}")
+
+
+def check_query_plans(db: Session) -> list:
+    """
+    One result per hot query: whether its plan uses the expected index, and the plan.
+    """
+    results = []
+    for name, source, statement, index in hot_queries():
+        try:
+            nodes = explain(db, statement)
+        finally:
+            db.rollback()  # Drops SET LOCAL and anything else the EXPLAIN touched
+        results.append({
+            "query": name,
+            "source": source,
+            "expected_index": index,
+            "uses_index": any(node in INDEX_SCANS and used == index for node, used, _ in nodes),
+            "plan": [f"{node} {used or ''} {detail or ''}".strip() for node, used, detail in nodes],
+        })
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check that hot queries use their indexes (EXPLAIN).")
+    parser.add_argument("--json", action="store_true", help="Print the full results as JSON")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        results = check_query_plans(db)
+    finally:
+        db.close()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for result in results:
+            status = "ok     " if result["uses_index"] else "MISSING"
+            print(f"{status} {result['query']:<24} {result['expected_index']:<34} ({result['source']})")
+            if not result["uses_index"]:
+                for line in result["plan"]:
+                    print(f"          {line}")
+
+    if not all(result["uses_index"] for result in results):
+        print("Run `alembic upgrade head` to create missing indexes", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,109 @@
-from passlib.context import CryptContext
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from app.core.config import settings
 
-# Password hashing settings
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt only uses the first 72 bytes; bcrypt>=5 raises instead of truncating, so truncate
+# explicitly (hashes made by older bcrypt/passlib versions keep verifying)
+BCRYPT_MAX_PASSWORD_BYTES = 72
+
+# Dedicated pool for password hashing: bcrypt is deliberately slow CPU work (and releases the GIL),
+# so it gets its own bounded threads instead of occupying the event loop or the blocking DB pool
+_password_executor = None
+_password_executor_lock = threading.Lock()
+_password_stats_lock = threading.Lock()
+_password_stats = {
+    "pending": 0,
+    "hash_count": 0, "hash_total_seconds": 0.0, "hash_max_seconds": 0.0,
+    "verify_count": 0, "verify_total_seconds": 0.0, "verify_max_seconds": 0.0,
+    "queue_wait_count": 0, "queue_wait_total_seconds": 0.0, "queue_wait_max_seconds": 0.0,
+}
 
 # Secret key for JWT
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 
+def _password_bytes(password: str) -> bytes:
+    return password.encode("utf-8")[:BCRYPT_MAX_PASSWORD_BYTES]
+
 def hash_password(password: str) -> str:
     """
-    Hashes a password using bcrypt.
+    Hashes a password using bcrypt (BCRYPT_ROUNDS work factor). Blocking: prefer `hash_password_async`.
     """
-    return pwd_context.hash(password)
+    return bcrypt.hashpw(_password_bytes(password), bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)).decode("utf-8")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
-    Verifies a password against its hashed version.
+    Verifies a password against its hashed version. Blocking: prefer `verify_password_async`.
+    """
+    try:
+        return bcrypt.checkpw(_password_bytes(plain_password), hashed_password.encode("utf-8"))
+    except ValueError:
+        return False  # ✅ Malformed stored hash never authenticates
+
+async def hash_password_async(password: str) -> str:
+    """
+    Hashes a password on the password-hashing pool without blocking the event loop.
+    """
+    return await _run_password_work("hash", hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verifies a password on the password-hashing pool without blocking the event loop.
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return await _run_password_work("verify", verify_password, plain_password, hashed_password)
+
+def password_hashing_stats() -> dict:
+    """
+    Hash/verify latency and time spent queued for a password-hashing thread.
+    """
+    with _password_stats_lock:
+        stats = dict(_password_stats)
+    for operation in ("hash", "verify", "queue_wait"):
+        count = stats[f"{operation}_count"]
+        stats[f"{operation}_avg_seconds"] = stats[f"{operation}_total_seconds"] / count if count else 0.0
+    stats["workers"] = settings.PASSWORD_HASH_WORKERS
+    stats["rounds"] = settings.BCRYPT_ROUNDS
+    return stats
+
+def _get_password_executor() -> ThreadPoolExecutor:
+    global _password_executor
+    with _password_executor_lock:
+        if _password_executor is None:
+            _password_executor = ThreadPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+            )
+        return _password_executor
+
+async def _run_password_work(operation: str, func, *args):
+    submitted = time.perf_counter()
+    _record_password_stat("pending", 1)
+
+    def timed():
+        started = time.perf_counter()
+        _record_password_stat("pending", -1)
+        _record_password_timing("queue_wait", started - submitted)
+        try:
+            return func(*args)
+        finally:
+            _record_password_timing(operation, time.perf_counter() - started)
+
+    return await asyncio.get_running_loop().run_in_executor(_get_password_executor(), timed)
+
+def _record_password_stat(name: str, amount):
+    with _password_stats_lock:
+        _password_stats[name] += amount
+
+def _record_password_timing(operation: str, seconds: float):
+    with _password_stats_lock:
+        _password_stats[f"{operation}_count"] += 1
+        _password_stats[f"{operation}_total_seconds"] += seconds
+        _password_stats[f"{operation}_max_seconds"] = max(_password_stats[f"{operation}_max_seconds"], seconds)
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
     """
@@ -0,0 +1,93 @@
+"""
+Import-time report for the API process.
+
+    python -m app.core.startup [module] [--top 15]
+
+Imports the module (default `app.main`) in a fresh interpreter with `-X importtime`,
+prints the total time, the slowest imports and whether heavy optional dependencies
+were pulled in, and exits non-zero when STARTUP_IMPORT_BUDGET_SECONDS is exceeded.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from app.core.config import settings
+from app.core.lazy import Lazy
+from app.core.paths import BACKEND_DIR
+
+# Dependencies that must only be imported on first use, never at app import
+HEAVY_MODULES = ("pandas", "sklearn", "openai")
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - started
+print(json.dumps({{"seconds": seconds, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def import_report(module: str = "app.main", top: int = 15) -> dict:
+    """
+    Measures importing `module` in a fresh interpreter (so nothing is cached in sys.modules).
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(BACKEND_DIR), env.get("PYTHONPATH")]))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        capture_output=True, text=True, env=env, timeout=300,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{proc.stderr[-2000:]}")
+
+    # stderr lines: "import time: <self us> | <cumulative us> | <indented module name>"
+    imports = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        imports.append((name.strip(), int(self_us) / 1000, int(cumulative_us) / 1000))
+
+    probe = json.loads(proc.stdout.strip().splitlines()[-1])
+    slowest = sorted(imports, key=lambda item: item[1], reverse=True)[:top]
+    return {
+        "module": module,
+        "seconds": round(probe["seconds"], 3),
+        "budget_seconds": settings.STARTUP_IMPORT_BUDGET_SECONDS,
+        "modules_imported": len(imports),
+        "heavy_modules_loaded": probe["heavy"],
+        "slowest_imports_ms": [
+            {"module": name, "self": round(self_ms, 1), "cumulative": round(cumulative_ms, 1)}
+            for name, self_ms, cumulative_ms in slowest
+        ],
+    }
+
+
+def lazy_resources_report() -> list:
+    """
+    Lazily initialised resources of this process: loaded yet, and how long the load took.
+    """
+    return [
+        {"name": resource.name, "loaded": resource.loaded, "load_seconds": resource.load_seconds}
+        for resource in Lazy.instances
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report import time of the API process.")
+    parser.add_argument("module", nargs="?", default="app.main")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest imports to list")
+    args = parser.parse_args(argv)
+
+    report = import_report(args.module, args.top)
+    print(json.dumps(report, indent=2))
+
+    over_budget = report["seconds"] > report["budget_seconds"]
+    if over_budget or report["heavy_modules_loaded"]:
+        print("Startup budget exceeded" if over_budget else "Heavy modules imported eagerly", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
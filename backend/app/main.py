@@ -1,7 +1,15 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1.endpoints import api_router  # Ensure this is correct
 from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import MetricsMiddleware, render_metrics
+from app.core.paths import resolve_output_path
+from app.core.profiling import ProfilingMiddleware
+from app.services.recommender.interactions import interaction_model
+from app.services.recommender.popularity import popularity_store
+from app.services.exercise_service import exercise_registry
+from app.services.jobs import recommendation_jobs
 
 app = FastAPI(
     title="NutriBuddy API",
@@ -18,9 +26,50 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ✅ Request latency histograms for every endpoint (served at /metrics)
+app.add_middleware(MetricsMiddleware)
+
+# ✅ Opt-in per-request cProfile, only installed when an admin secret is configured
+if settings.PROFILING_SECRET:
+    app.add_middleware(ProfilingMiddleware, secret=settings.PROFILING_SECRET, directory=resolve_output_path(settings.PROFILE_DIR))
+
 # ✅ Register API routes
 app.include_router(api_router, prefix="/api/v1")
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """
+    Prometheus scrape endpoint: request and stage latencies of this worker process.
+    """
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+@app.on_event("startup")
+def load_recommender_models():
+    """
+    Builds the long-lived recommender structures once per worker.
+    """
+    db = SessionLocal()
+    try:
+        interaction_model.load(db)
+        popularity_store.load(db)
+    except Exception as e:
+        # The models are loaded lazily on first use if the database isn't ready yet
+        print(f"Error loading recommender models at startup: {str(e)}")
+    finally:
+        db.close()
+
+    try:
+        exercise_registry.get()
+    except Exception as e:
+        print(f"Error loading exercise model at startup: {str(e)}")
+
+    recommendation_jobs.start()
+
+@app.on_event("shutdown")
+def stop_background_jobs():
+    recommendation_jobs.shutdown()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
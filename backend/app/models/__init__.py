@@ -1,5 +1,6 @@
 from app.models.user import User
 from app.models.meal import Meal
-from app.models.recommendations import Recommendation
+from app.models.recommendations import Recommendation, RecommendationSet
 from app.models.recent_activity import RecentActivity
-from app.models.exercise import Exercise  # ✅ Ensure it's imported
\ No newline at end of file
+from app.models.exercise import Exercise  # ✅ Ensure it's imported
+from app.models.user_mapping import UserMapping
@@ -5,6 +5,9 @@ class DiseaseHistoryRequest(BaseModel):
     history: str
     img_url: Optional[str] = None  # ✅ Allow optional image input
 
+class BatchDiseaseHistoryRequest(BaseModel):
+    histories: List[DiseaseHistoryRequest]
+
 class ParsedDiseaseResponse(BaseModel):
     diseases: List[str]
     recommended_diet: str
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Boolean, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, Boolean, ForeignKey, DateTime, Index, text
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 from datetime import datetime
@@ -28,3 +28,13 @@ class RecentActivity(Base):
     user = relationship("User", back_populates="recent_activities")
     meal = relationship("Meal", back_populates="recent_activities")
     exercise = relationship("Exercise", back_populates="recent_activities")  # ✅ Added relationship
+
+    __table_args__ = (
+        # ✅ Interaction upsert lookup (user, meal) and a user's interacted meals
+        Index("ix_user_activity_user_meal_liked", "user_id", "meal_id", "liked"),
+        # ✅ Incremental sync of meal interactions ("timestamp >= last seen")
+        Index(
+            "ix_user_activity_meal_timestamp", "timestamp",
+            postgresql_where=text("meal_id IS NOT NULL"), sqlite_where=text("meal_id IS NOT NULL"),
+        ),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, Text, DateTime
+from sqlalchemy import BigInteger, Column, Integer, ForeignKey, Text, DateTime, Index
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 from datetime import datetime
@@ -15,8 +15,23 @@ class Recommendation(Base):
     exercise_id = Column(Integer, ForeignKey("exercises.exercise_id", ondelete="CASCADE"), nullable=True)
     recommendation_reason = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow)
+    set_version = Column(BigInteger, nullable=False, default=0, server_default="0")  # ✅ Recommendation set this row belongs to
 
     # ✅ Relationships
     user = relationship("User", back_populates="recommendations")
 
+    __table_args__ = (
+        Index("ix_recommendations_user_version", "user_id", "set_version"),
+    )
 
+
+class RecommendationSet(Base):
+    """
+    Points each user at their active recommendation set version.
+    Rows of other versions are invisible to readers and cleaned up lazily.
+    """
+    __tablename__ = "recommendation_sets"
+
+    user_id = Column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), primary_key=True)
+    active_version = Column(BigInteger, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow)
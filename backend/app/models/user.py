@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Boolean, Float, Text
+from sqlalchemy import Column, Integer, String, Boolean, Float, Text, DateTime, Index
 from sqlalchemy.orm import relationship
+from datetime import datetime
 from app.core.database import Base
 from app.models.recommendations import Recommendation
 class User(Base):
@@ -15,6 +16,7 @@ class User(Base):
     disease = Column(Text, nullable=True)  # Changed to Text to match schema
     diet = Column(Text, nullable=True)     # Changed to Text to match schema
     gender = Column(Boolean, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # ✅ Watermark for other workers' caches
 
     # ✅ Relationship with UserMapping
     mapping = relationship("UserMapping", back_populates="user", uselist=False)
@@ -24,3 +26,8 @@ class User(Base):
 
     # ✅ Relationship with Recommendations (New Fix)
     recommendations = relationship("Recommendation", back_populates="user", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        Index("ix_users_disease", "disease"),  # ✅ Users with the same disease history
+        Index("ix_users_updated_at", "updated_at"),  # ✅ Profiles changed since the last sync
+    )
@@ -42,6 +42,10 @@ def insert_user(
 def get_user_by_username(db: Session, username: str):
     return db.query(User).filter(User.username == username).first()
 
+# Function to retrieve a user by id
+def get_user_by_id(db: Session, user_id: int):
+    return db.query(User).filter(User.user_id == user_id).first()
+
 # Function to update user details
 def update_user_details(db: Session, user_id: int, height: float, weight: float, disease: str, diet: str):
     user = db.query(User).filter(User.user_id == user_id).first()
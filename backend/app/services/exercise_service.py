@@ -0,0 +1,162 @@
+import os
+import threading
+import numpy as np
+from app.core.artifacts import load_pickle, save_pickle
+from app.core.config import settings
+from app.core.paths import resolve_data_path, resolve_output_path
+
+EXERCISE_MODEL_FILE_NAME = "exercise_model.pkl"
+
+
+class ExerciseEngine:
+    """
+    Exercise dataset held as columnar arrays plus the fitted intensity model.
+    """
+
+    def __init__(self, columns: dict, scaler, model):
+        self.names = columns["exercise"]
+        self.duration = columns["duration"]
+        self.calories_burn = columns["calories_burn"]
+        self.intensity = columns["exercise_intensity"]
+        self.scaler = scaler
+        self.model = model
+
+    def predict_intensity(self, bmi: float) -> float:
+        user_features_scaled = self.scaler.transform(np.array([[bmi]]))
+        return float(self.model.predict(user_features_scaled)[0])
+
+    def recommend(self, bmi: float, limit: int = 5, per_type: int = 2) -> dict:
+        """
+        Predicts the exercise intensity for a BMI and returns the closest exercises,
+        at most `per_type` per exercise type.
+        """
+        predicted_intensity = self.predict_intensity(bmi)
+
+        # Filter exercises based on the predicted intensity range, widening it if too few match
+        for width in (1, 2):
+            low, high = max(0, predicted_intensity - width), min(10, predicted_intensity + width)
+            matches = np.flatnonzero((self.intensity >= low) & (self.intensity <= high))
+            if len(matches) >= limit:
+                break
+
+        # ✅ Exercise types in order of first appearance, closest intensities first within each type
+        intensity_diff = np.abs(self.intensity[matches] - predicted_intensity)
+        _, first_seen, type_codes = np.unique(self.names[matches], return_index=True, return_inverse=True)
+        type_rank = np.argsort(np.argsort(first_seen))[type_codes]
+        order = np.lexsort((intensity_diff, type_rank))
+
+        selected = []
+        taken = {}
+        for position in order:
+            rank = type_rank[position]
+            if taken.get(rank, 0) < per_type:
+                taken[rank] = taken.get(rank, 0) + 1
+                selected.append(position)
+        selected = selected[:limit]
+
+        exercises = []
+        for position in selected:
+            i = matches[position]
+            exercises.append({
+                "name": self.names[i],
+                "duration": int(self.duration[i]),
+                "calories_burned": float(self.calories_burn[i]),
+                "intensity": self.intensity[i],
+                "intensity_diff": float(intensity_diff[position])
+            })
+
+        return {
+            "predicted_intensity": predicted_intensity,
+            "feature_importance": {"bmi": float(self.model.feature_importances_[0])},
+            "exercises": exercises
+        }
+
+
+class ExerciseModelRegistry:
+    """
+    Loads the exercise dataset once and serves a trained intensity model.
+    The model is persisted as an artifact and hot-reloaded whenever the artifact changes.
+    """
+
+    def __init__(self, data_path: str, artifact_path: str):
+        self.data_path = data_path
+        self.artifact_path = artifact_path
+        self._lock = threading.Lock()
+        self._columns = None
+        self._data_signature = None
+        self._engine = None
+        self._artifact_mtime = None
+
+    def get(self) -> ExerciseEngine:
+        mtime = self._artifact_mtime_ns()
+        if self._engine is not None and mtime == self._artifact_mtime:
+            return self._engine
+
+        with self._lock:
+            mtime = self._artifact_mtime_ns()
+            if self._engine is None or mtime != self._artifact_mtime:
+                self._load()
+            return self._engine
+
+    def _load(self):
+        if self._columns is None:
+            self._columns = self._read_dataset()
+            stat = os.stat(self.data_path)
+            self._data_signature = (stat.st_size, stat.st_mtime_ns)
+
+        artifact = self._read_artifact()
+        if artifact is None or artifact["data_signature"] != self._data_signature:
+            artifact = self._train()
+            self._write_artifact(artifact)
+
+        self._engine = ExerciseEngine(self._columns, artifact["scaler"], artifact["model"])
+        self._artifact_mtime = self._artifact_mtime_ns()
+
+    def _read_dataset(self) -> dict:
+        import pandas as pd
+
+        exercise_df = pd.read_csv(self.data_path)
+        return {
+            "exercise": exercise_df["exercise"].to_numpy(dtype=object),
+            "duration": exercise_df["duration"].to_numpy(),
+            "calories_burn": exercise_df["calories_burn"].to_numpy(dtype=np.float64),
+            "bmi": exercise_df["bmi"].to_numpy(dtype=np.float64),
+            "exercise_intensity": exercise_df["exercise_intensity"].to_numpy()
+        }
+
+    def _train(self) -> dict:
+        from sklearn.ensemble import RandomForestRegressor
+        from sklearn.preprocessing import StandardScaler
+
+        X_train = self._columns["bmi"].reshape(-1, 1)
+        y_train = self._columns["exercise_intensity"]
+
+        scaler = StandardScaler()
+        X_train_scaled = scaler.fit_transform(X_train)
+
+        model = RandomForestRegressor(n_estimators=100, random_state=42)
+        model.fit(X_train_scaled, y_train)
+
+        return {"data_signature": self._data_signature, "scaler": scaler, "model": model}
+
+    def _read_artifact(self):
+        return load_pickle(self.artifact_path)
+
+    def _write_artifact(self, artifact: dict):
+        try:
+            save_pickle(artifact, self.artifact_path)
+        except OSError as e:
+            print(f"Error persisting exercise model: {str(e)}")
+
+    def _artifact_mtime_ns(self):
+        try:
+            return os.stat(self.artifact_path).st_mtime_ns
+        except OSError:
+            return None
+
+
+# Process-wide registry
+exercise_registry = ExerciseModelRegistry(
+    resolve_data_path(settings.EXERCISE_DATA_PATH),
+    os.path.join(resolve_output_path(settings.MODEL_CACHE_DIR), EXERCISE_MODEL_FILE_NAME)
+)
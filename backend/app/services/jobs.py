@@ -0,0 +1,173 @@
+import multiprocessing
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.user import User
+from app.services.recommendations import recommendation_cache
+
+
+def recompute_user_recommendations(user_id: int):
+    """
+    Job entry point (runs in a worker process): recomputes and stores one user's
+    recommendations using its own database session.
+    """
+    from app.services.recommendations import store_recommendations
+    from app.services.recommender.hybrid import hybrid_recommendation
+    from app.services.recommender.interactions import interaction_model
+    from app.services.recommender.popularity import popularity_store
+
+    db = SessionLocal()
+    try:
+        # ✅ Pick up the interactions that triggered this job before recomputing
+        for view in (interaction_model, popularity_store):
+            view.refresh(db, force=True)
+
+        recommendations = hybrid_recommendation(db, user_id)
+        if isinstance(recommendations, dict) and "error" in recommendations:
+            raise ValueError(recommendations["error"])
+
+        store_recommendations(db, user_id, recommendations)
+    finally:
+        db.close()
+
+
+class RecommendationJobQueue:
+    """
+    Local job queue for recommendation recomputation, executed on a process pool.
+
+    Jobs are keyed by user_id: enqueueing a user that is already waiting is coalesced
+    into the pending job. A user whose job is running stays queued and runs again
+    afterwards, because new interactions may have arrived after it started.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._cond = threading.Condition()
+        self._pending = OrderedDict()  # user_id -> enqueued_at (monotonic)
+        self._running = {}  # user_id -> (enqueued_at, started_at)
+        self._executor = None
+        self._dispatcher = None
+        self._stopping = False
+        self._stats = {
+            "enqueued": 0,
+            "coalesced": 0,
+            "completed": 0,
+            "failed": 0,
+            "total_wait_seconds": 0.0,
+            "total_run_seconds": 0.0,
+            "max_latency_seconds": 0.0,
+        }
+
+    def start(self):
+        with self._cond:
+            if self._dispatcher is not None:
+                return
+            self._stopping = False
+            # Spawned (not forked) workers: the web process has threads and open connections
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            self._dispatcher = threading.Thread(
+                target=self._dispatch, name="recommendation-jobs", daemon=True
+            )
+            self._dispatcher.start()
+
+    def shutdown(self):
+        with self._cond:
+            if self._dispatcher is None:
+                return
+            self._stopping = True
+            self._cond.notify_all()
+            dispatcher, executor = self._dispatcher, self._executor
+        dispatcher.join()
+        executor.shutdown(wait=True, cancel_futures=True)
+        with self._cond:
+            self._dispatcher = None
+            self._executor = None
+
+    def enqueue(self, user_id: int) -> bool:
+        """
+        Schedules a recompute for the user; returns False if it was coalesced.
+        """
+        self.start()
+        with self._cond:
+            self._stats["enqueued"] += 1
+            if user_id in self._pending:
+                self._stats["coalesced"] += 1
+                return False
+            self._pending[user_id] = time.monotonic()
+            self._cond.notify_all()
+            return True
+
+    def enqueue_many(self, user_ids) -> int:
+        return sum(1 for user_id in user_ids if self.enqueue(user_id))
+
+    def stats(self) -> dict:
+        with self._cond:
+            now = time.monotonic()
+            stats = dict(self._stats)
+            finished = stats["completed"] + stats["failed"]
+            stats.update({
+                "workers": self.workers,
+                "queue_depth": len(self._pending),
+                "running": len(self._running),
+                "oldest_pending_seconds": now - next(iter(self._pending.values())) if self._pending else 0.0,
+                "avg_wait_seconds": stats["total_wait_seconds"] / finished if finished else 0.0,
+                "avg_run_seconds": stats["total_run_seconds"] / finished if finished else 0.0,
+            })
+            return stats
+
+    def _dispatch(self):
+        while True:
+            with self._cond:
+                user_id = None
+                while not self._stopping:
+                    if len(self._running) < self.workers:
+                        user_id = next((u for u in self._pending if u not in self._running), None)
+                        if user_id is not None:
+                            break
+                    self._cond.wait()
+                if self._stopping:
+                    return
+
+                enqueued_at = self._pending.pop(user_id)
+                self._running[user_id] = (enqueued_at, time.monotonic())
+
+            future = self._executor.submit(recompute_user_recommendations, user_id)
+            future.add_done_callback(lambda f, user_id=user_id: self._finished(user_id, f))
+
+    def _finished(self, user_id: int, future):
+        error = future.exception() if not future.cancelled() else None
+        with self._cond:
+            enqueued_at, started_at = self._running.pop(user_id)
+            now = time.monotonic()
+            self._stats["failed" if error or future.cancelled() else "completed"] += 1
+            self._stats["total_wait_seconds"] += started_at - enqueued_at
+            self._stats["total_run_seconds"] += now - started_at
+            self._stats["max_latency_seconds"] = max(self._stats["max_latency_seconds"], now - enqueued_at)
+            self._cond.notify_all()
+        # The worker wrote a new set from another process; drop this process's cached copy
+        recommendation_cache.invalidate(user_id)
+        if error:
+            print(f"Error updating recommendations for user {user_id}: {str(error)}")
+
+
+# Process-wide queue (workers are started on first use / app startup)
+recommendation_jobs = RecommendationJobQueue(workers=settings.RECOMMENDATION_JOB_WORKERS)
+
+
+def enqueue_similar_users(db: Session, user_id: int, user_disease: str) -> int:
+    """
+    Schedules recomputation for users with the same disease history as `user_id`.
+    """
+    similar_user_ids = [
+        similar_user_id for (similar_user_id,) in db.query(User.user_id).filter(
+            User.user_id != user_id,  # Exclude the current user (recomputed inline)
+            User.disease == user_disease  # Match the exact disease
+        )
+    ]
+    return recommendation_jobs.enqueue_many(similar_user_ids)
@@ -1,15 +1,95 @@
-from app.core.llm_integration import parse_disease_and_recommend_diet
-from typing import Optional
+import asyncio
+from app.core.config import settings
+from app.core.llm_cache import normalize_text
+from app.core.llm_integration import (
+    get_disease_matcher_async, parse_disease_and_recommend_diet, parse_disease_history_pack, recommend_diet,
+)
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
 class LLMService:
     @staticmethod
-    def process_disease_history(history: str, img_url: Optional[str] = None):
+    async def process_disease_history(history: str, img_url: Optional[str] = None):
         if not history.strip():
             return {"diseases": [], "recommended_diet": "No history provided."}  # ✅ Handle empty input
 
-        result = parse_disease_and_recommend_diet(history, img_url)
+        # ✅ Confident local match answers directly; images and ambiguous text still go to the LLM
+        if not img_url:
+            match = (await get_disease_matcher_async()).match(history)
+            if match.confident:
+                return {"diseases": match.diseases, "recommended_diet": await recommend_diet(match.diseases)}
+
+        result = await parse_disease_and_recommend_diet(history, img_url)
 
         if not result.get("diseases"):
             return {"diseases": [], "recommended_diet": "No diseases detected."}  # ✅ Prevent OpenAI failures
 
         return result
+
+    @staticmethod
+    async def process_disease_histories(
+        requests: List[Tuple[str, Optional[str]]]
+    ) -> AsyncIterator[Tuple[List[int], Dict]]:
+        """
+        Batch version of `process_disease_history` for (history, img_url) pairs. Yields
+        (input indices, result) as soon as each result is ready, not in input order.
+        Duplicate histories are answered once; text histories the local matcher can't
+        settle are packed several per LLM prompt, and packs run concurrently.
+        """
+        groups = {}  # (normalized history, img_url) -> input indices
+        histories = {}  # same key -> first original history
+        for index, (history, img_url) in enumerate(requests):
+            key = (normalize_text(history), img_url or None)
+            groups.setdefault(key, []).append(index)
+            histories.setdefault(key, history)
+
+        matcher = await get_disease_matcher_async()
+        tasks, unsettled = [], []
+        for key, indices in groups.items():
+            history, img_url = histories[key], key[1]
+            if not history.strip() or img_url:
+                tasks.append(asyncio.ensure_future(LLMService._single(indices, history, img_url)))
+                continue
+            match = matcher.match(history)
+            if match.confident:
+                tasks.append(asyncio.ensure_future(LLMService._with_diet([indices], [match.diseases])))
+            else:
+                unsettled.append(key)
+
+        # ✅ Packs bounded by count and text size; the LLM client caps concurrent upstream calls
+        pack, pack_chars = [], 0
+        for key in unsettled + [None]:
+            if pack and (key is None or len(pack) >= settings.LLM_BATCH_PACK_SIZE
+                         or pack_chars + len(histories[key]) > settings.LLM_BATCH_PACK_MAX_CHARS):
+                tasks.append(asyncio.ensure_future(LLMService._pack(
+                    [groups[k] for k in pack], [histories[k] for k in pack]
+                )))
+                pack, pack_chars = [], 0
+            if key is not None:
+                pack.append(key)
+                pack_chars += len(histories[key])
+
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                for indices, result in await next_done:
+                    yield indices, result
+        finally:
+            for task in tasks:
+                task.cancel()  # ✅ Client went away: stop work nobody will read
+
+    @staticmethod
+    async def _single(indices: List[int], history: str, img_url: Optional[str]):
+        return [(indices, await LLMService.process_disease_history(history, img_url))]
+
+    @staticmethod
+    async def _pack(groups: List[List[int]], histories: List[str]):
+        return await LLMService._with_diet(groups, await parse_disease_history_pack(histories))
+
+    @staticmethod
+    async def _with_diet(groups: List[List[int]], parsed: List[List[str]]):
+        diets = await asyncio.gather(*(recommend_diet(diseases) for diseases in parsed if diseases))
+        diets = iter(diets)
+        return [
+            (indices, {"diseases": diseases, "recommended_diet": next(diets)} if diseases
+             else {"diseases": [], "recommended_diet": "No diseases detected."})
+            for indices, diseases in zip(groups, parsed)
+        ]
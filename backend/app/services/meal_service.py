@@ -0,0 +1,121 @@
+import hashlib
+import json
+import threading
+import time
+from sqlalchemy import Text, cast, func, literal
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.meal import Meal
+
+
+def meals_fingerprint(db: Session) -> str:
+    """
+    Content hash of the `meals` table: md5 over every row's (meal_id, name, nutrient,
+    disease, diet, veg_non) in meal_id order. Changes whenever meals are added, removed
+    or edited. PostgreSQL hashes in the database; other databases stream the rows.
+    """
+    columns = (Meal.meal_id, Meal.name, Meal.nutrient, Meal.disease, Meal.diet, Meal.veg_non)
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import aggregate_order_by
+
+        # ✅ JSON arrays keep NULLs and separators unambiguous; only the digest is transferred
+        rows = func.string_agg(
+            cast(func.json_build_array(*columns), Text), aggregate_order_by(literal("\n"), Meal.meal_id)
+        )
+        return db.query(func.coalesce(func.md5(rows), "")).scalar()
+
+    digest = hashlib.md5()
+    for row in db.query(*columns).order_by(Meal.meal_id).yield_per(1000):
+        digest.update(json.dumps(list(row)).encode("utf-8") + b"\n")
+    return digest.hexdigest()
+
+
+class MealRecord:
+    """
+    Compact, immutable view of a meal row (no ORM state attached).
+    """
+    __slots__ = ("meal_id", "name", "nutrient", "disease", "diet", "veg_non")
+
+    def __init__(self, meal_id, name, nutrient, disease, diet, veg_non):
+        self.meal_id = meal_id
+        self.name = name
+        self.nutrient = nutrient
+        self.disease = disease
+        self.diet = diet
+        self.veg_non = veg_non
+
+    def as_dict(self, **extra) -> dict:
+        """
+        Meal details in the format shared by all recommenders.
+        """
+        meal = {
+            "meal_id": self.meal_id,
+            "name": self.name,
+            "nutrient": self.nutrient,
+            "disease": self.disease,
+            "diet": self.diet
+        }
+        meal.update(extra)
+        return meal
+
+
+class MealCatalog:
+    """
+    Process-wide meal catalog keyed by meal_id.
+
+    Reloaded only when the `meals` table fingerprint changes (checked at most every
+    MEAL_INDEX_CHECK_SECONDS); `version` is bumped on every reload.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._records = {}
+        self._checked_at = 0.0
+        self.fingerprint = None
+        self.version = 0
+
+    def refresh(self, db: Session):
+        if self.version and time.monotonic() - self._checked_at < settings.MEAL_INDEX_CHECK_SECONDS:
+            return
+
+        with self._lock:
+            fingerprint = meals_fingerprint(db)
+            if fingerprint != self.fingerprint or not self.version:
+                rows = db.query(
+                    Meal.meal_id, Meal.name, Meal.nutrient, Meal.disease, Meal.diet, Meal.veg_non
+                ).order_by(Meal.meal_id).all()
+                self._records = {row[0]: MealRecord(*row) for row in rows}
+                self.fingerprint = fingerprint
+                self.version += 1
+            self._checked_at = time.monotonic()
+
+    def get(self, meal_id: int):
+        return self._records.get(meal_id)
+
+    def get_many(self, meal_ids) -> list:
+        """
+        Bulk lookup; returns records in the order given, skipping unknown ids.
+        """
+        records = self._records
+        return [records[meal_id] for meal_id in meal_ids if meal_id in records]
+
+    def all(self) -> list:
+        return list(self._records.values())
+
+    def __contains__(self, meal_id) -> bool:
+        return meal_id in self._records
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+
+# Process-wide catalog
+meal_catalog = MealCatalog()
+
+
+def get_meal_catalog(db: Session) -> MealCatalog:
+    """
+    Returns the shared meal catalog, loading or refreshing it if needed.
+    """
+    meal_catalog.refresh(db)
+    return meal_catalog
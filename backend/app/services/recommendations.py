@@ -0,0 +1,161 @@
+from datetime import datetime
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session, aliased
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.metrics import stage_timer
+from app.models.recommendations import Recommendation, RecommendationSet
+
+DEFAULT_REASON = "Based on your preferences and similar users"
+
+# ✅ Formatted /recommend payloads per user_id; invalidated whenever a user's set is replaced
+recommendation_cache = LRUCache(
+    maxsize=settings.RECOMMENDATION_CACHE_SIZE,
+    ttl=settings.RECOMMENDATION_CACHE_TTL_SECONDS,
+)
+
+def active_recommendations_query(user_id: int, *columns):
+    """
+    Rows of the user's active recommendation set, in the order they were written.
+    Users without a set pointer (rows written before versioning) read version 0.
+    """
+    columns = columns or (Recommendation.meal_id, Recommendation.recommendation_reason)
+    return select(*columns).select_from(Recommendation).outerjoin(
+        RecommendationSet, RecommendationSet.user_id == Recommendation.user_id
+    ).where(
+        Recommendation.user_id == user_id,
+        Recommendation.set_version == func.coalesce(RecommendationSet.active_version, 0)
+    ).order_by(Recommendation.recommendation_id)
+
+
+def store_recommendation_sets(db: Session, sets: dict, reason: str = DEFAULT_REASON, created_at: datetime = None):
+    """
+    Writes new recommendation sets ({user_id: [recommendation, ...]}) in bulk and switches
+    each user to them atomically. Readers see either the old or the new set, never a
+    partial one; superseded rows are pruned afterwards.
+    """
+    if not sets:
+        return
+    created_at = created_at or datetime.utcnow()
+
+    try:
+        with stage_timer("recommendations", "store"):
+            # ✅ Pointers first: bumping them locks them until commit, so concurrent writers
+            # (web and job workers alike) get consecutive versions per user and the last
+            # commit wins. Readers keep seeing the old set until this transaction commits.
+            versions = _claim_versions(db, list(sets), created_at)
+            rows = [
+                {
+                    "user_id": user_id,
+                    "meal_id": rec.get("meal_id"),
+                    "exercise_id": rec.get("exercise_id"),
+                    "recommendation_reason": reason,
+                    "created_at": created_at,
+                    "set_version": versions[user_id],
+                }
+                for user_id, recommendations in sets.items()
+                for rec in recommendations
+            ]
+            # ✅ One executemany insert, in the same transaction
+            if rows:
+                db.execute(insert(Recommendation), rows)
+            db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    for user_id in sets:
+        recommendation_cache.invalidate(user_id)
+    with stage_timer("recommendations", "prune"):
+        prune_recommendation_versions(db, list(sets))
+
+
+def store_recommendations(db: Session, user_id: int, recommendations: list, reason: str = DEFAULT_REASON):
+    """
+    Store recommendations in the database
+    """
+    try:
+        store_recommendation_sets(db, {user_id: recommendations}, reason)
+    except Exception as e:
+        print(f"Error storing recommendations for user {user_id}: {str(e)}")
+
+
+def prune_recommendation_versions(db: Session, user_ids: list = None, keep: int = None) -> int:
+    """
+    Deletes rows older than each user's active set (all users if `user_ids` is None), except
+    the `keep` most recent superseded sets (default RECOMMENDATION_SETS_KEPT).
+    Best effort: a failure only leaves invisible rows behind until the next write.
+    """
+    keep = settings.RECOMMENDATION_SETS_KEPT if keep is None else keep
+    oldest_kept = _active_version(Recommendation.user_id)
+    if keep > 0:
+        # The keep-th newest version below the active one (NULL, i.e. delete nothing, if there are fewer)
+        kept = aliased(Recommendation)
+        oldest_kept = select(kept.set_version).where(
+            kept.user_id == Recommendation.user_id,
+            kept.set_version < _active_version(kept.user_id)
+        ).distinct().order_by(kept.set_version.desc()).offset(keep - 1).limit(1).scalar_subquery()
+
+    statement = delete(Recommendation).where(Recommendation.set_version < oldest_kept)
+    if user_ids is not None:
+        statement = statement.where(Recommendation.user_id.in_(user_ids))
+
+    try:
+        deleted = db.execute(statement).rowcount
+        db.commit()
+        return deleted
+    except Exception as e:
+        db.rollback()
+        print(f"Error pruning old recommendation sets: {str(e)}")
+        return 0
+
+
+def _active_version(user_id_column):
+    return select(RecommendationSet.active_version).where(
+        RecommendationSet.user_id == user_id_column
+    ).scalar_subquery()
+
+
+def _claim_versions(db: Session, user_ids: list, updated_at: datetime) -> dict:
+    """
+    Increments each user's set pointer inside the database; returns {user_id: new version}.
+    The pointer rows stay locked until the transaction ends.
+    """
+    user_ids = sorted(user_ids)  # Same lock order in every writer
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as upsert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as upsert
+
+        statement = upsert(RecommendationSet).values([
+            {"user_id": user_id, "active_version": 1, "updated_at": updated_at}
+            for user_id in user_ids
+        ])
+        statement = statement.on_conflict_do_update(
+            index_elements=[RecommendationSet.user_id],
+            set_={
+                "active_version": RecommendationSet.active_version + 1,
+                "updated_at": statement.excluded.updated_at,
+            },
+        ).returning(RecommendationSet.user_id, RecommendationSet.active_version)
+        return dict(db.execute(statement).all())
+
+    current = dict(db.execute(
+        select(RecommendationSet.user_id, RecommendationSet.active_version)
+        .where(RecommendationSet.user_id.in_(user_ids))
+        .order_by(RecommendationSet.user_id)
+        .with_for_update()
+    ).all())
+    versions = {}
+    for user_id in user_ids:
+        versions[user_id] = current.get(user_id, 0) + 1
+        if user_id in current:
+            db.execute(update(RecommendationSet).where(
+                RecommendationSet.user_id == user_id
+            ).values(active_version=versions[user_id], updated_at=updated_at))
+        else:
+            db.add(RecommendationSet(user_id=user_id, active_version=versions[user_id], updated_at=updated_at))
+    db.flush()
+    return versions
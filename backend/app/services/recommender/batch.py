@@ -0,0 +1,270 @@
+"""
+Batch precompute of hybrid meal recommendations for every user.
+
+    python -m app.services.recommender.batch [--top-n 15] [--workers N] [--chunk-size 256]
+
+Builds the interaction, similarity, TF-IDF and popularity structures once, scores
+users in chunks with matrix operations on a process pool, and bulk-writes the
+results into `recommendations` as new recommendation sets. Produces the same lists
+as `hybrid_recommendation`.
+"""
+import argparse
+import multiprocessing
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+import numpy as np
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.recent_activity import RecentActivity
+from app.models.user import User
+from app.services.meal_service import get_meal_catalog
+from app.services.recommendations import store_recommendation_sets
+from app.services.recommender.interactions import InteractionModel
+from app.services.recommender.popularity import PopularityStore
+from app.services.recommender.ranking import TOP_SIMILAR_COUNT, LikeSignals, rank_recommendations
+from app.services.recommender.similarity import SimilarityEngine, top_k
+from app.services.recommender.tfidf_index import meal_index_store
+
+
+class BatchSnapshot:
+    """
+    Plain (picklable, lock-free) copy of everything needed to score users offline.
+    """
+
+    def __init__(self, db: Session, metric: str):
+        interactions = InteractionModel()
+        interactions.load(db)
+        popularity = PopularityStore()
+        popularity.load(db)
+
+        self.metric = metric
+        # The engine's structures only: the engine itself holds a lock, which can't be pickled
+        self.similarity = SimilarityEngine.from_triples(interactions.triples(), metric).state
+        self.index = meal_index_store.get(db)
+        self.meal_ids = {meal.meal_id for meal in get_meal_catalog(db).all()}
+
+        users = db.query(User.user_id, User.diet, User.disease).order_by(User.user_id).all()
+        self.user_ids = [user.user_id for user in users]
+        self.profiles = {
+            user.user_id: ((user.diet or "") + " " + (user.disease or "")).lower() for user in users
+        }
+        self.diseases = {user.user_id: user.disease for user in users}
+
+        # Every meal a user touched (including dislikes) is excluded from content-based results
+        self.interacted = {}
+        for user_id, meal_id in db.query(RecentActivity.user_id, RecentActivity.meal_id).filter(
+            RecentActivity.meal_id.isnot(None)
+        ).distinct():
+            self.interacted.setdefault(user_id, set()).add(meal_id)
+
+        self.global_counts = Counter(popularity.global_counts())
+        self.disease_counts = {}
+        self.top_similar = {}
+        for disease in set(self.diseases.values()):
+            self.disease_counts[disease] = Counter(popularity.disease_counts(disease))
+            self.top_similar[disease] = [
+                meal_id for meal_id, count in popularity.top_for_disease(disease, TOP_SIMILAR_COUNT)
+            ]
+        self.user_liked = {user_id: popularity.user_liked(user_id) for user_id in self.user_ids}
+
+    def score_users(self, user_ids: list, top_n: int) -> list:
+        """
+        Hybrid recommendations for a chunk of users, as [(user_id, [meal_id, ...])].
+        """
+        n = top_n * 2  # Candidate list length per recommender, as in hybrid_recommendation
+        content = self._content_based(user_ids, n)
+        user_based = self._user_based(user_ids, n)
+        item_based = self._item_based(user_ids, n)
+
+        results = []
+        for user_id in user_ids:
+            disease = self.diseases[user_id]
+            signals = LikeSignals(
+                self.global_counts,
+                self.disease_counts.get(disease, Counter()),
+                self.user_liked.get(user_id, []),
+                self.top_similar.get(disease, []),
+            )
+            rec_lists = [
+                [{"meal_id": meal_id} for meal_id in candidates.get(user_id, [])]
+                for candidates in (content, user_based, item_based)
+            ]
+            ranked = [rec["meal_id"] for rec in rank_recommendations(rec_lists, signals)]
+
+            recommended = set(ranked)
+            previously_liked = [
+                meal_id for meal_id in reversed(signals.user_liked)
+                if meal_id in self.meal_ids and meal_id not in recommended
+            ]
+            results.append((user_id, previously_liked + ranked))
+        return results
+
+    def _content_based(self, user_ids: list, n: int) -> dict:
+        index = self.index
+        profiled = [user_id for user_id in user_ids if self.profiles[user_id].strip()]
+        if index.vectors is None or not profiled:
+            return {}
+
+        # ✅ One sparse product scores the whole chunk against every meal
+        profiles = index.vectorizer.transform([self.profiles[user_id] for user_id in profiled])
+        scores = (profiles @ index.vectors.T).toarray()
+
+        candidates = {}
+        for row, user_id in enumerate(profiled):
+            user_scores = scores[row]
+            user_scores[np.isin(index.meal_ids, list(self.interacted.get(user_id, ())))] = -np.inf
+            candidates[user_id] = [
+                int(index.meal_ids[i]) for i in top_k(user_scores, n) if np.isfinite(user_scores[i])
+            ]
+        return candidates
+
+    def _user_based(self, user_ids: list, n: int) -> dict:
+        state = self.similarity
+        rows = {user_id: state["user_index"][user_id] for user_id in user_ids if user_id in state["user_index"]}
+        if not rows:
+            return {}
+
+        matrix = state["users"].matrix
+        sims = state["users"].similarities(np.fromiter(rows.values(), dtype=np.int64), self.metric)
+
+        candidates = {}
+        for block_row, (user_id, row) in enumerate(rows.items()):
+            user_sims = sims[block_row]
+            user_sims[row] = -np.inf  # ✅ Exclude self-similarity
+            seen = set(self._row_meals(matrix, row))
+            meals = []
+            for neighbor in top_k(user_sims, min(n, user_sims.size - 1)):
+                if user_sims[neighbor] <= 0:
+                    continue
+                for meal_id in self._row_meals(matrix, neighbor):
+                    if meal_id not in seen and meal_id in self.meal_ids:
+                        meals.append(meal_id)
+                        seen.add(meal_id)
+            candidates[user_id] = meals[:n]
+        return candidates
+
+    def _item_based(self, user_ids: list, n: int) -> dict:
+        state = self.similarity
+        rows = [state["user_index"][user_id] for user_id in user_ids if user_id in state["user_index"]]
+        if not rows:
+            return {}
+
+        # ✅ Chunk scores = seen-indicator matrix x positive item-item similarities,
+        # computed only for the meals this chunk has interacted with
+        seen = state["users"].matrix[rows]
+        seen_cols = np.unique(seen.indices)
+        if seen_cols.size == 0:
+            return {}
+        item_sims = np.clip(state["items"].similarities(seen_cols, self.metric), 0, None)
+        indicator = seen[:, seen_cols].astype(bool).astype(np.float64)
+        scores = np.asarray(indicator @ item_sims)
+
+        candidates = {}
+        for block_row, row in enumerate(rows):
+            user_scores = scores[block_row]
+            user_scores[seen.indices[seen.indptr[block_row]:seen.indptr[block_row + 1]]] = 0
+            best = [i for i in top_k(user_scores, n) if user_scores[i] > 0]
+            candidates[int(state["user_ids"][row])] = [
+                meal_id for meal_id in (int(state["meal_ids"][i]) for i in best) if meal_id in self.meal_ids
+            ]
+        return candidates
+
+    def _row_meals(self, matrix, row: int) -> list:
+        cols = matrix.indices[matrix.indptr[row]:matrix.indptr[row + 1]]
+        return sorted(int(self.similarity["meal_ids"][c]) for c in cols)
+
+
+# Set in each pool worker by _init_worker
+_snapshot = None
+
+
+def _init_worker(snapshot: BatchSnapshot):
+    global _snapshot
+    _snapshot = snapshot
+
+    # Forked workers must not reuse the parent's pooled database connections
+    from app.core.database import engine
+    engine.dispose(close=False)
+
+
+def _score_chunk(user_ids: list, top_n: int) -> list:
+    return _snapshot.score_users(user_ids, top_n)
+
+
+def write_recommendations(db: Session, results: list, created_at: datetime):
+    """
+    Writes a chunk's recommendation sets in one bulk insert and switches them live atomically.
+    """
+    store_recommendation_sets(
+        db,
+        {user_id: [{"meal_id": meal_id} for meal_id in meal_ids] for user_id, meal_ids in results},
+        created_at=created_at,
+    )
+
+
+def precompute_all(top_n: int = 15, workers: int = None, chunk_size: int = 256, user_ids: list = None) -> dict:
+    """
+    Recomputes and stores recommendations for all (or the given) users.
+    """
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        snapshot = BatchSnapshot(db, settings.SIMILARITY_METRIC)
+        built = time.perf_counter()
+
+        targets = [user_id for user_id in (user_ids or snapshot.user_ids) if user_id in snapshot.diseases]
+        chunks = [targets[i:i + chunk_size] for i in range(0, len(targets), chunk_size)]
+        workers = max(1, min(workers or os.cpu_count() or 1, len(chunks) or 1))
+        created_at = datetime.utcnow()
+        written = 0
+
+        if workers == 1:
+            for chunk in chunks:
+                results = snapshot.score_users(chunk, top_n)
+                write_recommendations(db, results, created_at)
+                written += sum(len(meal_ids) for _, meal_ids in results)
+        else:
+            # Fork shares the snapshot copy-on-write; spawn (other platforms) pickles it once per worker
+            method = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context(method),
+                initializer=_init_worker,
+                initargs=(snapshot,),
+            ) as pool:
+                futures = [pool.submit(_score_chunk, chunk, top_n) for chunk in chunks]
+                for future in as_completed(futures):
+                    results = future.result()
+                    write_recommendations(db, results, created_at)
+                    written += sum(len(meal_ids) for _, meal_ids in results)
+    finally:
+        db.close()
+
+    finished = time.perf_counter()
+    return {
+        "users": len(targets),
+        "recommendations": written,
+        "workers": workers,
+        "build_seconds": round(built - started, 3),
+        "score_seconds": round(finished - built, 3),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute meal recommendations for all users.")
+    parser.add_argument("--top-n", type=int, default=15, help="Recommendations per recommender (as in hybrid_recommendation)")
+    parser.add_argument("--workers", type=int, default=None, help="Scoring processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=256, help="Users scored per matrix block")
+    parser.add_argument("--users", type=int, nargs="*", help="Only recompute these user ids")
+    args = parser.parse_args(argv)
+
+    summary = precompute_all(args.top_n, args.workers, args.chunk_size, args.users)
+    print("Batch recommendations:", summary)
+
+
+if __name__ == "__main__":
+    main()
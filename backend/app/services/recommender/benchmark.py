@@ -0,0 +1,237 @@
+"""
+Recommender benchmark on synthetic data tiers.
+
+    python -m app.services.recommender.benchmark [--scales 10 100 1000] [--users 20] [--json]
+
+Each tier is `scale` times the cleaned datasets (see `synthetic.py`), loaded once into
+`<workdir>/synthetic_<scale>x.db` (or `--database-url`, e.g. a local Postgres, with a
+`{scale}` placeholder) and reused on later runs. Measurements run in fresh interpreters,
+so every tier builds the shared recommender structures from scratch:
+
+- build: interaction model, popularity store, meal catalog, TF-IDF index, similarity engine
+- per call, over a sample of users: each recommender and `hybrid_recommendation`
+
+Timings come from an untraced run; peak memory (tracemalloc) from a second, traced run.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from sqlalchemy import create_engine, func, inspect, select
+from app.core.paths import BACKEND_DIR, resolve_data_path
+
+BUILD_STAGES = ("interaction_model", "popularity_store", "meal_catalog", "tfidf_index", "similarity_engine")
+RECOMMENDERS = ("content_based", "user_based", "item_based", "popularity", "hybrid")
+
+
+def _stages(db, top_n: int):
+    """
+    (build stages, per-user recommender calls) against `db`, imported here so the
+    worker process only loads the recommender stack when it measures it.
+    """
+    from app.models.user import User
+    from app.services.meal_service import get_meal_catalog
+    from app.services.recommender.collaborative import recommend_item_based, recommend_user_based
+    from app.services.recommender.content_based import recommend_content_based
+    from app.services.recommender.hybrid import hybrid_recommendation
+    from app.services.recommender.interactions import get_interaction_model
+    from app.services.recommender.popularity import get_popularity_store
+    from app.services.recommender.ranking import like_signals
+    from app.services.recommender.similarity import get_similarity_engine
+    from app.services.recommender.tfidf_index import meal_index_store
+
+    builds = {
+        "interaction_model": lambda: get_interaction_model(db),
+        "popularity_store": lambda: get_popularity_store(db),
+        "meal_catalog": lambda: get_meal_catalog(db),
+        "tfidf_index": lambda: meal_index_store.get(db),
+        "similarity_engine": lambda: get_similarity_engine(db),
+    }
+    # Same candidate list sizes as hybrid_recommendation asks each recommender for
+    recommenders = {
+        "content_based": lambda user: recommend_content_based(db, user.user_id, top_n * 2),
+        "user_based": lambda user: recommend_user_based(db, user.user_id, top_n * 2),
+        "item_based": lambda user: recommend_item_based(db, user.user_id, top_n * 2),
+        "popularity": lambda user: like_signals(db, user),
+        "hybrid": lambda user: hybrid_recommendation(db, user.user_id, top_n),
+    }
+
+    def users(sample_size: int, random_seed: int) -> list:
+        user_ids = [user_id for (user_id,) in db.query(User.user_id).order_by(User.user_id)]
+        sample = random.Random(random_seed).sample(user_ids, min(sample_size, len(user_ids)))
+        return db.query(User).filter(User.user_id.in_(sample)).order_by(User.user_id).all()
+
+    return builds, recommenders, users
+
+
+def measure(mode: str, sample_size: int, top_n: int, random_seed: int = 0) -> dict:
+    """
+    Worker side: builds and runs the recommenders on DATABASE_URL, reporting seconds
+    ("time" mode) or peak traced bytes ("memory" mode) per stage.
+    """
+    import tracemalloc
+    from app.core.database import SessionLocal
+
+    tracing = mode == "memory"
+    db = SessionLocal()
+    try:
+        builds, recommenders, sample_users = _stages(db, top_n)
+        users = sample_users(sample_size, random_seed)
+        if tracing:
+            tracemalloc.start()
+
+        def run(call):
+            if tracing:
+                tracemalloc.reset_peak()
+                baseline = tracemalloc.get_traced_memory()[0]
+                call()
+                return tracemalloc.get_traced_memory()[1] - baseline
+            started = time.perf_counter()
+            call()
+            return time.perf_counter() - started
+
+        result = {"build": {name: run(build) for name, build in builds.items()}, "recommenders": {}}
+        for name, recommend in recommenders.items():
+            result["recommenders"][name] = [run(lambda: recommend(user)) for user in users]
+        if not tracing:
+            import resource
+            result["max_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+        return result
+    finally:
+        db.close()
+
+
+def _run_worker(url: str, mode: str, sample_size: int, top_n: int) -> dict:
+    with tempfile.TemporaryDirectory(prefix="recommender-benchmark-") as cache_dir:
+        env = dict(os.environ)
+        env.update({
+            "DATABASE_URL": url,
+            "MODEL_CACHE_DIR": cache_dir,  # Cold TF-IDF index, and the app's cached one stays untouched
+            "DATA_DIR": os.path.dirname(os.path.abspath(resolve_data_path("cleaned"))),
+            "PYTHONPATH": os.pathsep.join(filter(None, [str(BACKEND_DIR), env.get("PYTHONPATH")])),
+        })
+        env.setdefault("OPENAI_API_KEY", "")
+        proc = subprocess.run(
+            [sys.executable, "-m", "app.services.recommender.benchmark", "--worker", mode,
+             "--users", str(sample_size), "--top-n", str(top_n)],
+            capture_output=True, text=True, env=env,
+        )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Benchmark worker ({mode}) failed:\n{proc.stderr[-2000:]}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def _row_counts(url: str):
+    """
+    Row counts of an already loaded tier, or None if the database is empty.
+    """
+    from app.models import Meal, RecentActivity, User
+
+    engine = create_engine(url)
+    try:
+        if not inspect(engine).has_table("users"):
+            return None
+        with engine.connect() as connection:
+            counts = {
+                name: connection.execute(select(func.count()).select_from(model)).scalar()
+                for name, model in (("users", User), ("meals", Meal), ("activities", RecentActivity))
+            }
+        return counts if counts["users"] else None
+    finally:
+        engine.dispose()
+
+
+def _summary(seconds: list, peaks: list) -> dict:
+    ordered = sorted(seconds)
+    return {
+        "calls": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 2) if ordered else 0.0,
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 2) if ordered else 0.0,
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 2) if ordered else 0.0,
+        "max_ms": round(ordered[-1] * 1000, 2) if ordered else 0.0,
+        "peak_memory_mb": round(max(peaks, default=0) / 2 ** 20, 2),
+    }
+
+
+def run_tier(scale: int, workdir: str, sample_size: int = 20, top_n: int = 15, database_url: str = None) -> dict:
+    """
+    Loads the tier (unless already loaded) and benchmarks it; returns timings and peak memory.
+    """
+    from app.services.recommender.synthetic import build_database
+
+    os.makedirs(workdir, exist_ok=True)
+    url = database_url.format(scale=scale) if database_url else f"sqlite:///{os.path.join(workdir, f'synthetic_{scale}x.db')}"
+    counts = _row_counts(url)
+    load_seconds = None
+    if counts is None:
+        started = time.perf_counter()
+        counts = build_database(url, scale)
+        load_seconds = round(time.perf_counter() - started, 2)
+
+    timings = _run_worker(url, "time", sample_size, top_n)
+    memory = _run_worker(url, "memory", sample_size, top_n)
+    return {
+        "scale": scale,
+        **counts,
+        "load_seconds": load_seconds,
+        "max_rss_mb": round(timings["max_rss_mb"], 1),
+        "build": {
+            name: {
+                "seconds": round(timings["build"][name], 3),
+                "peak_memory_mb": round(memory["build"][name] / 2 ** 20, 2),
+            }
+            for name in BUILD_STAGES
+        },
+        "recommenders": {
+            name: _summary(timings["recommenders"][name], memory["recommenders"][name])
+            for name in RECOMMENDERS
+        },
+    }
+
+
+def _print_report(results: list):
+    for tier in results:
+        print(
+            f"\n{tier['scale']}x: {tier['users']} users, {tier['meals']} meals, {tier['activities']} activities"
+            f" (max RSS {tier['max_rss_mb']} MB)"
+        )
+        for name, build in tier["build"].items():
+            print(f"  build {name:<19} {build['seconds'] * 1000:>10.1f} ms  peak {build['peak_memory_mb']:>8.2f} MB")
+        for name, summary in tier["recommenders"].items():
+            print(
+                f"  {name:<25} mean {summary['mean_ms']:>8.2f} ms  p95 {summary['p95_ms']:>8.2f} ms"
+                f"  peak {summary['peak_memory_mb']:>8.2f} MB  ({summary['calls']} users)"
+            )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the recommenders on synthetic data tiers.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[10, 100, 1000], help="Data size multipliers")
+    parser.add_argument("--users", type=int, default=20, help="Users sampled per tier")
+    parser.add_argument("--top-n", type=int, default=15, help="top_n passed to hybrid_recommendation")
+    parser.add_argument("--workdir", default=os.path.join("data", "benchmarks"), help="Where tier databases are kept")
+    parser.add_argument("--database-url", help="Database URL template with {scale} (default: SQLite files in workdir)")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    parser.add_argument("--worker", choices=["time", "memory"], help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(measure(args.worker, args.users, args.top_n)))
+        return
+
+    results = []
+    for scale in args.scales:
+        results.append(run_tier(scale, args.workdir, args.users, args.top_n, args.database_url))
+        if not args.json:
+            _print_report(results[-1:])
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
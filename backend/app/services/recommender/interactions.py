@@ -0,0 +1,200 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.recent_activity import RecentActivity
+
+
+def interaction_score(liked, purchased, rated) -> int:
+    """
+    Positive interaction score of a single activity row (liked + purchased + rated).
+    """
+    return int(bool(liked)) + int(bool(purchased)) + int(bool(rated))
+
+
+class ActivityView(ABC):
+    """
+    Base for long-lived, in-memory views over `user_activity` meal rows.
+
+    Built once with `load`, then kept current incrementally: `/interact` records the
+    rows it writes, and `sync` picks up rows inserted or updated by other workers
+    using activity_id / timestamp watermarks. Applying a row twice is a no-op.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._load_lock = threading.Lock()  # Serialises load/sync without blocking readers
+        self._max_activity_id = 0
+        self._max_timestamp = None
+        self._last_sync = 0.0
+        self.loaded = False
+        self.version = 0  # Bumped on every change so derived structures can be cached
+
+    def load(self, db: Session):
+        """
+        (Re)builds the view from the full `user_activity` table.
+        """
+        rows = self._query(db).all()
+
+        with self._lock:
+            self._reset()
+            self._max_activity_id = 0
+            self._max_timestamp = None
+            self._ingest(rows)
+            self._last_sync = time.monotonic()
+            self.loaded = True
+            self.version += 1
+
+    def sync(self, db: Session):
+        """
+        Applies rows inserted or updated since the last load/sync.
+        """
+        conditions = [RecentActivity.activity_id > self._max_activity_id]
+        if self._max_timestamp is not None:
+            conditions.append(RecentActivity.timestamp >= self._max_timestamp)
+        rows = self._query(db).filter(or_(*conditions)).all()
+
+        with self._lock:
+            if self._ingest(rows):
+                self.version += 1
+            self._last_sync = time.monotonic()
+
+    def refresh(self, db: Session, force: bool = False):
+        """
+        Loads the view on first use, then syncs rows written by other workers every
+        INTERACTION_SYNC_SECONDS (or right away with `force`). Returns the view.
+        """
+        if not self.loaded:
+            with self._load_lock:
+                if not self.loaded:
+                    self.load(db)
+                    return self
+        if force or self.needs_sync():
+            with self._load_lock:
+                if force or self.needs_sync():
+                    self.sync(db)
+        return self
+
+    def needs_sync(self) -> bool:
+        return time.monotonic() - self._last_sync >= settings.INTERACTION_SYNC_SECONDS
+
+    def _query(self, db: Session):
+        return db.query(
+            RecentActivity.activity_id,
+            RecentActivity.user_id,
+            RecentActivity.meal_id,
+            RecentActivity.liked,
+            RecentActivity.purchased,
+            RecentActivity.rated,
+            RecentActivity.timestamp,
+        ).filter(RecentActivity.meal_id.isnot(None))
+
+    def _ingest(self, rows) -> bool:
+        changed = False
+        for row in rows:
+            if row.activity_id > self._max_activity_id:
+                self._max_activity_id = row.activity_id
+            if row.timestamp is not None and (self._max_timestamp is None or row.timestamp > self._max_timestamp):
+                self._max_timestamp = row.timestamp
+            if row.meal_id is not None and self._apply_row(row):
+                changed = True
+        return changed
+
+    @abstractmethod
+    def _reset(self):
+        """
+        Clears the view's derived state (before a full load).
+        """
+
+    @abstractmethod
+    def _apply_row(self, row) -> bool:
+        """
+        Applies one activity row; returns whether the view changed.
+        """
+
+
+class InteractionModel(ActivityView):
+    """
+    Long-lived user-item interaction model shared by the collaborative recommenders.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._reset()
+
+    def _reset(self):
+        self._rows = {}  # activity_id -> (user_id, meal_id, score)
+        self._cells = defaultdict(dict)  # (user_id, meal_id) -> {activity_id: score}
+        self._user_items = defaultdict(dict)  # user_id -> {meal_id: max score > 0}
+
+    def record(self, activity: RecentActivity):
+        """
+        Applies a single activity row written by this process.
+        """
+        with self._lock:
+            if self._ingest([activity]):
+                self.version += 1
+
+    def user_items(self, user_id: int) -> dict:
+        """
+        Returns {meal_id: score} for a user's positive interactions.
+        """
+        with self._lock:
+            return dict(self._user_items.get(user_id, {}))
+
+    def triples(self) -> list:
+        """
+        Returns every positive (user_id, meal_id, score) cell.
+        """
+        with self._lock:
+            return [
+                (user_id, meal_id, score)
+                for user_id, items in self._user_items.items()
+                for meal_id, score in items.items()
+            ]
+
+    def _apply_row(self, row) -> bool:
+        score = interaction_score(row.liked, row.purchased, row.rated)
+        previous = self._rows.get(row.activity_id)
+        if previous == (row.user_id, row.meal_id, score):
+            return False
+
+        # ✅ Move the row out of its previous cell (user/meal of a row never change in practice)
+        if previous is not None:
+            self._cells[previous[:2]].pop(row.activity_id, None)
+            self._refresh_cell(*previous[:2])
+
+        self._rows[row.activity_id] = (row.user_id, row.meal_id, score)
+        self._cells[(row.user_id, row.meal_id)][row.activity_id] = score
+        self._refresh_cell(row.user_id, row.meal_id)
+        return True
+
+    def _refresh_cell(self, user_id: int, meal_id: int):
+        # ✅ Duplicate rows for the same user/meal collapse to their max score
+        scores = self._cells.get((user_id, meal_id))
+        best = max(scores.values()) if scores else 0
+        if not scores:
+            self._cells.pop((user_id, meal_id), None)
+
+        items = self._user_items[user_id]
+        if best > 0:
+            items[meal_id] = best
+        else:
+            items.pop(meal_id, None)
+            if not items:
+                del self._user_items[user_id]
+
+
+# Process-wide model, built at startup
+interaction_model = InteractionModel()
+
+
+def get_interaction_model(db: Session) -> InteractionModel:
+    """
+    Returns the shared interaction model, loading it on first use and
+    periodically syncing rows written by other workers.
+    """
+    return interaction_model.refresh(db)
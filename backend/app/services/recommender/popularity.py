@@ -0,0 +1,185 @@
+import heapq
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.models.recent_activity import RecentActivity
+from app.models.user import User
+from app.services.recommender.interactions import ActivityView
+
+_NO_DISEASE = object()
+
+
+class PopularityStore(ActivityView):
+    """
+    Materialized like counts (global, per disease and per day), maintained
+    incrementally from `/interact` so popularity is a lookup rather than a scan.
+    Profile updates made by other workers are picked up by `sync` through a
+    `users.updated_at` watermark.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._max_user_updated_at = None
+        self._reset()
+
+    def _reset(self):
+        self._liked_rows = {}  # activity_id -> (user_id, meal_id, day) for rows currently liked
+        self._user_likes = defaultdict(dict)  # user_id -> {activity_id: meal_id}
+        self._user_disease = {}  # user_id -> disease string the user's likes are counted under
+        self._global = Counter()
+        self._by_disease = defaultdict(Counter)
+        self._daily = defaultdict(Counter)  # date -> likes made that day
+        self._top_cache = {}  # ("global",) / ("disease", disease) -> ranked [(meal_id, count)]
+
+    def _query(self, db: Session):
+        return super()._query(db).add_columns(User.disease).join(
+            User, User.user_id == RecentActivity.user_id
+        )
+
+    def load(self, db: Session):
+        # Watermark first: a profile updated while the view loads is re-read by the next sync
+        max_user_updated_at = db.query(func.max(User.updated_at)).scalar()
+        super().load(db)
+        with self._lock:
+            self._max_user_updated_at = max_user_updated_at
+
+    def sync(self, db: Session):
+        """
+        Applies likes and user disease changes written since the last load/sync.
+        """
+        super().sync(db)
+
+        query = db.query(User.user_id, User.disease, User.updated_at).filter(User.updated_at.isnot(None))
+        if self._max_user_updated_at is not None:
+            query = query.filter(User.updated_at >= self._max_user_updated_at)
+        users = query.all()
+
+        with self._lock:
+            changed = False
+            for user in users:
+                if self._max_user_updated_at is None or user.updated_at > self._max_user_updated_at:
+                    self._max_user_updated_at = user.updated_at
+                changed = self._set_disease(user.user_id, user.disease) or changed
+            if changed:
+                self.version += 1
+
+    def record(self, activity: RecentActivity, disease: str):
+        """
+        Applies a single activity row written by this process for a user with `disease`.
+        """
+        with self._lock:
+            changed = self._set_disease(activity.user_id, disease)
+            if self._ingest([activity]) or changed:
+                self.version += 1
+
+    def set_user_disease(self, user_id: int, disease: str):
+        """
+        Re-files a user's likes under a new disease after a profile update.
+        """
+        with self._lock:
+            if self._set_disease(user_id, disease):
+                self.version += 1
+
+    def global_counts(self) -> Counter:
+        """
+        meal_id -> likes by all users (live view, read-only).
+        """
+        return self._global
+
+    def disease_counts(self, disease: str) -> Counter:
+        """
+        meal_id -> likes by users with exactly this disease string (live view, read-only).
+        """
+        return self._by_disease.get(disease, Counter())
+
+    def top_global(self, n: int) -> list:
+        return self._top(("global",), self._global, n)
+
+    def top_for_disease(self, disease: str, n: int) -> list:
+        return self._top(("disease", disease), self._by_disease.get(disease, Counter()), n)
+
+    def top_recent(self, n: int, days: int = 7) -> list:
+        """
+        Most liked meals over the last `days` days, as [(meal_id, count)].
+        """
+        with self._lock:
+            cutoff = datetime.utcnow().date() - timedelta(days=days - 1)
+            window = Counter()
+            for day, counts in self._daily.items():
+                if day >= cutoff:
+                    window.update(counts)
+        return heapq.nlargest(n, window.items(), key=lambda item: item[1])
+
+    def user_liked(self, user_id: int) -> list:
+        """
+        Meals the user currently likes, oldest like first.
+        """
+        with self._lock:
+            likes = sorted(self._user_likes.get(user_id, {}).items())
+        return list(dict.fromkeys(meal_id for _, meal_id in likes))
+
+    def _top(self, key: tuple, counts: Counter, n: int) -> list:
+        # ✅ Ranking is cached per key and only recomputed after that key changes
+        ranked = self._top_cache.get(key)
+        if ranked is None:
+            with self._lock:
+                ranked = sorted(
+                    ((meal_id, count) for meal_id, count in counts.items() if count > 0),
+                    key=lambda item: item[1], reverse=True
+                )
+                self._top_cache[key] = ranked
+        return ranked[:n]
+
+    def _apply_row(self, row) -> bool:
+        # Rows loaded from the database carry the user's current disease; ORM rows don't
+        disease = getattr(row, "disease", _NO_DISEASE)
+        changed = disease is not _NO_DISEASE and self._set_disease(row.user_id, disease)
+
+        tracked = row.activity_id in self._liked_rows
+        if row.liked and not tracked:
+            day = row.timestamp.date() if row.timestamp else datetime.utcnow().date()
+            self._liked_rows[row.activity_id] = (row.user_id, row.meal_id, day)
+            self._user_likes[row.user_id][row.activity_id] = row.meal_id
+            self._count(row.user_id, row.meal_id, day, 1)
+            return True
+        if not row.liked and tracked:
+            user_id, meal_id, day = self._liked_rows.pop(row.activity_id)
+            self._user_likes[user_id].pop(row.activity_id, None)
+            self._count(user_id, meal_id, day, -1)
+            return True
+        return changed
+
+    def _count(self, user_id: int, meal_id: int, day, delta: int):
+        disease = self._user_disease.get(user_id)
+        self._global[meal_id] += delta
+        self._by_disease[disease][meal_id] += delta
+        self._daily[day][meal_id] += delta
+        self._top_cache.pop(("global",), None)
+        self._top_cache.pop(("disease", disease), None)
+
+    def _set_disease(self, user_id: int, disease: str) -> bool:
+        old_disease = self._user_disease.get(user_id, _NO_DISEASE)
+        self._user_disease[user_id] = disease
+        if old_disease is _NO_DISEASE or old_disease == disease:
+            return False
+
+        # ✅ Move the user's existing likes to the new disease bucket
+        for meal_id in self._user_likes.get(user_id, {}).values():
+            self._by_disease[old_disease][meal_id] -= 1
+            self._by_disease[disease][meal_id] += 1
+        self._top_cache.pop(("disease", old_disease), None)
+        self._top_cache.pop(("disease", disease), None)
+        return True
+
+
+# Process-wide store, built at startup
+popularity_store = PopularityStore()
+
+
+def get_popularity_store(db: Session) -> PopularityStore:
+    """
+    Returns the shared popularity store, loading it on first use and
+    periodically syncing likes written by other workers.
+    """
+    return popularity_store.refresh(db)
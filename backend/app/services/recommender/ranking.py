@@ -0,0 +1,64 @@
+from sqlalchemy.orm import Session
+from app.models.user import User
+from app.services.recommender.popularity import get_popularity_store
+
+# Priority weights used by the hybrid ranking
+GLOBAL_LIKE_WEIGHT = 3  # Global impact
+SIMILAR_LIKE_WEIGHT = 5  # Personal impact (users with the same condition)
+USER_LIKED_BOOST = 10  # Meals the user already liked
+TOP_SIMILAR_BOOST = 25  # Most popular meals among users with the same disease
+TOP_SIMILAR_COUNT = 5
+
+
+class LikeSignals:
+    """
+    Like-based ranking signals for one user.
+    """
+    __slots__ = ("global_counts", "similar_counts", "user_liked", "top_similar")
+
+    def __init__(self, global_counts, similar_counts, user_liked: list, top_similar: list):
+        self.global_counts = global_counts  # meal_id -> likes by all users
+        self.similar_counts = similar_counts  # meal_id -> likes by users with the same disease
+        self.user_liked = user_liked  # meal_ids the user liked, oldest like first
+        self.top_similar = top_similar  # most liked meal_ids among users with the same disease
+
+
+def like_signals(db: Session, user: User) -> LikeSignals:
+    """
+    Like-based signals for a user, read from the materialized popularity store (no scans).
+    """
+    store = get_popularity_store(db)
+    return LikeSignals(
+        store.global_counts(),
+        store.disease_counts(user.disease),
+        store.user_liked(user.user_id),
+        [meal_id for meal_id, count in store.top_for_disease(user.disease, TOP_SIMILAR_COUNT)]
+    )
+
+
+def rank_recommendations(rec_lists: list, signals: LikeSignals) -> list:
+    """
+    Merges recommender outputs (first occurrence of a meal wins) and orders them by
+    popularity and personal preference. O(candidates), no per-candidate queries.
+    """
+    merged = {}
+    for rec_list in rec_lists:
+        if isinstance(rec_list, list):
+            for rec in rec_list:
+                if isinstance(rec, dict) and rec["meal_id"] not in merged:
+                    merged[rec["meal_id"]] = rec
+
+    user_liked = set(signals.user_liked)
+    top_similar = set(signals.top_similar)
+
+    def priority(meal_id):
+        score = signals.global_counts.get(meal_id, 0) * GLOBAL_LIKE_WEIGHT
+        score += signals.similar_counts.get(meal_id, 0) * SIMILAR_LIKE_WEIGHT
+        if meal_id in user_liked:
+            score += USER_LIKED_BOOST
+        if meal_id in top_similar:
+            score += TOP_SIMILAR_BOOST
+        return score
+
+    # Stable sort keeps recommender order between equal priorities
+    return sorted(merged.values(), key=lambda rec: priority(rec["meal_id"]), reverse=True)
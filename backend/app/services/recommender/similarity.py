@@ -0,0 +1,179 @@
+import threading
+import numpy as np
+from scipy import sparse
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.services.recommender.interactions import InteractionModel, get_interaction_model
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k largest scores in descending order (partition, then sort only k).
+    Ties go to the lower index, like a stable sort of all scores would.
+    """
+    if k <= 0 or scores.size == 0:
+        return np.empty(0, dtype=np.int64)
+    if k < scores.size:
+        # ✅ Everything above the k-th largest score, then the lowest-index ties at it
+        kth = np.partition(scores, scores.size - k)[scores.size - k]
+        above = np.flatnonzero(scores > kth)
+        candidates = np.concatenate([above, np.flatnonzero(scores == kth)[:k - above.size]])
+    else:
+        candidates = np.arange(scores.size)
+    return candidates[np.lexsort((candidates, -scores[candidates]))]
+
+
+class _RowSpace:
+    """
+    A CSR matrix whose rows are compared against each other, with the
+    per-row statistics needed for Pearson/cosine precomputed.
+    """
+
+    def __init__(self, matrix: sparse.csr_matrix):
+        self.matrix = matrix
+        self.n_cols = matrix.shape[1]
+        self.sums = np.asarray(matrix.sum(axis=1)).ravel()
+        self.norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+
+    def similarities(self, rows: np.ndarray, metric: str) -> np.ndarray:
+        """
+        Dense (len(rows) x n_rows) similarity block; memory is bounded by len(rows).
+        """
+        dots = (self.matrix[rows] @ self.matrix.T).toarray()
+
+        if metric == "cosine":
+            denom = np.outer(self.norms[rows], self.norms)
+        else:
+            # ✅ Pearson over the zero-filled rows, without densifying the matrix:
+            # cov(a, b) = a.b / n - mean_a * mean_b
+            n = self.n_cols
+            means = self.sums / n
+            dots = dots / n - np.outer(means[rows], means)
+            std = np.sqrt(np.maximum(self.norms ** 2 / n - means ** 2, 0.0))
+            denom = np.outer(std[rows], std)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sims = np.where(denom > 0, dots / denom, 0.0)
+        return sims
+
+
+class SimilarityEngine:
+    """
+    Sparse user-user and item-item similarity over the shared interaction model.
+    The CSR matrices are rebuilt only when the interaction model changes.
+    """
+
+    def __init__(self, metric: str = "pearson"):
+        self.metric = metric
+        self._lock = threading.Lock()
+        self._version = None
+        self._state = None
+
+    @classmethod
+    def from_triples(cls, triples: list, metric: str = "pearson") -> "SimilarityEngine":
+        """
+        Engine built once from (user_id, meal_id, score) triples, e.g. for offline scoring.
+        """
+        engine = cls(metric)
+        engine._state = cls._build(triples)
+        return engine
+
+    @property
+    def state(self) -> dict:
+        """
+        The built structures: user / meal ids, their row indexes and the user and item
+        row spaces (None until built). Plain data, so it can be pickled.
+        """
+        return self._state
+
+    def refresh(self, model: InteractionModel):
+        if self._version == model.version:
+            return
+        with self._lock:
+            if self._version == model.version:
+                return
+            version = model.version
+            self._state = self._build(model.triples())
+            self._version = version
+
+    @staticmethod
+    def _build(triples: list) -> dict:
+        if triples:
+            users, meals, scores = (np.asarray(column) for column in zip(*triples))
+        else:
+            users = meals = np.empty(0, dtype=np.int64)
+            scores = np.empty(0, dtype=np.float64)
+
+        user_ids, user_rows = np.unique(users, return_inverse=True)
+        meal_ids, meal_cols = np.unique(meals, return_inverse=True)
+        matrix = sparse.csr_matrix(
+            (scores.astype(np.float64), (user_rows, meal_cols)),
+            shape=(len(user_ids), len(meal_ids)),
+        )
+        return {
+            "user_ids": user_ids,
+            "meal_ids": meal_ids,
+            "user_index": {int(u): i for i, u in enumerate(user_ids)},
+            "meal_index": {int(m): i for i, m in enumerate(meal_ids)},
+            "users": _RowSpace(matrix),
+            "items": _RowSpace(matrix.T.tocsr()),
+        }
+
+    def user_neighbors(self, user_id: int, k: int) -> list:
+        """
+        Top-k most similar users as [(user_id, similarity)], excluding the user.
+        """
+        state = self._state
+        row = state["user_index"].get(user_id) if state else None
+        if row is None:
+            return []
+
+        sims = state["users"].similarities(np.array([row]), self.metric)[0]
+        sims[row] = -np.inf  # ✅ Exclude self-similarity
+        best = top_k(sims, min(k, sims.size - 1))
+        return [(int(state["user_ids"][i]), float(sims[i])) for i in best]
+
+    def user_meals(self, user_id: int) -> list:
+        """
+        Meals a user interacted with positively, in meal_id order.
+        """
+        state = self._state
+        row = state["user_index"].get(user_id) if state else None
+        if row is None:
+            return []
+        matrix = state["users"].matrix
+        cols = matrix.indices[matrix.indptr[row]:matrix.indptr[row + 1]]
+        return sorted(int(state["meal_ids"][c]) for c in cols)
+
+    def item_based_scores(self, user_id: int, k: int) -> list:
+        """
+        Top-k unseen meals for a user as [(meal_id, score)], where the score is the
+        sum of positive item-item similarities to the meals the user interacted with.
+        """
+        state = self._state
+        row = state["user_index"].get(user_id) if state else None
+        if row is None:
+            return []
+
+        matrix = state["users"].matrix
+        seen = matrix.indices[matrix.indptr[row]:matrix.indptr[row + 1]]
+        if seen.size == 0:
+            return []
+
+        sims = state["items"].similarities(seen, self.metric)
+        scores = np.clip(sims, 0, None).sum(axis=0)
+        scores[seen] = 0  # ✅ Skip meals the user already interacted with
+        best = [i for i in top_k(scores, k) if scores[i] > 0]
+        return [(int(state["meal_ids"][i]), float(scores[i])) for i in best]
+
+
+# Process-wide engine, rebuilt lazily from the interaction model
+similarity_engine = SimilarityEngine(metric=settings.SIMILARITY_METRIC)
+
+
+def get_similarity_engine(db: Session) -> SimilarityEngine:
+    """
+    Returns the shared similarity engine, current with the interaction model.
+    """
+    similarity_engine.refresh(get_interaction_model(db))
+    return similarity_engine
@@ -0,0 +1,144 @@
+"""
+Synthetic recommender data at N times the size of the cleaned datasets.
+
+Users, meals and meal activity are drawn from `data/cleaned/*.csv`: every synthetic
+user/meal is a copy of a real one (profile, disease/diet tags, veg flag) and every
+activity row is a real one re-pointed at a random copy of its user and meal, so
+per-user activity counts, meal popularity and like/purchase rates keep their shape.
+"""
+import csv
+import random
+from datetime import datetime
+from sqlalchemy import create_engine, insert
+from app.core.database import Base
+from app.core.paths import resolve_data_path
+from app.models import Meal, RecentActivity, User  # Package import registers every table for create_all
+
+USER_PROFILES_PATH = "cleaned/cleaned_user_profiles.csv"
+MEALS_PATH = "cleaned/cleaned_meals.csv"
+ACTIVITY_PATH = "cleaned/cleaned_recent_activity.csv"
+
+# Placeholder bcrypt hash; synthetic users never log in
+PASSWORD_HASH = "$2b$04$Hhpf2/wSfgHZHaehhzhOaenxttGG1toOtCd2ebrXIneQ9HDNgh2pW"
+INSERT_BATCH_SIZE = 20000
+
+
+def _read_csv(relative_path: str) -> list:
+    with open(resolve_data_path(relative_path), newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+class SeedData:
+    """
+    The cleaned datasets the synthetic data is scaled from.
+    """
+
+    def __init__(self):
+        self.users = _read_csv(USER_PROFILES_PATH)
+        self.meals = _read_csv(MEALS_PATH)
+        self.activity = _read_csv(ACTIVITY_PATH)
+        self._user_index = {int(row["User_Id"]): i for i, row in enumerate(self.users)}
+        self._meal_index = {int(row["Meal_Id"]): i for i, row in enumerate(self.meals)}
+        # Activity rows pointing at users/meals missing from the seed files can't be scaled
+        self.activity = [
+            row for row in self.activity
+            if int(row["User_Id"]) in self._user_index and int(row["Meal_Id"]) in self._meal_index
+        ]
+
+    def user_index(self, user_id: int) -> int:
+        return self._user_index[user_id]
+
+    def meal_index(self, meal_id: int) -> int:
+        return self._meal_index[meal_id]
+
+
+def generate_users(seed: SeedData, scale: int, rng: random.Random):
+    """
+    Users 1..len(seed.users) * scale; copy k of seed user i gets id k * len(seed.users) + i + 1.
+    """
+    for copy in range(scale):
+        for i, row in enumerate(seed.users):
+            user_id = copy * len(seed.users) + i + 1
+            yield {
+                "user_id": user_id,
+                "username": f"synthetic_{user_id}",
+                "password_hash": PASSWORD_HASH,
+                "email": f"synthetic_{user_id}@example.com",
+                "veg_non": row["Veg_Non"] == "1",
+                "height": round(rng.uniform(150, 195), 1),
+                "weight": round(rng.uniform(45, 110), 1),
+                "disease": row["Disease"],
+                "diet": row["Diet"],
+                "gender": rng.random() < 0.5,
+            }
+
+
+def generate_meals(seed: SeedData, scale: int, rng: random.Random):
+    """
+    Meals 1..len(seed.meals) * scale, numbered like the users; copies keep the seed meal's tags.
+    """
+    for copy in range(scale):
+        for i, row in enumerate(seed.meals):
+            yield {
+                "meal_id": copy * len(seed.meals) + i + 1,
+                "name": row["Name"] if copy == 0 else f"{row['Name']} #{copy + 1}",
+                "category": row["catagory"],
+                "description": row["description"],
+                "veg_non": row["Veg_Non"] == "1",
+                "nutrient": row["Nutrient"],
+                "disease": row["Disease"],
+                "diet": row["Diet"],
+                "price": round(float(row["Price"] or 0) * rng.uniform(0.8, 1.2), 2),
+            }
+
+
+def generate_activity(seed: SeedData, scale: int, rng: random.Random):
+    """
+    len(seed.activity) * scale meal interactions, each a seed row moved to random user/meal copies.
+    """
+    n_users, n_meals = len(seed.users), len(seed.meals)
+    for _ in range(scale):
+        for row in seed.activity:
+            yield {
+                "user_id": rng.randrange(scale) * n_users + seed.user_index(int(row["User_Id"])) + 1,
+                "meal_id": rng.randrange(scale) * n_meals + seed.meal_index(int(row["Meal_Id"])) + 1,
+                "rated": row["Rated"] == "1",
+                "liked": row["Liked"] == "1",
+                "searched": row["Searched"] == "1",
+                "purchased": row["Purchased"] == "1",
+                "timestamp": datetime.fromisoformat(row["Timestamp"]),
+            }
+
+
+def _insert_batches(connection, model, rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= INSERT_BATCH_SIZE:
+            connection.execute(insert(model), batch)
+            batch = []
+    if batch:
+        connection.execute(insert(model), batch)
+
+
+def build_database(url: str, scale: int, random_seed: int = 0) -> dict:
+    """
+    Creates the schema in an empty database at `url` (SQLite file or a local Postgres)
+    and loads `scale` times the seed data. Returns the row counts.
+    """
+    seed = SeedData()
+    rng = random.Random(random_seed)
+    engine = create_engine(url)
+    try:
+        Base.metadata.create_all(engine)
+        with engine.begin() as connection:
+            _insert_batches(connection, User, generate_users(seed, scale, rng))
+            _insert_batches(connection, Meal, generate_meals(seed, scale, rng))
+            _insert_batches(connection, RecentActivity, generate_activity(seed, scale, rng))
+    finally:
+        engine.dispose()
+    return {
+        "users": len(seed.users) * scale,
+        "meals": len(seed.meals) * scale,
+        "activities": len(seed.activity) * scale,
+    }
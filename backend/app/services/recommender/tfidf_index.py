@@ -0,0 +1,92 @@
+import os
+import threading
+import numpy as np
+from sqlalchemy.orm import Session
+from app.core.artifacts import load_pickle, save_pickle
+from app.core.config import settings
+from app.core.paths import resolve_output_path
+from app.services.meal_service import MealCatalog, get_meal_catalog
+
+INDEX_FILE_NAME = "meal_tfidf.pkl"
+
+
+class MealTfidfIndex:
+    """
+    Fitted TF-IDF vectorizer plus the (L2-normalised) meal vectors it produced.
+    """
+
+    def __init__(self, fingerprint: str, vectorizer, vectors, meal_ids):
+        self.fingerprint = fingerprint  # Fingerprint of the meal catalog it was built from
+        self.vectorizer = vectorizer
+        self.vectors = vectors
+        self.meal_ids = meal_ids
+
+    @classmethod
+    def build(cls, catalog: MealCatalog):
+        from sklearn.feature_extraction.text import TfidfVectorizer  # Heavy import, only needed to (re)fit
+
+        meals = catalog.all()
+
+        # Include all relevant features for better matching
+        features = [
+            ((meal.nutrient or "") + " " + (meal.disease or "") + " " + (meal.diet or "")).lower()
+            for meal in meals
+        ]
+
+        vectorizer = TfidfVectorizer(stop_words='english')  # Remove common English words
+        vectors = vectorizer.fit_transform(features) if features else None
+        meal_ids = np.array([meal.meal_id for meal in meals], dtype=np.int64)
+        return cls(catalog.fingerprint, vectorizer, vectors, meal_ids)
+
+    def scores(self, profile: str) -> np.ndarray:
+        """
+        Cosine similarity of a profile string to every meal (one sparse dot product).
+        """
+        user_vector = self.vectorizer.transform([profile])
+        return (self.vectors @ user_vector.T).toarray().ravel()
+
+    def save(self, path: str):
+        save_pickle(self, path)  # ✅ Atomic, so other workers never read a partial file
+
+    @staticmethod
+    def load(path: str):
+        return load_pickle(path)
+
+
+class MealIndexStore:
+    """
+    Keeps the TF-IDF meal index in memory and persisted on disk,
+    invalidated only when the meal catalog (i.e. the `meals` table) changes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._index = None
+
+    def get(self, db: Session) -> MealTfidfIndex:
+        catalog = get_meal_catalog(db)
+        index = self._index
+        if index is not None and index.fingerprint == catalog.fingerprint:
+            return index
+
+        with self._lock:
+            if self._index is None or self._index.fingerprint != catalog.fingerprint:
+                self._index = self._load_or_build(catalog)
+            return self._index
+
+    def _load_or_build(self, catalog: MealCatalog) -> MealTfidfIndex:
+        index = MealTfidfIndex.load(self.path)
+        if index is not None and index.fingerprint == catalog.fingerprint:
+            return index
+
+        index = MealTfidfIndex.build(catalog)
+        try:
+            index.save(self.path)
+        except OSError as e:
+            print(f"Error persisting TF-IDF meal index: {str(e)}")
+        return index
+
+
+# Process-wide index store
+meal_index_store = MealIndexStore(os.path.join(resolve_output_path(settings.MODEL_CACHE_DIR), INDEX_FILE_NAME))
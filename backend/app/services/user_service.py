@@ -1,18 +1,12 @@
 from sqlalchemy.orm import Session
 from app.repositories.user_repository import insert_user, get_user_by_username, update_user_details
-from app.models.user import User
-import bcrypt
+from app.core.concurrency import run_blocking
+from app.core.security import hash_password_async, verify_password_async
 from app.services.llm_service import LLMService
-from app.models.recommendations import Recommendation
-from app.services.recommender.hybrid import hybrid_recommendation
-
-# Function to hash password
-def hash_password(password: str) -> str:
-    salt = bcrypt.gensalt()
-    return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
+from app.services.jobs import recommendation_jobs
 
 # Business Logic for creating a user
-def create_user(
+async def create_user(
     db: Session,
     username: str,
     password: str,
@@ -24,40 +18,29 @@ def create_user(
     diet: str,
     gender: bool
 ):
-    existing_user = get_user_by_username(db, username)
+    existing_user = await run_blocking(get_user_by_username, db, username)
     if existing_user:
         return {"error": "Username or Email already exists"}
 
 
-    # ✅ Hash password only if user doesn't exist
-    hashed_password = hash_password(password)
+    # ✅ Hash password only if user doesn't exist (on the password-hashing pool, off the event loop)
+    hashed_password = await hash_password_async(password)
 
-    return insert_user(db, username, hashed_password, email, veg_non, height, weight, disease, diet, gender)
+    return await run_blocking(
+        insert_user, db, username, hashed_password, email, veg_non, height, weight, disease, diet, gender
+    )
 
-def login_user(db: Session, username: str, password: str):
+async def login_user(db: Session, username: str, password: str):
     """
-    Authenticates a user and triggers the recommendation system.
+    Authenticates a user and schedules a recommendation refresh; returns without waiting for it.
     """
-    user = db.query(User).filter(User.username == username).first()
+    user = await run_blocking(get_user_by_username, db, username)
 
-    if not user or not bcrypt.checkpw(password.encode("utf-8"), user.password_hash.encode("utf-8")):
+    if not user or not await verify_password_async(password, user.password_hash):
         return {"error": "Invalid credentials"}
 
-    # ✅ Automatically generate recommendations on login
-    recommendations = hybrid_recommendation(db, user.user_id, top_n=5)
-
-    # ✅ Store recommendations in the database
-    db.query(Recommendation).filter(Recommendation.user_id == user.user_id).delete()  # ✅ Clear old recommendations
-    for rec in recommendations:
-        db_rec = Recommendation(
-            user_id=user.user_id,
-            meal_id=rec.get("meal_id"),
-            exercise_id=rec.get("exercise_id"),
-            recommendation_reason="Generated on login"
-        )
-        db.add(db_rec)
-
-    db.commit()
+    # ✅ Refresh recommendations in the background; /recommend serves the current set until the new one is stored
+    recommendation_jobs.enqueue(user.user_id)
 
     # ✅ Return `user_id` along with success message
     return {
@@ -0,0 +1,18 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.core.database import Base
+import app.models  # noqa: F401  (registers every table on Base.metadata)
+
+
+@pytest.fixture
+def db(tmp_path):
+    """
+    Session on a fresh SQLite database with the models' schema.
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
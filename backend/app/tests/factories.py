@@ -0,0 +1,29 @@
+from datetime import datetime
+from app.models import Meal, RecentActivity, User
+
+
+def add_user(db, user_id: int, disease: str = "diabetes", diet: str = "low_sugar") -> User:
+    user = User(
+        user_id=user_id, username=f"user{user_id}", password_hash="x", email=f"user{user_id}@example.com",
+        veg_non=False, height=170.0, weight=70.0, disease=disease, diet=diet, gender=True,
+    )
+    db.add(user)
+    db.commit()
+    return user
+
+
+def add_meal(db, meal_id: int, nutrient: str = "fiber", disease: str = "diabetes", diet: str = "low_sugar") -> Meal:
+    meal = Meal(meal_id=meal_id, name=f"Meal {meal_id}", veg_non=False, nutrient=nutrient, disease=disease, diet=diet)
+    db.add(meal)
+    db.commit()
+    return meal
+
+
+def add_activity(db, user_id: int, meal_id: int, liked=False, purchased=False, rated=False, timestamp=None) -> RecentActivity:
+    activity = RecentActivity(
+        user_id=user_id, meal_id=meal_id, liked=liked, purchased=purchased, rated=rated,
+        timestamp=timestamp or datetime(2026, 1, 1),
+    )
+    db.add(activity)
+    db.commit()
+    return activity
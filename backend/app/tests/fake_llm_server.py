@@ -0,0 +1,132 @@
+"""
+OpenAI-compatible fake LLM server, a stand-in for tests and local development.
+
+    python app/tests/fake_llm_server.py --port 8089
+    OPENAI_BASE_URL=http://127.0.0.1:8089/v1 uvicorn app.main:app
+
+Disease-extraction prompts (single or numbered batches) are answered with the
+vocabulary terms that appear in each history; any other prompt gets a fixed diet.
+Latency and failures can be injected.
+"""
+import argparse
+import asyncio
+import socket
+import threading
+import time
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+FAKE_DIET = "balanced_diet"
+
+
+class FakeLLM:
+    """
+    Answers and counters of the fake server (mutable from tests).
+    """
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay  # Seconds before each answer
+        self.fail_next = 0  # Number of upcoming requests answered with HTTP 500
+        self.requests = 0
+        self.inflight = 0
+        self.max_inflight = 0
+        self.prompts = []
+
+    def answer(self, prompt: str) -> str:
+        if "Extract diseases from each of the following numbered medical histories." in prompt:
+            numbered = prompt.split("histories.\n\n", 1)[1].split("\n\nOnly use", 1)[0]
+            vocabulary = prompt.split("from this list: ", 1)[1].split(".\n", 1)[0].split(", ")
+            return "\n".join(
+                f"{line.split('. ', 1)[0]}: {self._diseases(line.split('. ', 1)[1], vocabulary)}"
+                for line in numbered.splitlines()
+            )
+        if "Extract diseases from the following medical history:" not in prompt:
+            return FAKE_DIET
+        history = prompt.split("history:\n\n", 1)[1].split("\n\nReturn all", 1)[0]
+        vocabulary = prompt.split("in this list: ", 1)[1].split(".\n", 1)[0].split(", ")
+        return self._diseases(history, vocabulary)
+
+    @staticmethod
+    def _diseases(history: str, vocabulary: list) -> str:
+        history = history.lower()
+        return ", ".join(
+            term for term in vocabulary if term in history or term.replace("_", " ") in history
+        )
+
+
+def create_app(fake: FakeLLM) -> FastAPI:
+    app = FastAPI(title="Fake LLM")
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        fake.requests += 1
+        fake.inflight += 1
+        fake.max_inflight = max(fake.max_inflight, fake.inflight)
+        try:
+            if fake.delay:
+                await asyncio.sleep(fake.delay)
+            if fake.fail_next > 0:
+                fake.fail_next -= 1
+                return JSONResponse(status_code=500, content={"error": {"message": "injected failure"}})
+
+            prompt = next(
+                (m["content"] for m in reversed(body["messages"]) if m["role"] == "user" and isinstance(m["content"], str)),
+                "",
+            )
+            fake.prompts.append(prompt)
+            return {
+                "id": f"chatcmpl-fake-{fake.requests}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "fake"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": fake.answer(prompt)},
+                    "finish_reason": "stop",
+                }],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            }
+        finally:
+            fake.inflight -= 1
+
+    return app
+
+
+class FakeLLMServer:
+    """
+    Runs the fake server on a free local port in a background thread (context manager).
+    """
+
+    def __init__(self, fake: FakeLLM = None):
+        self.fake = fake or FakeLLM()
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind(("127.0.0.1", 0))
+        self.port = self._socket.getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{self.port}/v1"
+        self._server = uvicorn.Server(uvicorn.Config(create_app(self.fake), log_level="warning"))
+        self._thread = threading.Thread(target=self._server.run, kwargs={"sockets": [self._socket]}, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("Fake LLM server did not start")
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self._server.should_exit = True
+        self._thread.join(timeout=10)
+        self._socket.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OpenAI-compatible fake LLM server.")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds before each answer")
+    args = parser.parse_args()
+    uvicorn.run(create_app(FakeLLM(delay=args.delay)), host="127.0.0.1", port=args.port)
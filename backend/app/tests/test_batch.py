@@ -0,0 +1,83 @@
+import random
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy.orm import sessionmaker
+from factories import add_activity, add_meal, add_user
+from app.core.config import settings
+from app.services import meal_service
+from app.services.recommendations import active_recommendations_query
+from app.services.recommender import batch, content_based, interactions, popularity, similarity, tfidf_index
+from app.services.recommender.batch import BatchSnapshot, precompute_all
+from app.services.recommender.hybrid import hybrid_recommendation
+from app.services.recommender.interactions import InteractionModel
+from app.services.recommender.popularity import PopularityStore
+from app.services.recommender.similarity import SimilarityEngine
+from app.services.recommender.tfidf_index import MealIndexStore
+
+DISEASES = ["diabetes", "anemia", "hypertension", "diabetes anemia"]
+DIETS = ["low_sugar", "high_protein", "low_sodium", "vegan"]
+NUTRIENTS = ["fiber", "iron", "protein", "potassium", "vitamin c"]
+
+
+@pytest.fixture
+def recommender_db(db, tmp_path, monkeypatch):
+    """
+    A small seeded dataset, with fresh process-wide recommender structures bound to it.
+    """
+    monkeypatch.setattr(interactions, "interaction_model", InteractionModel())
+    monkeypatch.setattr(popularity, "popularity_store", PopularityStore())
+    monkeypatch.setattr(meal_service, "meal_catalog", meal_service.MealCatalog())
+    monkeypatch.setattr(similarity, "similarity_engine", SimilarityEngine(metric=settings.SIMILARITY_METRIC))
+    store = MealIndexStore(str(tmp_path / "cache" / "meal_tfidf.pkl"))
+    for module in (tfidf_index, content_based, batch):
+        monkeypatch.setattr(module, "meal_index_store", store)
+
+    rng = random.Random(7)
+    for meal_id in range(1, 31):
+        add_meal(db, meal_id, nutrient=rng.choice(NUTRIENTS), disease=rng.choice(DISEASES), diet=rng.choice(DIETS))
+    for user_id in range(1, 13):
+        add_user(db, user_id, disease=rng.choice(DISEASES), diet=rng.choice(DIETS))
+    add_user(db, 13, disease="", diet="")  # No profile and no activity
+    started = datetime(2026, 1, 1)
+    for n in range(120):
+        liked, purchased, rated = (rng.random() < p for p in (0.5, 0.3, 0.2))
+        add_activity(
+            db, rng.randint(1, 12), rng.randint(1, 30), liked=liked, purchased=purchased, rated=rated,
+            timestamp=started + timedelta(minutes=n),
+        )
+    return db
+
+
+def test_batch_snapshot_matches_hybrid_recommendation(recommender_db):
+    db = recommender_db
+    snapshot = BatchSnapshot(db, settings.SIMILARITY_METRIC)
+
+    for top_n in (3, 15):
+        # Scored as one chunk and one user at a time
+        for chunk in (snapshot.user_ids, *([user_id] for user_id in snapshot.user_ids)):
+            for user_id, meal_ids in snapshot.score_users(chunk, top_n):
+                expected = [rec["meal_id"] for rec in hybrid_recommendation(db, user_id, top_n)]
+                assert meal_ids == expected, (user_id, top_n)
+    assert any(meal_ids for _, meal_ids in snapshot.score_users(snapshot.user_ids, 3))
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_precompute_all_writes_the_scored_sets(recommender_db, monkeypatch, workers):
+    db = recommender_db
+    monkeypatch.setattr(batch, "SessionLocal", sessionmaker(bind=db.get_bind()))
+    expected = dict(BatchSnapshot(db, settings.SIMILARITY_METRIC).score_users(list(range(1, 14)), 5))
+
+    summary = precompute_all(top_n=5, workers=workers, chunk_size=4)
+
+    assert summary["users"] == 13 and summary["workers"] == workers
+    assert summary["recommendations"] == sum(len(meal_ids) for meal_ids in expected.values())
+    db.expire_all()
+    for user_id, meal_ids in expected.items():
+        assert [meal_id for meal_id, _ in db.execute(active_recommendations_query(user_id))] == meal_ids
+
+    # Rerunning for some users replaces only their sets
+    rerun = dict(BatchSnapshot(db, settings.SIMILARITY_METRIC).score_users([1, 2], 2))
+    precompute_all(top_n=2, workers=1, user_ids=[1, 2])
+    assert rerun != {user_id: expected[user_id] for user_id in (1, 2)}
+    for user_id, meal_ids in {**expected, **rerun}.items():
+        assert [meal_id for meal_id, _ in db.execute(active_recommendations_query(user_id))] == meal_ids
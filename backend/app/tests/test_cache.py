@@ -0,0 +1,79 @@
+from app.core import cache
+from app.core.cache import LRUCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_entries_expire_after_their_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    lru = LRUCache(maxsize=10, ttl=60)
+    lru.set("a", 1)
+    lru.set("b", 2, ttl=5)  # Shorter per-entry TTL
+    lru.set("c", 3, ttl=600)  # Capped at the cache's TTL
+    lru.set("d", 4, ttl=0)  # Not cached
+
+    clock.now += 5
+    assert lru.get("b") is None
+    assert lru.get("a") == 1 and lru.get("d", "missing") == "missing"
+    clock.now += 55
+    assert lru.get("a") is None and lru.get("c") is None
+
+    stats = lru.stats()
+    assert (stats["hits"], stats["misses"], stats["expired"], stats["size"]) == (1, 4, 3, 0)
+
+
+def test_least_recently_used_entries_are_evicted_first():
+    lru = LRUCache(maxsize=2, ttl=60)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    assert lru.get("a") == 1  # "b" is now the least recently used
+    lru.set("c", 3)
+    assert lru.get("b") is None
+    assert (lru.get("a"), lru.get("c")) == (1, 3)
+
+    lru.set("a", 10)  # Overwriting refreshes recency too
+    lru.set("d", 4)
+    assert lru.get("c") is None and lru.get("a") == 10
+    assert lru.stats()["evictions"] == 2
+
+
+def test_invalidate_and_clear():
+    lru = LRUCache(maxsize=10, ttl=60)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    lru.invalidate("a")
+    lru.invalidate("missing")  # Not counted
+    assert lru.get("a") is None and lru.get("b") == 2
+    assert lru.stats()["invalidations"] == 1
+
+    lru.clear()
+    assert lru.get("b") is None and lru.stats()["size"] == 0
+    assert LRUCache(maxsize=0, ttl=60).stats()["size"] == 0
+
+
+def test_values_read_before_an_invalidation_are_not_cached():
+    lru = LRUCache(maxsize=10, ttl=60)
+    generation = lru.generation("a")
+    lru.invalidate("a")  # E.g. the source was rewritten while the value was being read
+    lru.set("a", "old", generation=generation)
+    assert lru.get("a") is None and lru.stats()["stale_sets"] == 1
+
+    lru.set("a", "new", generation=lru.generation("a"))
+    assert lru.get("a") == "new"
+
+    generation = lru.generation("b")
+    lru.invalidate("c")  # Other keys don't matter
+    lru.set("b", 1, generation=generation)
+    assert lru.get("b") == 1
+
+    generation = lru.generation("b")
+    lru.clear()
+    lru.set("b", 2, generation=generation)
+    assert lru.get("b") is None
@@ -0,0 +1,143 @@
+import asyncio
+import threading
+import pytest
+from sqlalchemy import create_engine, exc, text
+from app.core import database
+from app.core.database import InstrumentedQueuePool, PoolMetrics, pool_options, pool_status, to_async_url
+
+
+def test_pool_options_follow_settings_except_in_memory_sqlite():
+    options = pool_options("postgresql://db/app", InstrumentedQueuePool)
+    assert options["poolclass"] is InstrumentedQueuePool
+    assert {"pool_size", "max_overflow", "pool_timeout", "pool_recycle", "pool_pre_ping"} <= set(options)
+    assert pool_options("sqlite://", InstrumentedQueuePool) == {}
+    assert pool_options("sqlite:///:memory:", InstrumentedQueuePool) == {}
+
+
+def test_async_sessions_work_on_sqlite_and_postgres_urls(tmp_path, monkeypatch):
+    assert to_async_url("postgresql://db/app") == "postgresql+asyncpg://db/app"
+    assert to_async_url("postgres://db/app") == "postgresql+asyncpg://db/app"
+    assert to_async_url(f"sqlite:///{tmp_path}/app.db") == f"sqlite+aiosqlite:///{tmp_path}/app.db"
+
+    monkeypatch.setattr(database, "DATABASE_URL", f"sqlite:///{tmp_path}/app.db")
+    monkeypatch.setattr(database, "_async_engine", None)
+    monkeypatch.setattr(database, "_AsyncSessionLocal", None)
+
+    async def query():
+        sessions = database.get_async_db()
+        db = await anext(sessions)
+        try:
+            return (await db.execute(text("SELECT 1"))).scalar()
+        finally:
+            await sessions.aclose()
+            await database._async_engine.dispose()
+
+    assert asyncio.run(query()) == 1
+    assert database.database_pool_stats()["async"]["instrumented"]
+
+
+def test_checkout_waits_and_timeouts_are_recorded(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}", poolclass=InstrumentedQueuePool,
+        pool_size=1, max_overflow=0, pool_timeout=0.2,
+    )
+    engine.pool.metrics = PoolMetrics()
+
+    held = engine.connect()
+    held.execute(text("select 1"))
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+
+    # A waiter gets the connection once it is returned
+    threading.Timer(0.05, held.close).start()
+    with engine.connect() as connection:
+        connection.execute(text("select 1"))
+
+    status = pool_status(engine)
+    assert status["instrumented"] and status["capacity"] == 1
+    assert status["checkouts"] == 2
+    assert status["timeouts"] == 1
+    assert status["peak_checked_out"] == 1
+    assert status["max_wait_seconds"] >= 0.2
+    assert status["checked_out"] == 0
+    engine.dispose()
+
+    # The configured overflow carries over to the pool that dispose() puts in place
+    overflowing = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=InstrumentedQueuePool, pool_size=2, max_overflow=3)
+    overflowing.pool.metrics = PoolMetrics()
+    overflowing.dispose()
+    assert (pool_status(overflowing)["max_overflow"], pool_status(overflowing)["capacity"]) == (3, 5)
+    overflowing.dispose()
+
+
+def migrate(url: str, monkeypatch, revision: str = "head"):
+    from alembic import command
+    from alembic.config import Config
+    from app.core.config import settings
+    from app.core.paths import BACKEND_DIR
+
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "migrations"))
+    monkeypatch.setattr(settings, "DATABASE_URL", url)
+    command.upgrade(config, revision)
+
+
+def assert_hot_queries_use_indexes(engine):
+    from sqlalchemy.orm import Session
+    from app.core.query_plans import check_query_plans
+
+    with Session(engine) as db:
+        results = check_query_plans(db)
+    assert [result["query"] for result in results if not result["uses_index"]] == []
+
+
+def test_migrations_build_the_indexed_schema(tmp_path, monkeypatch):
+    pytest.importorskip("alembic")
+    from sqlalchemy import inspect
+
+    url = f"sqlite:///{tmp_path / 'migrated.db'}"
+    migrate(url, monkeypatch)
+
+    engine = create_engine(url)
+    indexes = {index["name"] for index in inspect(engine).get_indexes("user_activity")}
+    assert {"ix_user_activity_user_meal_liked", "ix_user_activity_meal_timestamp"} <= indexes
+    assert_hot_queries_use_indexes(engine)
+    engine.dispose()
+
+
+@pytest.mark.parametrize("init_sql", ["app/tests/init_before_migrations.sql", "../database/init.sql"])
+def test_migrations_upgrade_databases_created_by_init_sql(init_sql, tmp_path, monkeypatch):
+    pytest.importorskip("alembic")
+    import sqlite3
+    from sqlalchemy import inspect
+    from sqlalchemy.orm import Session
+    from app.core.paths import BACKEND_DIR
+    from app.services.recommendations import active_recommendations_query, store_recommendation_sets
+
+    # The schema as init.sql creates it (old: before migrations existed; current), minus the
+    # DROP ... CASCADE statements SQLite can't parse, with a recommendation written back then
+    script = (BACKEND_DIR / init_sql).read_text(encoding="utf-8")
+    path = tmp_path / "initialised.db"
+    connection = sqlite3.connect(path)
+    connection.executescript("\n".join(line for line in script.splitlines() if not line.startswith("DROP TABLE")))
+    connection.execute("INSERT INTO users (user_id, username, height, weight, disease) VALUES (1, 'old', 170, 70, 'goitre')")
+    connection.execute("INSERT INTO meals (meal_id, name) VALUES (1, 'Soup'), (2, 'Salad')")
+    connection.execute("INSERT INTO recommendations (user_id, meal_id, recommendation_reason) VALUES (1, 1, 'old')")
+    connection.commit()
+    connection.close()
+
+    url = f"sqlite:///{path}"
+    migrate(url, monkeypatch)
+
+    engine = create_engine(url)
+    schema = inspect(engine)
+    assert "set_version" in {column["name"] for column in schema.get_columns("recommendations")}
+    assert schema.has_table("recommendation_sets")
+    assert "ix_recommendations_user_version" in {index["name"] for index in schema.get_indexes("recommendations")}
+    with Session(engine) as db:
+        # Rows written before versioning stay readable until the user's first set replaces them
+        assert db.execute(active_recommendations_query(1)).all() == [(1, "old")]
+        store_recommendation_sets(db, {1: [{"meal_id": 2}]}, reason="new")
+        assert db.execute(active_recommendations_query(1)).all() == [(2, "new")]
+    assert_hot_queries_use_indexes(engine)
+    engine.dispose()
@@ -0,0 +1,51 @@
+import pytest
+from app.core.disease_matcher import DISEASE_SYNONYMS, DiseaseMatcher
+
+VOCABULARY = [
+    "anemia", "cancer", "diabeties", "eye_disease", "goitre", "heart_disease", "hypertension",
+    "kidney_disease", "obesity", "pregnancy", "rickets", "scurvy",
+]
+
+
+@pytest.fixture
+def matcher():
+    return DiseaseMatcher(VOCABULARY, DISEASE_SYNONYMS, max_unmatched_words=1)
+
+
+@pytest.mark.parametrize("history, diseases", [
+    ("I have scurvy", ["scurvy"]),
+    ("Diagnosed with Type 2 Diabetes and high blood pressure.", ["diabeties", "hypertension"]),
+    ("kidney_disease, anaemia", ["kidney_disease", "anemia"]),
+    ("Chronic kidney disease since 2019", ["kidney_disease"]),
+    ("heart failure and heart disease", ["heart_disease"]),
+])
+def test_confident_matches_use_vocabulary_tokens_and_synonyms(matcher, history, diseases):
+    match = matcher.match(history)
+    assert (match.diseases, match.confident, match.reason) == (diseases, True, "matched")
+
+
+@pytest.mark.parametrize("history, reason", [
+    ("No history of diabetes", "cue_word"),
+    ("My mother has hypertension", "cue_word"),
+    ("Suspected anemia", "cue_word"),
+    ("Previously had rickets", "cue_word"),
+    ("Patient reports goitre along with frequent fatigue and dizziness", "unmatched_text"),
+    ("Frequent headaches", "no_match"),
+    ("", "no_match"),
+])
+def test_cue_words_unexplained_text_and_misses_defer_to_the_llm(matcher, history, reason):
+    match = matcher.match(history)
+    assert (match.confident, match.reason) == (False, reason)
+
+
+def test_patterns_match_whole_words_only(matcher):
+    assert matcher.match("anemias").diseases == []
+    assert matcher.match("pre-diabetes").reason == "cue_word"
+
+
+def test_stats_count_each_outcome(matcher):
+    for history in ["I have scurvy", "no scurvy", "headache", "goitre"]:
+        matcher.match(history)
+    stats = matcher.stats()
+    assert (stats["lookups"], stats["matched"], stats["cue_word"], stats["no_match"]) == (4, 2, 1, 1)
+    assert stats["fast_path_hit_rate"] == 0.5
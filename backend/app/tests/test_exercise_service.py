@@ -0,0 +1,96 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from app.services.exercise_service import ExerciseModelRegistry
+
+
+def write_dataset(path, rows: int = 40, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    bmi = rng.uniform(17, 38, rows)
+    pd.DataFrame({
+        "exercise": [f"exercise {i % 6}" for i in range(rows)],
+        "duration": rng.integers(10, 90, rows),
+        "calories_burn": rng.uniform(100, 500, rows),
+        "bmi": bmi,
+        # Distinct per exercise type, so "closest two" is never a tie
+        "exercise_intensity": [1 + (i // 6) % 10 for i in range(rows)],
+    }).to_csv(path, index=False)
+
+
+def pandas_recommend(exercise_df: pd.DataFrame, predicted_intensity: float) -> list:
+    """
+    The per-request pandas filtering the engine replaced (from the exercise endpoint).
+    """
+    intensity_range = (max(0, predicted_intensity - 1), min(10, predicted_intensity + 1))
+    filtered = exercise_df[exercise_df["exercise_intensity"].between(*intensity_range)]
+    if len(filtered) < 5:
+        intensity_range = (max(0, predicted_intensity - 2), min(10, predicted_intensity + 2))
+        filtered = exercise_df[exercise_df["exercise_intensity"].between(*intensity_range)]
+
+    recommended = pd.DataFrame()
+    for exercise_type in filtered["exercise"].unique():
+        type_exercises = filtered[filtered["exercise"] == exercise_type].copy()
+        type_exercises["intensity_diff"] = abs(type_exercises["exercise_intensity"] - predicted_intensity)
+        recommended = pd.concat([recommended, type_exercises.sort_values("intensity_diff").head(2)])
+    return [
+        (row["exercise"], int(row["duration"]), float(row["calories_burn"]), int(row["exercise_intensity"]))
+        for _, row in recommended.head(5).iterrows()
+    ]
+
+
+@pytest.fixture
+def registry(tmp_path):
+    write_dataset(tmp_path / "exercise.csv")
+    return ExerciseModelRegistry(str(tmp_path / "exercise.csv"), str(tmp_path / "cache" / "exercise_model.pkl"))
+
+
+def counting_trains(monkeypatch) -> list:
+    trains = []
+    train = ExerciseModelRegistry._train
+    monkeypatch.setattr(ExerciseModelRegistry, "_train", lambda self: trains.append(1) or train(self))
+    return trains
+
+
+@pytest.mark.parametrize("bmi", [17.5, 22.0, 26.5, 31.0, 37.5])
+def test_recommend_matches_the_pandas_filtering(registry, bmi):
+    engine = registry.get()
+    result = engine.recommend(bmi)
+
+    expected = pandas_recommend(pd.read_csv(registry.data_path), result["predicted_intensity"])
+    actual = [
+        (exercise["name"], exercise["duration"], exercise["calories_burned"], int(exercise["intensity"]))
+        for exercise in result["exercises"]
+    ]
+    assert actual and actual == expected
+    assert result["feature_importance"] == {"bmi": 1.0}  # The only feature
+
+
+def test_registry_retrains_only_when_the_dataset_changes(registry, monkeypatch):
+    trains = counting_trains(monkeypatch)
+    registry.get()
+    assert registry.get() is registry.get() and len(trains) == 1
+
+    # Another worker with the same dataset loads the persisted model
+    ExerciseModelRegistry(registry.data_path, registry.artifact_path).get()
+    assert len(trains) == 1
+
+    write_dataset(registry.data_path, rows=50, seed=1)
+    engine = ExerciseModelRegistry(registry.data_path, registry.artifact_path).get()
+    assert len(trains) == 2 and len(engine.names) == 50
+
+
+def test_registry_hot_reloads_a_replaced_artifact(registry, monkeypatch):
+    engine = registry.get()
+
+    # Another worker writes a new artifact (e.g. after retraining)
+    other = ExerciseModelRegistry(registry.data_path, registry.artifact_path)
+    other.get()
+    other._write_artifact(other._train())
+    stat = os.stat(registry.artifact_path)
+    os.utime(registry.artifact_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    trains = counting_trains(monkeypatch)
+    reloaded = registry.get()
+    assert reloaded is not engine and registry.get() is reloaded
+    assert len(trains) == 0  # Loaded, not retrained
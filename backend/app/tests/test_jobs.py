@@ -0,0 +1,70 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from app.services import jobs
+from app.services.jobs import RecommendationJobQueue
+from app.services.recommendations import recommendation_cache
+
+
+def wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def queue(monkeypatch):
+    """
+    A one-worker queue running jobs on a thread instead of a spawned process;
+    jobs block until `queue.release` is set.
+    """
+    release = threading.Event()
+    started = []
+
+    def recompute(user_id: int):
+        started.append(user_id)
+        assert release.wait(5)
+        if user_id == 3:
+            raise ValueError("no such user")
+
+    monkeypatch.setattr(jobs, "ProcessPoolExecutor", lambda max_workers, mp_context: ThreadPoolExecutor(max_workers))
+    monkeypatch.setattr(jobs, "recompute_user_recommendations", recompute)
+    queue = RecommendationJobQueue(workers=1)
+    queue.release, queue.started = release, started
+    yield queue
+    release.set()
+    queue.shutdown()
+
+
+def test_jobs_for_the_same_user_coalesce_until_they_start(queue):
+    assert queue.enqueue(1)
+    wait_for(lambda: queue.started == [1])
+
+    assert queue.enqueue(2)
+    assert not queue.enqueue(2)
+    # User 1 is running: queued again, since it may have started before the newest interaction
+    assert queue.enqueue(1)
+    assert queue.enqueue_many([1, 2, 3]) == 1
+    stats = queue.stats()
+    assert (stats["queue_depth"], stats["running"], stats["coalesced"]) == (3, 1, 3)
+
+    queue.release.set()
+    wait_for(lambda: queue.stats()["completed"] + queue.stats()["failed"] == 4)
+    assert queue.started == [1, 2, 1, 3]
+    stats = queue.stats()
+    assert (stats["completed"], stats["failed"], stats["queue_depth"], stats["running"]) == (3, 1, 0, 0)
+
+
+def test_finished_jobs_invalidate_the_users_cached_recommendations(queue):
+    for user_id in (1, 2, 3):
+        recommendation_cache.set(user_id, {"user_id": user_id, "recommendations": []})
+    queue.release.set()
+    queue.enqueue_many([1, 3])
+
+    # Failed jobs too: the worker may have stored a set before failing
+    wait_for(lambda: recommendation_cache.get(1) is None and recommendation_cache.get(3) is None)
+    assert queue.stats()["failed"] == 1
+    assert recommendation_cache.get(2) is not None
+    recommendation_cache.invalidate(2)
@@ -0,0 +1,76 @@
+import asyncio
+import sqlite3
+import threading
+from app.core import llm_cache as llm_cache_module
+from app.core.llm_cache import LLMResponseCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def accessed_at(cache: LLMResponseCache, key: str) -> float:
+    with sqlite3.connect(cache.path) as db:
+        return db.execute("SELECT accessed_at FROM llm_cache WHERE key = ?", (key,)).fetchone()[0]
+
+
+def test_hits_only_touch_entries_after_the_touch_interval(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(llm_cache_module.time, "time", clock)
+    cache = LLMResponseCache(str(tmp_path / "llm.sqlite3"), ttl=10_000, max_entries=10, touch_interval=100)
+    cache.set("a", ["anemia"])
+    written = clock.now
+
+    clock.now += 50
+    assert cache.get("a") == ["anemia"]
+    assert accessed_at(cache, "a") == written  # No write on this hit
+
+    clock.now += 60
+    assert cache.get("a") == ["anemia"]
+    assert accessed_at(cache, "a") == clock.now
+
+    clock.now += 10_000
+    assert cache.get("a") is None
+    assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 1
+
+
+def test_eviction_runs_at_most_once_per_interval(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(llm_cache_module.time, "time", clock)
+    cache = LLMResponseCache(str(tmp_path / "llm.sqlite3"), ttl=10_000, max_entries=2, evict_interval=60)
+
+    for key in "abcd":
+        clock.now += 1
+        cache.set(key, key)
+    # Only the first write pruned; the cache is over its limit until the next eviction
+    assert [cache.get(key) for key in "abcd"] == ["a", "b", "c", "d"]
+    assert cache.stats()["evictions"] == 0
+
+    clock.now += 60
+    cache.set("e", "e")
+    assert [cache.get(key) for key in "abcde"] == [None, None, None, "d", "e"]
+    assert cache.stats()["evictions"] == 3
+
+
+def test_async_lookups_run_off_the_event_loop_thread(tmp_path, monkeypatch):
+    cache = LLMResponseCache(str(tmp_path / "llm.sqlite3"), ttl=3600, max_entries=10)
+    threads = []
+    get = cache.get
+
+    def recording_get(key):
+        threads.append(threading.get_ident())
+        return get(key)
+
+    monkeypatch.setattr(cache, "get", recording_get)
+
+    async def run():
+        await cache.aset("a", "low_sugar")
+        await cache.aset_many([("b", "high_fiber"), ("c", [])])
+        return await cache.aget("a"), await cache.aget_many(["b", "c", "missing"]), await cache.aget_many([])
+
+    assert asyncio.run(run()) == ("low_sugar", ["high_fiber", [], None], [])
+    assert threads and threading.get_ident() not in threads
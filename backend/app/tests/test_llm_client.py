@@ -0,0 +1,127 @@
+import asyncio
+import time
+import pytest
+from app.core import llm_integration
+from app.core.llm_cache import LLMResponseCache
+from app.core.llm_client import LLMClient, LLMUnavailableError
+from app.services.llm_service import LLMService
+from fake_llm_server import FakeLLMServer
+
+MESSAGES = [{"role": "user", "content": "Suggest a suitable diet for someone with the following condition(s): scurvy."}]
+
+
+@pytest.fixture(scope="module")
+def server():
+    with FakeLLMServer() as server:
+        yield server
+
+
+@pytest.fixture
+def fake(server):
+    server.fake.__init__()  # Reset delay, injected failures and counters
+    return server.fake
+
+
+def make_client(server, **options) -> LLMClient:
+    client = LLMClient(api_key="test-key", base_url=server.base_url, **options)
+    client.RETRY_BACKOFF_SECONDS = 0.01
+    return client
+
+
+def test_identical_concurrent_requests_share_one_upstream_call(server, fake):
+    fake.delay = 0.2
+    client = make_client(server)
+
+    async def burst():
+        return await asyncio.gather(*(client.chat(MESSAGES) for _ in range(20)))
+
+    answers = asyncio.run(burst())
+    assert answers == ["balanced_diet"] * 20
+    assert fake.requests == 1
+    assert client.stats()["coalesced"] == 19
+
+
+def test_upstream_concurrency_is_capped(server, fake):
+    fake.delay = 0.05
+    client = make_client(server, max_concurrency=2)
+
+    async def distinct_requests():
+        return await asyncio.gather(*(
+            client.chat([{"role": "user", "content": f"request {i}"}]) for i in range(8)
+        ))
+
+    asyncio.run(distinct_requests())
+    assert fake.requests == 8
+    assert fake.max_inflight <= 2
+
+
+def test_server_errors_are_retried(server, fake):
+    fake.fail_next = 2
+    client = make_client(server, max_retries=2)
+
+    assert asyncio.run(client.chat(MESSAGES)) == "balanced_diet"
+    assert fake.requests == 3
+    assert client.stats()["retries"] == 2
+
+
+def test_slow_upstream_hits_the_deadline(server, fake):
+    fake.delay = 2.0
+    client = make_client(server, attempt_timeout=0.2, deadline=0.5, max_retries=5)
+
+    started = time.monotonic()
+    with pytest.raises(LLMUnavailableError):
+        asyncio.run(client.chat(MESSAGES))
+    assert time.monotonic() - started < 1.5
+
+
+def test_disease_history_parsed_through_fake_llm(server, fake, tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_integration, "llm_client", make_client(server))
+    monkeypatch.setattr(llm_integration, "llm_cache", LLMResponseCache(str(tmp_path / "llm.sqlite3"), 3600, 100))
+
+    # Too much unexplained text for the local matcher, so this goes to the (fake) LLM
+    history = "Patient reports goitre and anemia along with frequent fatigue and dizziness"
+    result = asyncio.run(LLMService.process_disease_history(history))
+
+    assert sorted(result["diseases"]) == ["anemia", "goitre"]
+    assert fake.requests == 1
+
+
+def test_only_histories_the_matcher_cannot_settle_reach_the_llm(server, fake, tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_integration, "llm_client", make_client(server))
+    monkeypatch.setattr(llm_integration, "llm_cache", LLMResponseCache(str(tmp_path / "llm.sqlite3"), 3600, 100))
+
+    # Confident local match: no upstream call
+    result = asyncio.run(LLMService.process_disease_history("I have scurvy"))
+    assert result["diseases"] == ["scurvy"] and fake.requests == 0
+
+    # Negation cue: the LLM decides, even though a disease was mentioned
+    asyncio.run(LLMService.process_disease_history("No history of scurvy"))
+    assert sum("following medical history:" in prompt for prompt in fake.prompts) == 1
+
+
+def test_batch_histories_are_deduplicated_and_packed(server, fake, tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_integration, "llm_client", make_client(server))
+    monkeypatch.setattr(llm_integration, "llm_cache", LLMResponseCache(str(tmp_path / "llm.sqlite3"), 3600, 100))
+
+    ambiguous = [
+        f"Patient {i} reports goitre and anemia along with frequent fatigue and dizziness" for i in range(6)
+    ]
+    requests = [(history, None) for history in ambiguous]
+    requests += [(ambiguous[0].upper(), None), ("", None), ("I have scurvy", None)]
+
+    async def collect():
+        return [item async for item in LLMService.process_disease_histories(requests)]
+
+    results = {}
+    for indices, result in asyncio.run(collect()):
+        for index in indices:
+            results[index] = result
+
+    assert sorted(results) == list(range(len(requests)))
+    for index in range(7):
+        assert sorted(results[index]["diseases"]) == ["anemia", "goitre"]
+    assert results[7]["recommended_diet"] == "No history provided."
+    assert results[8]["diseases"] == ["scurvy"]
+    # Six distinct ambiguous histories in one packed prompt
+    assert sum("numbered medical histories" in prompt for prompt in fake.prompts) == 1
+    assert not any("following medical history:" in prompt for prompt in fake.prompts)
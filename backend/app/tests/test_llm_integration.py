@@ -0,0 +1,43 @@
+import ast
+import pandas as pd
+import pytest
+from app.core import llm_integration
+from app.core.lazy import Lazy
+from app.core.paths import resolve_data_path
+
+
+def contains_scan(meals: pd.DataFrame, disease: str) -> set:
+    """
+    The per-request lookup `diets_for_disease` replaced: a substring scan of the raw column.
+    """
+    diets = set()
+    for diet_list in meals[meals["Disease"].str.contains(disease, case=False, na=False)]["Diet"]:
+        diets.update(ast.literal_eval(diet_list) if isinstance(diet_list, str) else diet_list)
+    return diets
+
+
+def use_meals(monkeypatch, meals: pd.DataFrame):
+    index = llm_integration.build_disease_diet_index(meals)
+    monkeypatch.setattr(llm_integration, "_disease_diet_index", Lazy(lambda: index, "disease_diet_index"))
+
+
+def test_diets_for_disease_matches_the_column_scan_on_the_meals_dataset(monkeypatch):
+    meals = pd.read_csv(resolve_data_path(llm_integration.DIET_FILE_PATH))
+    use_meals(monkeypatch, meals)
+    tokens = set(llm_integration.get_disease_diet_index())
+    queries = tokens | {token.upper() for token in tokens} | {"disease", "ane", "Heart", "e", "migraine"}
+
+    for disease in sorted(queries):
+        assert llm_integration.diets_for_disease(disease) == contains_scan(meals, disease), disease
+
+
+@pytest.mark.parametrize("disease", ["anemia", "ANEMIA", "kidney", "_disease", "cancer", "asthma"])
+def test_diets_for_disease_skips_missing_values_like_the_column_scan(monkeypatch, disease):
+    meals = pd.DataFrame({
+        "Disease": ["['anemia', 'kidney_disease']", None, "['heart_disease']", "['cancer']"],
+        "Diet": ["['vegan_diet', 'low_sodium_diet']", "['dash_diet']", "['dash_diet']", None],
+    })
+    use_meals(monkeypatch, meals)
+    # Rows missing either list contribute nothing
+    expected = contains_scan(meals.dropna(), disease)
+    assert llm_integration.diets_for_disease(disease) == expected
@@ -0,0 +1,37 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from app.core.metrics import MetricsMiddleware, render_metrics, stage_timer
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_requests_are_labelled_by_route_template():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    def read_item(item_id: int):
+        return {"item_id": item_id}
+
+    count = "nutribuddy_http_request_duration_seconds_count"
+    labels = {"method": "GET", "route": "/items/{item_id}", "status": "200"}
+    before = sample(count, **labels)
+    with TestClient(app) as client:
+        for item_id in range(3):
+            assert client.get(f"/items/{item_id}").status_code == 200
+        assert client.get("/missing").status_code == 404
+
+    assert sample(count, **labels) - before == 3
+    assert sample(count, method="GET", route="<unmatched>", status="404") >= 1
+
+
+def test_stage_timer_and_text_exposition():
+    with stage_timer("test_component", "test_stage"):
+        pass
+
+    body, content_type = render_metrics()
+    assert content_type.startswith("text/plain")
+    assert b'nutribuddy_stage_duration_seconds_count{component="test_component",stage="test_stage"} 1.0' in body
@@ -0,0 +1,77 @@
+import asyncio
+import pstats
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.core.concurrency import run_blocking
+from app.core.profiling import ProfilingMiddleware
+
+
+def slow_blocking_work():
+    return sum(i * i for i in range(20000))
+
+
+def other_request_work():
+    return sum(i * i for i in range(20000))
+
+
+def make_app(directory) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware, secret="admin-secret", directory=str(directory))
+    other_done = asyncio.Event()
+
+    @app.get("/work")
+    async def work():
+        return {"total": await run_blocking(slow_blocking_work)}
+
+    @app.get("/wait")
+    async def wait():
+        await other_done.wait()  # Suspended while /other runs on the event loop
+        return {"total": await run_blocking(slow_blocking_work)}
+
+    @app.get("/other")
+    async def other():
+        total = other_request_work()
+        other_done.set()
+        return {"total": total}
+
+    return app
+
+
+def test_only_requests_with_the_secret_are_profiled(tmp_path):
+    with TestClient(make_app(tmp_path)) as client:
+        assert "x-profile-id" not in client.get("/work").headers
+        assert "x-profile-id" not in client.get("/work", headers={"X-Profile": "wrong"}).headers
+        assert list(tmp_path.iterdir()) == []
+
+        response = client.get("/work", headers={"X-Profile": "admin-secret", "X-Request-ID": "req/42"})
+
+    assert response.status_code == 200
+    profile_id = response.headers["x-profile-id"]
+    assert profile_id.endswith("-req_42")
+    files = list(tmp_path.iterdir())
+    assert [f.name for f in files] == [f"{profile_id}.prof"]
+
+    # Work done on the blocking thread pool is part of the request's profile
+    functions = {function for _, _, function in pstats.Stats(str(files[0])).stats}
+    assert "slow_blocking_work" in functions
+
+
+def test_concurrent_requests_stay_out_of_the_profile(tmp_path):
+    async def run():
+        transport = httpx.ASGITransport(app=make_app(tmp_path))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            profiled = asyncio.ensure_future(client.get("/wait", headers={"X-Profile": "admin-secret"}))
+            await asyncio.sleep(0.05)
+            other = await client.get("/other")
+            return await profiled, other
+
+    profiled, other = asyncio.run(run())
+    assert profiled.status_code == other.status_code == 200
+    assert "x-profile-id" not in other.headers
+
+    files = list(tmp_path.iterdir())
+    assert [f.name for f in files] == [f"{profiled.headers['x-profile-id']}.prof"]
+    functions = {function for _, _, function in pstats.Stats(str(files[0])).stats}
+    assert "wait" in functions and "slow_blocking_work" in functions
+    assert "other_request_work" not in functions
@@ -0,0 +1,200 @@
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from factories import add_meal, add_user
+from app.core.config import settings
+from app.models.recommendations import Recommendation, RecommendationSet
+from app.services import recommendations
+from app.services.recommendations import (
+    active_recommendations_query, prune_recommendation_versions, store_recommendation_sets,
+)
+
+
+@pytest.fixture
+def users(db):
+    for user_id in (1, 2):
+        add_user(db, user_id)
+    for meal_id in range(1, 7):
+        add_meal(db, meal_id)
+
+
+def active_meals(db, user_id: int) -> list:
+    return [meal_id for meal_id, _ in db.execute(active_recommendations_query(user_id))]
+
+
+def stored_versions(db, user_id: int) -> list:
+    return sorted(set(db.scalars(select(Recommendation.set_version).where(Recommendation.user_id == user_id))))
+
+
+def test_readers_see_the_old_set_until_the_new_one_is_committed(db, users, monkeypatch):
+    store_recommendation_sets(db, {1: [{"meal_id": 1}, {"meal_id": 2}], 2: [{"meal_id": 3}]})
+    assert active_meals(db, 1) == [1, 2]
+
+    # A reader on another connection while the pointers are bumped and the rows inserted, before the commit
+    seen_mid_write = []
+    commit = db.commit
+
+    def read_then_commit():
+        if not seen_mid_write:  # The write's commit, not the pruning one after it
+            with Session(db.get_bind()) as reader:
+                seen_mid_write.extend(active_meals(reader, user_id) for user_id in (1, 2))
+        commit()
+
+    monkeypatch.setattr(db, "commit", read_then_commit)
+    store_recommendation_sets(db, {1: [{"meal_id": 4}, {"meal_id": 5}, {"meal_id": 6}], 2: []})
+    assert seen_mid_write == [[1, 2], [3]]
+    assert active_meals(db, 1) == [4, 5, 6]
+    assert active_meals(db, 2) == []
+
+    # A write failing halfway leaves the previous set in place
+    def fail():
+        raise RuntimeError("connection lost")
+
+    monkeypatch.setattr(db, "commit", fail)
+    with pytest.raises(RuntimeError):
+        store_recommendation_sets(db, {1: [{"meal_id": 1}]})
+    monkeypatch.setattr(db, "commit", commit)
+    assert active_meals(db, 1) == [4, 5, 6]
+
+
+def active_version(db, user_id: int) -> int:
+    return db.scalar(select(RecommendationSet.active_version).where(RecommendationSet.user_id == user_id))
+
+
+@pytest.mark.parametrize("dialect", ["sqlite", "generic"])
+def test_versions_are_claimed_in_the_database(db, users, monkeypatch, dialect):
+    if dialect == "generic":
+        monkeypatch.setattr(db.get_bind().dialect, "name", "generic")  # SELECT ... FOR UPDATE / UPDATE fallback
+
+    # Rows written before versioning are version 0; every write takes the next version per user
+    db.add(Recommendation(user_id=1, meal_id=1, set_version=0))
+    db.commit()
+    store_recommendation_sets(db, {1: [{"meal_id": 2}]})
+    store_recommendation_sets(db, {1: [{"meal_id": 3}], 2: [{"meal_id": 4}]})
+    assert (active_version(db, 1), active_version(db, 2)) == (2, 1)
+    assert active_meals(db, 1) == [3] and active_meals(db, 2) == [4]
+
+    # Another process's pointer, e.g. far ahead of this one's clock, is simply incremented
+    db.execute(update(RecommendationSet).where(RecommendationSet.user_id == 1).values(active_version=10 ** 15))
+    db.commit()
+    store_recommendation_sets(db, {1: [{"meal_id": 5}]})
+    assert active_version(db, 1) == 10 ** 15 + 1 and active_meals(db, 1) == [5]
+
+
+def test_concurrent_writers_get_distinct_versions_and_the_last_commit_wins(db, users, monkeypatch):
+    first_claimed, second_started = threading.Event(), threading.Event()
+    first = Session(db.get_bind())
+    commit = first.commit
+
+    def commit_after_second_started():
+        first_claimed.set()
+        second_started.wait(5)
+        time.sleep(0.2)  # The second writer is now blocked on the pointer row
+        commit()
+
+    monkeypatch.setattr(first, "commit", commit_after_second_started)
+    writer = threading.Thread(target=store_recommendation_sets, args=(first, {1: [{"meal_id": 1}]}))
+    writer.start()
+    first_claimed.wait(5)
+    with Session(db.get_bind()) as second:
+        second_started.set()
+        store_recommendation_sets(second, {1: [{"meal_id": 2}]})
+    writer.join()
+    first.close()
+
+    assert active_version(db, 1) == 2
+    assert active_meals(db, 1) == [2]
+    assert stored_versions(db, 1) == [2]  # The first set was superseded and pruned
+
+
+def test_pruning_keeps_the_active_set_and_the_newest_superseded_ones(db, users, monkeypatch):
+    monkeypatch.setattr(settings, "RECOMMENDATION_SETS_KEPT", 2)
+    versions = []
+    for meal_id in range(1, 6):
+        store_recommendation_sets(db, {1: [{"meal_id": meal_id}], 2: [{"meal_id": meal_id}]})
+        versions.append(stored_versions(db, 1)[-1])
+
+    # Pruned on every write: the active set plus the 2 sets before it
+    assert stored_versions(db, 1) == versions[-3:]
+    assert active_meals(db, 1) == [5]
+
+    assert prune_recommendation_versions(db, [1], keep=1) == 1
+    assert stored_versions(db, 1) == versions[-2:]
+    assert stored_versions(db, 2) == versions[-3:]  # Other users untouched
+
+    assert prune_recommendation_versions(db, keep=0) == 3
+    assert stored_versions(db, 1) == stored_versions(db, 2) == versions[-1:]
+    assert active_meals(db, 2) == [5]
+
+
+@pytest.fixture
+def endpoint(monkeypatch):
+    """
+    /recommend with the background queue and the hybrid recommender recorded, and an empty payload cache.
+    """
+    from app.api.v1.endpoints import recommender
+
+    calls = {"enqueued": [], "computed": []}
+
+    def hybrid(db, user_id, top_n):
+        calls["computed"].append(user_id)
+        return [{"meal_id": 6, "name": "Meal 6"}]
+
+    monkeypatch.setattr(recommender.recommendation_jobs, "enqueue", calls["enqueued"].append)
+    monkeypatch.setattr(recommender, "hybrid_recommendation", hybrid)
+    recommendations.recommendation_cache.clear()
+    yield calls
+    recommendations.recommendation_cache.clear()
+
+
+def recommend(db, user_id: int) -> dict:
+    from app.api.v1.endpoints.recommender import recommend_meals
+    return asyncio.run(recommend_meals(user_id, db=db))
+
+
+def test_stale_sets_are_served_while_a_job_recomputes_them(db, users, endpoint):
+    calls = endpoint
+    store_recommendation_sets(db, {1: [{"meal_id": 1}, {"meal_id": 2}]}, created_at=datetime.utcnow() - timedelta(hours=25))
+    store_recommendation_sets(db, {2: [{"meal_id": 3}]}, created_at=datetime.utcnow() - timedelta(hours=1))
+
+    stale = recommend(db, 1)
+    assert [rec["meal_id"] for rec in stale["recommendations"]] == [1, 2]
+    assert calls["enqueued"] == [1] and calls["computed"] == []
+    assert recommendations.recommendation_cache.get(1) is None  # Not cached while stale
+
+    fresh = recommend(db, 2)
+    assert [rec["meal_id"] for rec in fresh["recommendations"]] == [3]
+    assert calls["enqueued"] == [1]
+    assert recommendations.recommendation_cache.get(2) == fresh
+
+
+def test_users_without_a_set_are_computed_inline(db, users, endpoint):
+    calls = endpoint
+
+    assert recommend(db, 1) == {"user_id": 1, "recommendations": [{"meal_id": 6, "name": "Meal 6"}]}
+    assert calls["computed"] == [1] and calls["enqueued"] == []
+    assert active_meals(db, 1) == [6]  # Stored for the next request
+
+
+def test_a_set_replaced_during_the_read_is_not_cached(db, users, endpoint, monkeypatch):
+    from app.api.v1.endpoints import recommender
+
+    store_recommendation_sets(db, {1: [{"meal_id": 1}]})
+    read = recommender.read_active_set
+
+    def read_then_replace(session, user_id):
+        rows = read(session, user_id)
+        store_recommendation_sets(db, {1: [{"meal_id": 2}]})  # Another request commits a new set
+        return rows
+
+    monkeypatch.setattr(recommender, "read_active_set", read_then_replace)
+    assert [rec["meal_id"] for rec in recommend(db, 1)["recommendations"]] == [1]
+    assert recommendations.recommendation_cache.get(1) is None
+
+    monkeypatch.setattr(recommender, "read_active_set", read)
+    assert [rec["meal_id"] for rec in recommend(db, 1)["recommendations"]] == [2]
+    assert recommendations.recommendation_cache.get(1)["recommendations"][0]["meal_id"] == 2
@@ -0,0 +1,329 @@
+import pytest
+import random
+from datetime import datetime
+import numpy as np
+from scipy import sparse
+from factories import add_activity, add_meal, add_user
+from app.core.config import settings
+from app.models.meal import Meal
+from app.services import meal_service
+from app.services.meal_service import MealCatalog
+from app.services.recommender.benchmark import BUILD_STAGES, RECOMMENDERS, run_tier
+from app.services.recommender.interactions import ActivityView, InteractionModel
+from app.services.recommender.popularity import PopularityStore
+from app.services.recommender.ranking import LikeSignals, rank_recommendations
+from app.services.recommender.similarity import SimilarityEngine, _RowSpace, top_k
+from app.services.recommender.synthetic import SeedData, generate_activity, generate_meals, generate_users
+from app.services.recommender.tfidf_index import MealIndexStore, MealTfidfIndex
+
+
+def test_synthetic_data_scales_the_seed_datasets():
+    seed = SeedData()
+    rng = random.Random(0)
+    users = list(generate_users(seed, 3, rng))
+    meals = list(generate_meals(seed, 3, rng))
+    activity = list(generate_activity(seed, 3, rng))
+
+    assert len(users) == 3 * len(seed.users)
+    assert len(meals) == 3 * len(seed.meals)
+    assert len(activity) == 3 * len(seed.activity)
+    assert [user["user_id"] for user in users] == list(range(1, len(users) + 1))
+    assert len({meal["name"] for meal in meals}) == len(meals)
+    assert all(1 <= row["user_id"] <= len(users) and 1 <= row["meal_id"] <= len(meals) for row in activity)
+    # Copies keep the seed user's tags
+    assert users[len(seed.users)]["disease"] == users[0]["disease"]
+
+
+@pytest.mark.slow
+def test_run_tier_reports_time_and_peak_memory(tmp_path):
+    result = run_tier(1, str(tmp_path), sample_size=3, top_n=5)
+
+    seed = SeedData()
+    assert (result["users"], result["meals"], result["activities"]) == (
+        len(seed.users), len(seed.meals), len(seed.activity)
+    )
+    assert result["load_seconds"] is not None
+    assert set(result["build"]) == set(BUILD_STAGES)
+    assert set(result["recommenders"]) == set(RECOMMENDERS)
+    for summary in result["recommenders"].values():
+        assert summary["calls"] == 3
+        assert summary["mean_ms"] > 0 and summary["p95_ms"] >= summary["p50_ms"]
+        assert summary["peak_memory_mb"] >= 0
+    assert result["build"]["tfidf_index"]["peak_memory_mb"] > 0
+
+    # The loaded tier is reused
+    assert run_tier(1, str(tmp_path), sample_size=1, top_n=5)["load_seconds"] is None
+
+
+def test_interaction_model_records_rows_and_keeps_the_best_score_per_cell(db):
+    for user_id in (1, 2):
+        add_user(db, user_id)
+    for meal_id in (1, 2, 3):
+        add_meal(db, meal_id)
+    add_activity(db, 1, 1, liked=True, purchased=True)
+    add_activity(db, 1, 1, rated=True)  # Duplicate row for the same cell
+    add_activity(db, 1, 2)  # No positive signal
+    model = InteractionModel()
+    model.load(db)
+    assert model.user_items(1) == {1: 2}
+
+    version = model.version
+    activity = add_activity(db, 2, 3, liked=True)
+    model.record(activity)
+    model.record(activity)  # Applying a row twice is a no-op
+    assert model.user_items(2) == {3: 1}
+    assert model.version == version + 1
+
+    activity.liked = False
+    db.commit()
+    model.record(activity)
+    assert model.user_items(2) == {}
+    assert model.triples() == [(1, 1, 2)]
+
+
+def test_interaction_model_sync_catches_up_with_other_workers(db):
+    for user_id in (1, 2):
+        add_user(db, user_id)
+    for meal_id in (1, 2):
+        add_meal(db, meal_id)
+    updated = add_activity(db, 1, 1, timestamp=datetime(2026, 1, 1))
+    model = InteractionModel()
+    model.load(db)
+    assert model.user_items(1) == {}
+
+    # Written by another worker: a new row, and an update of a row this model already saw
+    add_activity(db, 2, 2, purchased=True, timestamp=datetime(2026, 1, 2))
+    updated.liked = True
+    updated.timestamp = datetime(2026, 1, 2)
+    db.commit()
+    model.sync(db)
+    assert model.user_items(1) == {1: 1}
+    assert model.user_items(2) == {2: 1}
+
+    # Rows at the watermark are read again, without changing anything
+    version = model.version
+    model.sync(db)
+    assert model.version == version
+
+
+# Users x meals interaction scores: overlapping tastes, a user with a single meal, and a meal nobody rated
+RATINGS = np.array([
+    [3, 1, 0, 2, 0, 0],
+    [2, 0, 1, 3, 0, 0],
+    [0, 1, 3, 0, 2, 0],
+    [1, 1, 1, 1, 1, 0],
+    [0, 0, 0, 0, 3, 0],
+], dtype=np.float64)
+
+
+def numpy_pearson(rows: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.nan_to_num(np.corrcoef(rows))  # Rows without variance correlate 0 with everything
+
+
+def numpy_cosine(rows: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(rows, axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.nan_to_num(rows @ rows.T / np.outer(norms, norms))
+
+
+def engine_for(ratings: np.ndarray, metric: str = "pearson") -> SimilarityEngine:
+    model = InteractionModel()
+    model.triples = lambda: [
+        (user + 1, meal + 1, ratings[user, meal]) for user, meal in zip(*np.nonzero(ratings))
+    ]
+    engine = SimilarityEngine(metric)
+    engine.refresh(model)
+    return engine
+
+
+def test_sparse_similarities_match_numpy():
+    # The all-zero row has no variance and no norm: similarity 0, not NaN
+    for matrix in (RATINGS, RATINGS.T, np.vstack([RATINGS, np.zeros(RATINGS.shape[1])])):
+        space = _RowSpace(sparse.csr_matrix(matrix))
+        rows = np.arange(matrix.shape[0])
+        np.testing.assert_allclose(space.similarities(rows, "pearson"), numpy_pearson(matrix), atol=1e-12)
+        np.testing.assert_allclose(space.similarities(rows, "cosine"), numpy_cosine(matrix), atol=1e-12)
+        np.testing.assert_allclose(space.similarities(rows[2:4], "pearson"), numpy_pearson(matrix)[2:4], atol=1e-12)
+
+
+def test_user_neighbors_and_item_scores_match_numpy():
+    engine = engine_for(RATINGS)
+    # The meal nobody rated is not a column of the engine's matrix
+    ratings = RATINGS[:, RATINGS.any(axis=0)]
+    user_sims = numpy_pearson(ratings)
+    item_sims = numpy_pearson(ratings.T)
+
+    for user in range(ratings.shape[0]):
+        expected = [(other + 1, user_sims[user, other]) for other in range(ratings.shape[0]) if other != user]
+        expected.sort(key=lambda item: item[1], reverse=True)
+        neighbors = engine.user_neighbors(user + 1, 10)  # k larger than the number of other users
+        assert [user_id for user_id, _ in neighbors] == [user_id for user_id, _ in expected]
+        np.testing.assert_allclose([sim for _, sim in neighbors], [sim for _, sim in expected], atol=1e-12)
+
+        seen = np.flatnonzero(ratings[user])
+        scores = np.clip(item_sims[seen], 0, None).sum(axis=0)
+        scores[seen] = 0
+        expected = sorted(
+            ((meal + 1, scores[meal]) for meal in np.flatnonzero(scores > 0)),
+            key=lambda item: item[1], reverse=True,
+        )
+        item_scores = engine.item_based_scores(user + 1, 10)
+        assert [meal_id for meal_id, _ in item_scores] == [meal_id for meal_id, _ in expected]
+        np.testing.assert_allclose([score for _, score in item_scores], [score for _, score in expected], atol=1e-12)
+
+    assert engine.user_neighbors(99, 3) == []
+    assert engine.user_meals(3) == [2, 3, 5]
+
+
+def test_top_k_orders_ties_by_index_and_clamps_k():
+    scores = np.array([0.5, 0.9, 0.5, -np.inf, 0.9, 0.5, 0.1])
+    assert top_k(scores, 3).tolist() == [1, 4, 0]
+    assert top_k(scores, 4).tolist() == [1, 4, 0, 2]
+    assert top_k(scores, 50).tolist() == [1, 4, 0, 2, 5, 6, 3]
+    assert top_k(scores, 0).tolist() == []
+    assert top_k(np.zeros(4), 2).tolist() == [0, 1]
+    assert top_k(np.empty(0), 3).tolist() == []
+
+
+def test_meal_index_is_reused_until_the_meals_change(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(meal_service, "meal_catalog", MealCatalog())
+    monkeypatch.setattr(settings, "MEAL_INDEX_CHECK_SECONDS", 0)
+    builds = []
+    build = MealTfidfIndex.build.__func__
+    monkeypatch.setattr(MealTfidfIndex, "build", classmethod(lambda cls, catalog: builds.append(1) or build(cls, catalog)))
+    add_meal(db, 1, nutrient="fiber", disease="diabetes")
+    add_meal(db, 2, nutrient="iron", disease="anemia")
+    path = tmp_path / "cache" / "meal_tfidf.pkl"
+
+    store = MealIndexStore(str(path))
+    index = store.get(db)
+    assert store.get(db) is index
+    assert path.exists() and len(builds) == 1
+
+    # Another worker loads the persisted index instead of fitting its own
+    loaded = MealIndexStore(str(path)).get(db)
+    assert loaded.fingerprint == index.fingerprint and len(builds) == 1
+
+    add_meal(db, 3, nutrient="iron protein", disease="anemia")
+    rebuilt = store.get(db)
+    assert len(builds) == 2 and rebuilt.fingerprint != index.fingerprint
+    assert rebuilt.meal_ids.tolist() == [1, 2, 3]
+    assert int(rebuilt.meal_ids[np.argmax(rebuilt.scores("protein anemia"))]) == 3
+    assert MealTfidfIndex.load(str(path)).fingerprint == rebuilt.fingerprint
+
+    # An edit that keeps every column's length (and the row count) still rebuilds it
+    edited = db.get(Meal, 2)
+    edited.disease = "asthma"
+    db.commit()
+    assert len(store.get(db).meal_ids) == 3 and len(builds) == 3
+    assert store.get(db).fingerprint == MealTfidfIndex.load(str(path)).fingerprint != rebuilt.fingerprint
+
+
+def test_meal_catalog_reloads_only_when_the_meals_table_changes(db, monkeypatch):
+    meal = add_meal(db, 1, nutrient="fiber")
+    add_meal(db, 2, nutrient="iron")
+    catalog = MealCatalog()
+    catalog.refresh(db)
+    assert catalog.version == 1 and len(catalog) == 2
+    assert [meal.meal_id for meal in catalog.get_many([2, 99, 1])] == [2, 1]
+    assert catalog.get(1).as_dict(score="content-based") == {
+        "meal_id": 1, "name": "Meal 1", "nutrient": "fiber", "disease": "diabetes", "diet": "low_sugar",
+        "score": "content-based",
+    }
+
+    meal.nutrient = "fiber, vitamin c"
+    db.commit()
+    catalog.refresh(db)  # Within MEAL_INDEX_CHECK_SECONDS of the last check: no query
+    assert catalog.get(1).nutrient == "fiber"
+
+    monkeypatch.setattr(settings, "MEAL_INDEX_CHECK_SECONDS", 0)
+    catalog.refresh(db)
+    assert catalog.version == 2 and catalog.get(1).nutrient == "fiber, vitamin c"
+    catalog.refresh(db)  # Same fingerprint: nothing reloaded
+    assert catalog.version == 2
+
+    meal.name, meal.diet = "Meal 9", "low_fiber"  # Same lengths as before
+    db.commit()
+    catalog.refresh(db)
+    assert catalog.version == 3 and (catalog.get(1).name, catalog.get(1).diet) == ("Meal 9", "low_fiber")
+
+
+def test_rank_recommendations_merges_lists_and_orders_by_like_signals():
+    content = [{"meal_id": 1, "score": "content-based"}, {"meal_id": 2, "score": "content-based"}]
+    user_based = [{"meal_id": 2, "score": "user-based"}, {"meal_id": 3, "score": "user-based"}]
+    item_based = [{"meal_id": 4, "score": "item-based"}, {"meal_id": 5, "score": "item-based"}]
+    signals = LikeSignals(
+        global_counts={1: 1, 3: 4},  # x3
+        similar_counts={2: 2},  # x5
+        user_liked=[4],  # +10
+        top_similar=[2],  # +25
+    )
+
+    ranked = rank_recommendations([content, user_based, {"error": "ignored"}, item_based], signals)
+    # Priorities: 2 -> 35, 3 -> 12, 4 -> 10, 1 -> 3, 5 -> 0; the first list a meal appears in wins
+    assert [(rec["meal_id"], rec["score"]) for rec in ranked] == [
+        (2, "content-based"), (3, "user-based"), (4, "item-based"), (1, "content-based"), (5, "item-based"),
+    ]
+    # Equal priorities keep the recommenders' order
+    assert [rec["meal_id"] for rec in rank_recommendations([item_based, content], LikeSignals({}, {}, [], []))] == [4, 5, 1, 2]
+
+
+def test_popularity_store_counts_likes_and_moves_them_with_the_users_disease(db):
+    alice = add_user(db, 1, disease="diabetes")
+    add_user(db, 2, disease="anemia")
+    for meal_id in (1, 2, 3):
+        add_meal(db, meal_id)
+    add_activity(db, 1, 1, liked=True, timestamp=datetime(2026, 1, 1))
+    add_activity(db, 1, 2, liked=True, timestamp=datetime(2026, 1, 1))
+    add_activity(db, 2, 2, liked=True, timestamp=datetime(2026, 1, 2))
+    store = PopularityStore()
+    store.load(db)
+    assert store.top_global(2) == [(2, 2), (1, 1)]
+    assert store.top_for_disease("diabetes", 5) == [(1, 1), (2, 1)]
+
+    like = add_activity(db, 2, 3, liked=True, timestamp=datetime(2026, 1, 3))
+    store.record(like, "anemia")
+    assert store.top_for_disease("anemia", 5) == [(2, 1), (3, 1)]
+    like.liked = False
+    db.commit()
+    store.record(like, "anemia")
+    assert store.disease_counts("anemia")[3] == 0 and store.user_liked(2) == [2]
+
+    # Profile update handled by this worker
+    store.set_user_disease(1, "anemia")
+    assert store.top_for_disease("diabetes", 5) == []
+    assert store.top_for_disease("anemia", 5) == [(2, 2), (1, 1)]
+    assert store.global_counts()[2] == 2
+
+    # ... and by another worker: picked up by the next sync, without any new interaction
+    other_worker = PopularityStore()
+    other_worker.load(db)
+    alice.disease = "anemia"
+    db.commit()
+    assert other_worker.disease_counts("anemia")[1] == 0
+    other_worker.sync(db)
+    assert other_worker.top_for_disease("anemia", 5) == [(2, 2), (1, 1)]
+    assert other_worker.top_for_disease("diabetes", 5) == []
+
+
+def test_views_load_once_then_sync_when_due_or_forced(db):
+    add_user(db, 1)
+    add_meal(db, 1)
+    model = InteractionModel()
+    assert model.refresh(db) is model and model.loaded
+
+    add_activity(db, 1, 1, liked=True, timestamp=datetime(2026, 1, 2))
+    model.refresh(db)  # Synced less than INTERACTION_SYNC_SECONDS ago
+    assert model.user_items(1) == {}
+    model.refresh(db, force=True)
+    assert model.user_items(1) == {1: 1}
+
+
+def test_incomplete_activity_views_fail_when_created():
+    class ResetOnly(ActivityView):
+        def _reset(self):
+            pass
+
+    with pytest.raises(TypeError):
+        ResetOnly()
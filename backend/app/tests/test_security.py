@@ -0,0 +1,46 @@
+import asyncio
+import time
+import bcrypt
+from app.core import security
+from app.core.config import settings
+
+
+def test_hashes_round_trip_and_accept_existing_hashes(monkeypatch):
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 4)
+
+    hashed = security.hash_password("s3cret")
+    assert hashed.startswith("$2b$04$")
+    assert security.verify_password("s3cret", hashed)
+    assert not security.verify_password("wrong", hashed)
+    assert not security.verify_password("s3cret", "not-a-bcrypt-hash")
+
+    # Hashes from before (bcrypt.hashpw at its default cost) still verify, including long passwords
+    legacy = bcrypt.hashpw(b"s3cret", bcrypt.gensalt()).decode("utf-8")
+    assert security.verify_password("s3cret", legacy)
+    long_password = "x" * 100
+    assert security.verify_password(long_password, security.hash_password(long_password))
+
+
+def test_async_hashing_keeps_the_event_loop_free(monkeypatch):
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 10)
+    before = security.password_hashing_stats()
+
+    async def hash_while_ticking():
+        ticks = 0
+        hashing = asyncio.ensure_future(asyncio.gather(*(security.hash_password_async(f"pw{i}") for i in range(4))))
+        while not hashing.done():
+            ticks += 1
+            await asyncio.sleep(0.005)
+        hashes = await hashing
+        return ticks, await security.verify_password_async("pw0", hashes[0])
+
+    started = time.monotonic()
+    ticks, verified = asyncio.run(hash_while_ticking())
+    assert verified
+    assert ticks >= (time.monotonic() - started) / 0.05  # The loop kept running while bcrypt worked
+
+    stats = security.password_hashing_stats()
+    assert stats["hash_count"] - before["hash_count"] == 4
+    assert stats["verify_count"] - before["verify_count"] == 1
+    assert stats["queue_wait_count"] - before["queue_wait_count"] == 5
+    assert stats["pending"] == 0
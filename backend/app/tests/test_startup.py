@@ -0,0 +1,51 @@
+import os
+import pytest
+from app.core.config import settings
+from app.core.startup import import_report
+
+
+@pytest.fixture(scope="module")
+def report():
+    return import_report("app.main")
+
+
+def test_app_import_within_startup_budget(report):
+    assert report["seconds"] < settings.STARTUP_IMPORT_BUDGET_SECONDS, report
+
+
+def test_app_import_defers_heavy_dependencies(report):
+    assert report["heavy_modules_loaded"] == [], report
+
+
+def test_llm_resources_load_on_first_use_from_any_cwd(tmp_path, monkeypatch):
+    from app.core import llm_integration
+
+    monkeypatch.chdir(tmp_path)  # Data files are resolved independently of the CWD
+    llm_integration._valid_diseases.reset()
+    assert not llm_integration._valid_diseases.loaded
+
+    assert "goitre" in llm_integration.get_valid_diseases()
+    assert llm_integration._valid_diseases.loaded
+
+
+def test_output_paths_resolve_inside_data_dir_from_any_cwd(tmp_path, monkeypatch):
+    from app.core.paths import BACKEND_DIR, resolve_data_path, resolve_output_path
+
+    data_dir = resolve_data_path("cleaned").rsplit("cleaned", 1)[0]
+    monkeypatch.chdir(tmp_path)
+    # Not created yet, and still not relative to the CWD
+    assert resolve_output_path(settings.MODEL_CACHE_DIR) == data_dir + settings.MODEL_CACHE_DIR
+    assert resolve_output_path("profiles") == data_dir + "profiles"
+    assert resolve_output_path(str(tmp_path / "cache")) == str(tmp_path / "cache")
+
+    (tmp_path / "data").mkdir()  # A data/ directory in the CWD takes precedence, as for data files
+    assert resolve_output_path("cache") == str(tmp_path / "data" / "cache")
+    monkeypatch.setattr(settings, "DATA_DIR", str(BACKEND_DIR))
+    assert resolve_output_path("cache") == str(BACKEND_DIR / "cache")
+
+
+def test_exercise_dataset_is_found_from_any_cwd(tmp_path, monkeypatch):
+    from app.services import exercise_service
+
+    monkeypatch.chdir(tmp_path)
+    assert os.path.isfile(exercise_service.exercise_registry.data_path)
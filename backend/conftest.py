@@ -0,0 +1,5 @@
+import os
+
+# Settings require these; tests never talk to a real database or OpenAI
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
@@ -0,0 +1,17 @@
+"""
+Operations shared by the revisions in `versions/`.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+def add_column_if_missing(table: str, column: sa.Column):
+    """
+    `op.add_column` that is a no-op when the column exists, e.g. in databases
+    initialised from the current database/init.sql.
+    """
+    context = op.get_context()
+    # SQLite has no ADD COLUMN IF NOT EXISTS: check first (not possible when emitting SQL)
+    if not context.as_sql and column.name in {c["name"] for c in sa.inspect(op.get_bind()).get_columns(table)}:
+        return
+    op.add_column(table, column, if_not_exists=context.dialect.name == "postgresql")
@@ -0,0 +1,115 @@
+"""Baseline: the schema database/init.sql created before migrations were introduced
+
+Every table is created only if missing, so existing databases (initialised from
+init.sql, old or current) just get stamped with this revision; later revisions
+bring them up to date. Don't change this revision to follow the models: add a new one.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("user_id", sa.Integer, primary_key=True),
+        sa.Column("username", sa.String(255), unique=True),
+        sa.Column("password_hash", sa.Text),
+        sa.Column("email", sa.String(255), unique=True),
+        sa.Column("veg_non", sa.Boolean),
+        sa.Column("height", sa.Float),
+        sa.Column("weight", sa.Float),
+        sa.Column("bmi", sa.Float, sa.Computed("weight / ((height / 100) * (height / 100))", persisted=True)),
+        sa.Column("nutrient", sa.String(100)),
+        sa.Column("disease", sa.Text),
+        sa.Column("diet", sa.Text),
+        sa.Column("gender", sa.Boolean),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "meals",
+        sa.Column("meal_id", sa.Integer, primary_key=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("category", sa.String(50)),
+        sa.Column("description", sa.Text),
+        sa.Column("veg_non", sa.Boolean),
+        sa.Column("nutrient", sa.String(100)),
+        sa.Column("disease", sa.Text),
+        sa.Column("diet", sa.Text),
+        sa.Column("price", sa.DECIMAL(10, 2)),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "user_mapping",
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("users.user_id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("username", sa.String(255), unique=True, nullable=False),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "exercises",
+        sa.Column("exercise_id", sa.Integer, primary_key=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("calories_burned", sa.Float, nullable=False),
+        sa.Column("target_weight", sa.Float),
+        sa.Column("actual_weight", sa.Float),
+        sa.Column("age", sa.Integer),
+        sa.Column("gender", sa.String(10), sa.CheckConstraint("gender IN ('male', 'female')")),
+        sa.Column("duration", sa.Integer, nullable=False),
+        sa.Column("heart_rate", sa.Integer),
+        sa.Column("bmi", sa.Float),
+        sa.Column("weather_conditions", sa.String(50)),
+        sa.Column("intensity", sa.Integer, sa.CheckConstraint("intensity BETWEEN 1 AND 10")),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "user_activity",
+        sa.Column("activity_id", sa.Integer, primary_key=True),
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("users.user_id", ondelete="CASCADE")),
+        sa.Column("meal_id", sa.Integer, sa.ForeignKey("meals.meal_id", ondelete="CASCADE")),
+        sa.Column("exercise_id", sa.Integer, sa.ForeignKey("exercises.exercise_id", ondelete="CASCADE")),
+        sa.Column("rated", sa.Boolean),
+        sa.Column("liked", sa.Boolean),
+        sa.Column("searched", sa.Boolean),
+        sa.Column("purchased", sa.Boolean),
+        sa.Column("performed", sa.Boolean),
+        sa.Column("duration", sa.Integer),
+        sa.Column("timestamp", sa.DateTime, server_default=sa.func.current_timestamp()),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "recommendations",
+        sa.Column("recommendation_id", sa.Integer, primary_key=True),
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("users.user_id", ondelete="CASCADE")),
+        sa.Column("meal_id", sa.Integer, sa.ForeignKey("meals.meal_id", ondelete="CASCADE")),
+        sa.Column("exercise_id", sa.Integer, sa.ForeignKey("exercises.exercise_id", ondelete="CASCADE")),
+        sa.Column("recommendation_reason", sa.Text),
+        sa.Column("interacted", sa.Boolean),
+        sa.Column("created_at", sa.DateTime, server_default=sa.func.current_timestamp()),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "exercise_user_profiles",
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("users.user_id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("age", sa.Integer, nullable=False),
+        sa.Column("gender", sa.String(10), sa.CheckConstraint("gender IN ('Male', 'Female')")),
+        sa.Column("preferred_intensity", sa.Integer, sa.CheckConstraint("preferred_intensity BETWEEN 1 AND 10")),
+        sa.Column("fitness_goal", sa.String(50), nullable=False),
+        sa.Column("preferred_duration", sa.Integer, sa.CheckConstraint("preferred_duration > 0")),
+        if_not_exists=True,
+    )
+
+
+def downgrade():
+    for table in (
+        "exercise_user_profiles", "recommendations", "user_activity",
+        "exercises", "user_mapping", "meals", "users",
+    ):
+        op.drop_table(table)
@@ -0,0 +1,50 @@
+"""Indexes for the hot request-path queries
+
+- user_activity (user_id, meal_id, liked): interaction upsert lookup, a user's interacted meals
+- user_activity (timestamp) WHERE meal_id IS NOT NULL: incremental sync of meal interactions
+- users (disease): users with the same disease history (recompute fan-out on /interact)
+
+On PostgreSQL the indexes are built CONCURRENTLY, so writes to live tables aren't blocked.
+Check the plans with `python -m app.core.query_plans`.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+MEAL_ROWS = sa.text("meal_id IS NOT NULL")
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_user_activity_user_meal_liked", "user_activity", ["user_id", "meal_id", "liked"],
+            if_not_exists=True, postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_user_activity_meal_timestamp", "user_activity", ["timestamp"],
+            postgresql_where=MEAL_ROWS, sqlite_where=MEAL_ROWS,
+            if_not_exists=True, postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_users_disease", "users", ["disease"],
+            if_not_exists=True, postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for index, table in (
+            ("ix_users_disease", "users"),
+            ("ix_user_activity_meal_timestamp", "user_activity"),
+            ("ix_user_activity_user_meal_liked", "user_activity"),
+        ):
+            op.drop_index(index, table_name=table, if_exists=True, postgresql_concurrently=True)
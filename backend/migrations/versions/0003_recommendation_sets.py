@@ -0,0 +1,48 @@
+"""Versioned recommendation sets
+
+- recommendations.set_version: the set a row belongs to (existing rows become version 0)
+- recommendation_sets: each user's active set version, switched after a set is fully written
+- recommendations (user_id, set_version): reads of the active set and pruning of old ones
+
+Idempotent, because databases initialised from the current init.sql already have all of it.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from migrations.helpers import add_column_if_missing
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Rows written before sets existed form version 0; readers fall back to it until a user's first set is stored
+    add_column_if_missing("recommendations", sa.Column("set_version", sa.BigInteger, nullable=False, server_default="0"))
+    op.create_table(
+        "recommendation_sets",
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("users.user_id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("active_version", sa.BigInteger, nullable=False),
+        sa.Column("updated_at", sa.DateTime, server_default=sa.func.current_timestamp()),
+        if_not_exists=True,
+    )
+    # Only once the column exists; CONCURRENTLY can't run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_recommendations_user_version", "recommendations", ["user_id", "set_version"],
+            if_not_exists=True, postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_recommendations_user_version", table_name="recommendations",
+            if_exists=True, postgresql_concurrently=True,
+        )
+    op.drop_table("recommendation_sets")
+    op.drop_column("recommendations", "set_version")
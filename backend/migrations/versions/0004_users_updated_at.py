@@ -0,0 +1,32 @@
+"""users.updated_at
+
+Set on every profile update, so workers can pick up disease changes made by other
+workers (`PopularityStore.sync`). Existing rows start out NULL.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from migrations.helpers import add_column_if_missing
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    add_column_if_missing("users", sa.Column("updated_at", sa.DateTime))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_users_updated_at", "users", ["updated_at"],
+            if_not_exists=True, postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_users_updated_at", table_name="users", if_exists=True, postgresql_concurrently=True)
+    op.drop_column("users", "updated_at")
@@ -1,4 +1,5 @@
 -- Drop Tables in Correct Order to Avoid Dependency Issues
+DROP TABLE IF EXISTS recommendation_sets CASCADE;
 DROP TABLE IF EXISTS recommendations CASCADE;
 DROP TABLE IF EXISTS user_activity CASCADE;
 DROP TABLE IF EXISTS exercises CASCADE;
@@ -20,9 +21,14 @@ CREATE TABLE IF NOT EXISTS users (
     nutrient VARCHAR(100),
     disease TEXT,
     diet TEXT,
-    gender BOOLEAN
+    gender BOOLEAN,
+    updated_at TIMESTAMP
 );
 
+CREATE INDEX IF NOT EXISTS ix_users_disease ON users (disease);
+-- ✅ Profiles changed since a worker's last sync (0004 migration)
+CREATE INDEX IF NOT EXISTS ix_users_updated_at ON users (updated_at);
+
 -- ✅ Ensure sequence starts at MAX(user_id) + 1
 
 -- Recreate Meals Table
@@ -75,6 +81,10 @@ CREATE TABLE IF NOT EXISTS user_activity (
     timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- ✅ Hot-query indexes (also created by the 0002 migration in backend/migrations)
+CREATE INDEX IF NOT EXISTS ix_user_activity_user_meal_liked ON user_activity (user_id, meal_id, liked);
+CREATE INDEX IF NOT EXISTS ix_user_activity_meal_timestamp ON user_activity (timestamp) WHERE meal_id IS NOT NULL;
+
 -- Recreate Recommendations Table
 CREATE TABLE IF NOT EXISTS recommendations (
     recommendation_id SERIAL PRIMARY KEY,
@@ -83,7 +93,17 @@ CREATE TABLE IF NOT EXISTS recommendations (
     exercise_id INT REFERENCES exercises(exercise_id) ON DELETE CASCADE,
     recommendation_reason TEXT,
     interacted BOOLEAN,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    set_version BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS ix_recommendations_user_version ON recommendations (user_id, set_version);
+
+-- ✅ Active recommendation set per user (switched atomically after a bulk insert; 0003 migration)
+CREATE TABLE IF NOT EXISTS recommendation_sets (
+    user_id INT PRIMARY KEY REFERENCES users(user_id) ON DELETE CASCADE,
+    active_version BIGINT NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
 -- Recreate Exercise User Profiles Table